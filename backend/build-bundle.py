@@ -0,0 +1,362 @@
+"""
+Lambda 배포 번들 빌더
+핸들러가 실제로 사용하는 botocore 서비스 모델만 남긴 패키지 디렉토리 생성
+
+사용법:
+    python3 build-bundle.py --source lambda --output build/lambda
+    python3 build-bundle.py --compile --measure          # cpython-311 바이트코드 사전 컴파일 + import 시간 비교
+    python3 build-bundle.py --compile --zipimport        # 순수 Python 패키지를 vendor.zip으로 묶음
+"""
+import argparse
+import compileall
+import os
+import py_compile
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 자격 증명 확인에 항상 필요한 서비스 (AssumeRole, SSO 프로필)
+CREDENTIAL_SERVICES = {'sts', 'sso', 'sso-oidc'}
+
+# 핸들러 코드에서 사용하는 서비스 탐지 패턴
+CLIENT_PATTERNS = [
+    re.compile(r"""get_client\(\s*['"]([a-z0-9-]+)['"]"""),
+    re.compile(r"""\.client\(\s*(?:service_name\s*=\s*)?['"]([a-z0-9-]+)['"]"""),
+    re.compile(r"""\.resource\(\s*(?:service_name\s*=\s*)?['"]([a-z0-9-]+)['"]"""),
+]
+HELPER_SERVICES = {
+    'get_bedrock_client': 'bedrock-runtime',
+    'RegionPool': 'bedrock-runtime',
+}
+
+# 패키지에 포함하지 않는 파일
+EXCLUDE_DIRS = {'__pycache__', 'bin'}
+EXCLUDE_SUFFIXES = ('.pyc', '.pyo', '.pyd', '.dylib')
+
+# Lambda 런타임 (serverless.yml의 python3.11)
+TARGET_PYTHON = (3, 11)
+TARGET_ARCHS = {'x86_64': 'x86_64-linux-gnu', 'arm64': 'aarch64-linux-gnu'}
+
+# import 시간 측정 대상 최상위 패키지
+MEASURED_PACKAGES = ['boto3', 'botocore', 'requests', 'urllib3', 'charset_normalizer',
+                     'idna', 'certifi', 'dateutil', 'jmespath', 's3transfer', 'six']
+
+# vendor.zip에 넣지 않는 패키지 (데이터 파일을 파일 경로로 읽음)
+ZIPIMPORT_EXCLUDE = {'botocore', 'boto3', 'certifi', 'chatbot_core'}
+
+_EXTENSION_PATTERN = re.compile(r'\.cpython-(\d+)-([a-z0-9_]+-[a-z]+-[a-z]+)\.so$')
+
+
+def find_source_files(source_dir):
+    """
+    핸들러와 공용 모듈 (벤더링된 패키지 제외)
+    """
+    files = [
+        os.path.join(source_dir, name)
+        for name in os.listdir(source_dir)
+        if name.endswith('.py') and name != 'six.py'
+    ]
+    core_dir = os.path.join(source_dir, 'chatbot_core')
+    if os.path.isdir(core_dir):
+        files.extend(
+            os.path.join(core_dir, name)
+            for name in os.listdir(core_dir)
+            if name.endswith('.py')
+        )
+    return sorted(files)
+
+
+def detect_services(source_files):
+    """
+    소스 코드에서 사용하는 AWS 서비스 이름 수집
+    """
+    services = set()
+    for path in source_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            code = f.read()
+        for pattern in CLIENT_PATTERNS:
+            services.update(pattern.findall(code))
+        for helper, service in HELPER_SERVICES.items():
+            if f"{helper}(" in code:
+                services.add(service)
+    return services
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def is_foreign_extension(name, target_arch):
+    """
+    대상 런타임과 맞지 않는 확장 모듈 여부 (예: md.cpython-313-darwin.so)
+    """
+    if name.endswith('-darwin.so'):
+        return True
+    match = _EXTENSION_PATTERN.search(name)
+    if not match:
+        return False
+    version, platform = match.groups()
+    target_version = f"{TARGET_PYTHON[0]}{TARGET_PYTHON[1]}"
+    return version != target_version or platform != TARGET_ARCHS[target_arch]
+
+
+def copy_bundle(source_dir, output_dir, services, target_arch='x86_64'):
+    """
+    소스 디렉토리를 복사하면서 불필요한 botocore 서비스 모델 제외
+    다른 플랫폼/버전용 확장 모듈과 기존 바이트코드도 제외
+    """
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+
+    data_dir = os.path.join(source_dir, 'botocore', 'data')
+    boto3_data_dir = os.path.join(source_dir, 'boto3', 'data')
+
+    def ignore(directory, names):
+        ignored = set()
+        for name in names:
+            path = os.path.join(directory, name)
+            if name in EXCLUDE_DIRS or name.endswith(EXCLUDE_SUFFIXES):
+                ignored.add(name)
+            elif name.endswith('.so') and is_foreign_extension(name, target_arch):
+                print(f"  ⚠️  다른 플랫폼용 확장 모듈 제외: {name} (순수 Python 구현 사용)")
+                ignored.add(name)
+            elif os.path.abspath(path) == os.path.abspath(output_dir):
+                ignored.add(name)
+            elif directory in (data_dir, boto3_data_dir) and os.path.isdir(path) and name not in services:
+                ignored.add(name)
+        return ignored
+
+    shutil.copytree(source_dir, output_dir, ignore=ignore)
+
+
+def find_target_python():
+    """
+    대상 런타임 버전의 인터프리터 경로 - 현재 인터프리터가 맞으면 그대로, 아니면 PATH의 python3.11
+    없으면 None
+    """
+    if sys.version_info[:2] == TARGET_PYTHON:
+        return sys.executable
+    return shutil.which(f"python{TARGET_PYTHON[0]}.{TARGET_PYTHON[1]}")
+
+
+def compile_bundle(output_dir, optimize=0, python=None):
+    """
+    번들 전체를 대상 런타임용 바이트코드로 사전 컴파일
+    zip 압축 시 mtime 정밀도(2초)가 달라져도 재컴파일되지 않도록 해시 기반 pyc 사용
+    optimize > 0 이면 Lambda 환경 변수 PYTHONOPTIMIZE도 같은 값으로 설정해야 함
+    python: 대상 버전 인터프리터 (현재 인터프리터와 다르면 별도 프로세스로 컴파일)
+    """
+    if python is None or python == sys.executable:
+        return compileall.compile_dir(
+            output_dir,
+            quiet=1,
+            optimize=optimize,
+            workers=0,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH
+        )
+
+    result = subprocess.run([
+        python, '-m', 'compileall', '-q', '-j', '0', '-o', str(optimize),
+        '--invalidation-mode', 'unchecked-hash', output_dir
+    ])
+    return result.returncode == 0
+
+
+def build_vendor_zip(output_dir):
+    """
+    순수 Python 벤더 패키지를 sourceless zip (vendor.zip)으로 묶음
+    chatbot_core가 시작 시 vendor.zip을 sys.path 앞에 추가
+    """
+    archive_path = os.path.join(output_dir, 'vendor.zip')
+    packed = []
+
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_STORED) as archive:
+        for name in sorted(os.listdir(output_dir)):
+            package_dir = os.path.join(output_dir, name)
+            if (name in ZIPIMPORT_EXCLUDE or not os.path.isdir(package_dir)
+                    or not os.path.exists(os.path.join(package_dir, '__init__.py'))):
+                continue
+            if any(f.endswith('.so') for _, _, files in os.walk(package_dir) for f in files):
+                continue
+
+            for root, _, files in os.walk(package_dir):
+                for filename in files:
+                    if not filename.endswith('.pyc'):
+                        continue
+                    pyc_path = os.path.join(root, filename)
+                    module_dir = os.path.dirname(root)
+                    module_name = filename.split('.')[0] + '.pyc'
+                    arcname = os.path.relpath(os.path.join(module_dir, module_name), output_dir)
+                    archive.write(pyc_path, arcname)
+
+            shutil.rmtree(package_dir)
+            packed.append(name)
+
+    print(f"🗜️  vendor.zip: {', '.join(packed)}")
+
+
+def measure_imports(bundle_dir, packages, force_compile=False, python=None):
+    """
+    -X importtime으로 최상위 패키지별 import 시간(ms) 측정 (패키지마다 새 프로세스)
+    force_compile: 빈 pycache_prefix로 바이트코드를 무시 (현재 Lambda 콜드 스타트와 동일)
+    python: 측정할 인터프리터 (기본: 현재 인터프리터)
+    """
+    env = {**os.environ, 'PYTHONPATH': bundle_dir, 'PYTHONDONTWRITEBYTECODE': '1'}
+    prelude = "import sys, os; sys.path.insert(0, 'vendor.zip') if os.path.exists('vendor.zip') else None; "
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as empty_prefix:
+        command = [python or sys.executable, '-S', '-X', 'importtime']
+        if force_compile:
+            command += ['-X', f'pycache_prefix={empty_prefix}']
+
+        for package in packages:
+            result = subprocess.run(command + ['-c', prelude + f'import {package}'],
+                                    cwd=bundle_dir, env=env, capture_output=True, text=True)
+            for line in result.stderr.splitlines():
+                if not line.startswith('import time:') or line.count('|') != 2:
+                    continue
+                _, cumulative, name = line.split('|')
+                # 들여쓰기가 없는 최상위 항목의 누적 시간 (중첩 import 포함)
+                if name[1:] == package and cumulative.strip().isdigit():
+                    timings[package] = int(cumulative) / 1000
+
+    return timings
+
+
+def print_import_report(before, after):
+    print(f"  {'package':<20}{'before(ms)':>12}{'after(ms)':>12}")
+    for name in MEASURED_PACKAGES:
+        if name in before or name in after:
+            print(f"  {name:<20}{before.get(name, 0):>12.1f}{after.get(name, 0):>12.1f}")
+    print(f"  {'sum':<20}{sum(before.values()):>12.1f}{sum(after.values()):>12.1f}")
+
+
+def verify_bundle(output_dir, services, python=None):
+    """
+    번들만으로 각 서비스 모델/엔드포인트 규칙/파티션 데이터가 로드되는지 확인
+    site-packages를 배제하기 위해 별도 프로세스(-S)에서 실행
+    """
+    script = '''
+import os
+import sys
+if os.path.exists('vendor.zip'):
+    sys.path.insert(0, 'vendor.zip')
+import botocore.session
+
+session = botocore.session.get_session()
+loader = session.get_component('data_loader')
+for service in sys.argv[1:]:
+    model = session.get_service_model(service)
+    loader.load_service_model(service, 'endpoint-rule-set-1')
+    client = session.create_client(
+        service, region_name='us-east-1',
+        aws_access_key_id='bundle', aws_secret_access_key='bundle'
+    )
+    print(f"  ✓ {service} ({model.api_version}, {len(model.operation_names)} operations)")
+loader.load_data('partitions')
+loader.load_data('endpoints')
+print("  ✓ partitions / endpoints")
+'''
+    env = {**os.environ, 'PYTHONPATH': output_dir}
+    result = subprocess.run(
+        [python or sys.executable, '-S', '-c', script, *sorted(services)],
+        cwd=output_dir, env=env, capture_output=True, text=True
+    )
+    print(result.stdout, end='')
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lambda 배포 번들 빌더')
+    parser.add_argument('--source', default=os.path.join(BACKEND_DIR, 'lambda'))
+    parser.add_argument('--output', default=os.path.join(BACKEND_DIR, 'build', 'lambda'))
+    parser.add_argument('--extra-service', action='append', default=[],
+                        help='자동 탐지 외에 포함할 서비스 (여러 번 지정 가능)')
+    parser.add_argument('--target-arch', choices=sorted(TARGET_ARCHS), default='x86_64')
+    parser.add_argument('--compile', action='store_true',
+                        help='cpython-311 바이트코드 사전 컴파일')
+    parser.add_argument('--optimize', type=int, choices=[0, 1, 2], default=0,
+                        help='바이트코드 최적화 수준 (Lambda PYTHONOPTIMIZE와 일치해야 함)')
+    parser.add_argument('--zipimport', action='store_true',
+                        help='순수 Python 벤더 패키지를 vendor.zip으로 묶음 (--compile 필요)')
+    parser.add_argument('--measure', action='store_true',
+                        help='패키지별 import 시간 비교 (컴파일 전/후)')
+    args = parser.parse_args()
+
+    source_dir = os.path.abspath(args.source)
+    output_dir = os.path.abspath(args.output)
+
+    services = detect_services(find_source_files(source_dir))
+    services |= CREDENTIAL_SERVICES
+    services |= set(args.extra_service)
+
+    data_dir = os.path.join(source_dir, 'botocore', 'data')
+    available = {name for name in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, name))}
+    missing = services - available
+    if missing:
+        print(f"❌ botocore/data에 없는 서비스: {', '.join(sorted(missing))}", file=sys.stderr)
+        return 1
+
+    print(f"📦 필요한 서비스 모델: {', '.join(sorted(services))}")
+    copy_bundle(source_dir, output_dir, services, args.target_arch)
+
+    before = dir_size(os.path.join(source_dir, 'botocore', 'data'))
+    after = dir_size(os.path.join(output_dir, 'botocore', 'data'))
+    print(f"📉 botocore/data: {before / 1e6:.1f}MB → {after / 1e6:.1f}MB "
+          f"({len(available)} → {len(services)} services)")
+
+    if args.zipimport and not args.compile:
+        print("❌ --zipimport에는 --compile이 필요합니다", file=sys.stderr)
+        return 1
+
+    target_python = find_target_python() if args.compile else None
+    packages = [name for name in MEASURED_PACKAGES if os.path.exists(os.path.join(output_dir, name))
+                or os.path.exists(os.path.join(output_dir, f"{name}.py"))]
+    if args.measure:
+        before = measure_imports(output_dir, packages, force_compile=True, python=target_python)
+
+    if args.compile and target_python is None:
+        # 배포는 계속 진행 - 컴파일하지 않은 번들도 동작 (Lambda가 첫 import 때 컴파일)
+        print(f"⚠️  Python {TARGET_PYTHON[0]}.{TARGET_PYTHON[1]} 인터프리터가 없어 바이트코드 사전 컴파일을 건너뜁니다 "
+              f"(현재 {sys.version_info[0]}.{sys.version_info[1]}). 컴파일하지 않은 번들을 만듭니다.", file=sys.stderr)
+        if args.zipimport:
+            print("⚠️  --zipimport도 건너뜁니다 (컴파일된 바이트코드 필요)", file=sys.stderr)
+    elif args.compile:
+        print(f"⚙️  바이트코드 컴파일 (cpython-{TARGET_PYTHON[0]}{TARGET_PYTHON[1]}, optimize={args.optimize}, "
+              f"{target_python})...")
+        if not compile_bundle(output_dir, args.optimize, target_python):
+            print("❌ 바이트코드 컴파일 실패", file=sys.stderr)
+            return 1
+        if args.zipimport:
+            build_vendor_zip(output_dir)
+
+    if args.measure:
+        after = measure_imports(output_dir, packages, python=target_python)
+        print("⏱️  import 시간 (패키지별 단독 import, 하위 의존성 포함)")
+        print_import_report(before, after)
+
+    print("🔍 서비스 모델 로드 검증...")
+    # 다른 버전 인터프리터로 컴파일했으면 같은 인터프리터로 검증 (vendor.zip의 pyc는 그 버전에서만 로드됨)
+    if not verify_bundle(output_dir, services, target_python):
+        print("❌ 번들 검증 실패", file=sys.stderr)
+        return 1
+
+    print(f"✅ 번들 생성 완료: {output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -27,6 +27,7 @@ echo "📦 임시 디렉토리: $TEMP_DIR"
 
 # Lambda 코드 복사
 cp lambda/chatbot-handler.py $TEMP_DIR/
+cp -r lambda/chatbot_core $TEMP_DIR/
 cp lambda/requirements.txt $TEMP_DIR/
 
 # 의존성 설치
@@ -11,13 +11,18 @@ ROLE_ARN="arn:aws:iam::887078546492:role/lambda-execution-role"
 cd "$(dirname "$0")/lambda"
 
 echo "📦 Installing dependencies..."
-pip install -r requirements.txt -t .
-
-echo "📦 Creating deployment package..."
-zip -r ../enhanced-chatbot-lambda.zip . -x "*.pyc" "__pycache__/*"
+pip install -r requirements.txt -t . \
+    --platform manylinux2014_x86_64 --python-version 3.11 --implementation cp --only-binary=:all: --upgrade
 
 cd ..
 
+echo "📦 Building trimmed bundle (used botocore models only)..."
+# python3.11이 없으면 바이트코드 사전 컴파일만 건너뛰고 번들은 그대로 생성 (경고 출력)
+python3 build-bundle.py --source lambda --output build/lambda --compile --measure || exit 1
+
+echo "📦 Creating deployment package..."
+(cd build/lambda && zip -qr ../../enhanced-chatbot-lambda.zip .)
+
 echo "🔧 Deploying to AWS Lambda..."
 
 # 함수 존재 여부 확인
@@ -32,7 +37,7 @@ if aws lambda get-function --function-name $FUNCTION_NAME --region $REGION >/dev
     aws lambda update-function-configuration \
         --function-name $FUNCTION_NAME \
         --handler enhanced-chatbot-handler.lambda_handler \
-        --runtime python3.9 \
+        --runtime python3.11 \
         --timeout 30 \
         --memory-size 512 \
         --environment Variables='{
@@ -43,7 +48,7 @@ else
     echo "🆕 Creating new function..."
     aws lambda create-function \
         --function-name $FUNCTION_NAME \
-        --runtime python3.9 \
+        --runtime python3.11 \
         --role $ROLE_ARN \
         --handler enhanced-chatbot-handler.lambda_handler \
         --zip-file fileb://enhanced-chatbot-lambda.zip \
@@ -15,6 +15,7 @@ pip install -r lambda/requirements.txt -t lambda-package/
 
 # 3. 소스 코드 복사
 cp lambda/chatbot-handler.py lambda-package/
+cp -r lambda/chatbot_core lambda-package/
 
 # 4. ZIP 패키지 생성
 echo "📦 Creating deployment package..."
@@ -1,9 +1,27 @@
-import json
-import boto3
-import requests
 import os
 from datetime import datetime
 
+from chatbot_core.events import normalize_event, parse_json_body, RequestError
+from chatbot_core.responses import json_response
+from chatbot_core.http_session import get_session, mount_host, prewarm
+from chatbot_core.lexicon import extract_terms, extract_stems
+from chatbot_core.resilience import ResilientEndpoint, CircuitOpenError
+
+# BigKinds 호출 보호 (p95 초과 시 헤징 요청, 연속 실패 시 쿨다운 동안 호출 생략)
+bigkinds_endpoint = ResilientEndpoint(
+    'bigkinds',
+    timeout=float(os.environ.get('BIGKINDS_TIMEOUT', '5')),
+    failure_threshold=int(os.environ.get('BIGKINDS_BREAKER_THRESHOLD', '3')),
+    cooldown=int(os.environ.get('BIGKINDS_BREAKER_COOLDOWN', '30'))
+)
+
+# BigKinds 재시도는 bigkinds_endpoint 헤징이 담당 (어댑터는 읽기/상태 코드 재시도 없음)
+mount_host('https://www.bigkinds.or.kr', hedged=True)
+
+# BigKinds 커넥션 초기화 단계 예열 (백그라운드, 요청 경로를 막지 않음)
+if os.environ.get('BIGKINDS_API_KEY') and os.environ.get('HTTP_PREWARM', '1') == '1':
+    prewarm(['https://www.bigkinds.or.kr'], background=True)
+
 def lambda_handler(event, context):
     """
     AI 챗봇 Lambda 핸들러
@@ -18,8 +36,11 @@ def lambda_handler(event, context):
         'Access-Control-Allow-Headers': 'Content-Type'
     }
     
+    # 요청 정규화 (REST API v1 / HTTP API v2)
+    request = normalize_event(event)
+    
     # OPTIONS 요청 처리 (CORS preflight)
-    if event['httpMethod'] == 'OPTIONS':
+    if request['method'] == 'OPTIONS':
         return {
             'statusCode': 200,
             'headers': headers,
@@ -28,21 +49,17 @@ def lambda_handler(event, context):
     
     try:
         # 요청 데이터 파싱
-        body = json.loads(event['body'])
+        body = parse_json_body(request)
         user_question = body.get('question', '')
         game_type = body.get('gameType', '')
         question_text = body.get('questionText', '')
         question_index = body.get('questionIndex', 0)
         
         if not user_question:
-            return {
-                'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({
-                    'error': '질문이 필요합니다.',
-                    'success': False
-                })
-            }
+            return json_response(400, {
+                'error': '질문이 필요합니다.',
+                'success': False
+            }, headers, request)
         
         # 빅카인즈 API 호출
         bigkinds_response = call_bigkinds_api(user_question, question_text)
@@ -55,26 +72,25 @@ def lambda_handler(event, context):
             bigkinds_response
         )
         
-        return {
-            'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps({
-                'response': ai_response,
-                'timestamp': datetime.now().isoformat(),
-                'success': True
-            })
-        }
+        return json_response(200, {
+            'response': ai_response,
+            'timestamp': datetime.now().isoformat(),
+            'success': True
+        }, headers, request)
+        
+    except RequestError as e:
+        print(f"Bad request: {str(e)}")
+        return json_response(400, {
+            'error': '잘못된 요청 형식입니다.',
+            'success': False
+        }, headers, request)
         
     except Exception as e:
         print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({
-                'error': '서버 오류가 발생했습니다.',
-                'success': False
-            })
-        }
+        return json_response(500, {
+            'error': '서버 오류가 발생했습니다.',
+            'success': False
+        }, headers, request)
 
 def call_bigkinds_api(user_question, question_text):
     """
@@ -108,14 +124,17 @@ def call_bigkinds_api(user_question, question_text):
             }
         }
         
-        response = requests.post(url, json=params, timeout=10)
-        
-        if response.status_code == 200:
+        def request_news():
+            response = get_session().post(url, json=params, timeout=(3.05, bigkinds_endpoint.timeout))
+            if response.status_code != 200:
+                raise RuntimeError(f"Bigkinds API error: {response.status_code}")
             return response.json()
-        else:
-            print(f"Bigkinds API error: {response.status_code}")
-            return None
-            
+        
+        return bigkinds_endpoint.call(request_news)
+    
+    except CircuitOpenError:
+        print("Bigkinds circuit open, skipping news search")
+        return None
     except Exception as e:
         print(f"Bigkinds API call failed: {str(e)}")
         return None
@@ -124,25 +143,14 @@ def extract_keywords(user_question, question_text):
     """
     질문에서 키워드 추출
     """
-    # 간단한 키워드 추출 로직
     combined_text = f"{user_question} {question_text}"
     
-    # 경제 관련 키워드 우선 추출
-    economic_keywords = [
-        '금리', '환율', '주식', '부동산', '인플레이션', '경제성장',
-        '수출', '수입', '무역', '투자', '소비', '고용', '실업',
-        '코스피', '코스닥', '달러', '원화', 'GDP', 'CPI'
-    ]
-    
-    found_keywords = []
-    for keyword in economic_keywords:
-        if keyword in combined_text:
-            found_keywords.append(keyword)
+    # 경제 용어 사전 매칭 (가중치 순)
+    found_keywords = extract_terms(combined_text, limit=3)
     
-    # 키워드가 없으면 첫 번째 명사 추출 (간단한 구현)
+    # 사전 용어가 없으면 조사를 뗀 어간 사용
     if not found_keywords:
-        words = combined_text.split()
-        found_keywords = [word for word in words if len(word) > 1][:3]
+        found_keywords = extract_stems(combined_text)[:3]
     
     return ' '.join(found_keywords[:3])
 
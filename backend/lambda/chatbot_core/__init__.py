@@ -0,0 +1,11 @@
+"""
+챗봇 Lambda 핸들러 공용 모듈
+컨테이너 단위로 재사용되는 클라이언트, 캐시, 유틸리티
+"""
+import os
+import sys
+
+# 번들 빌더(--zipimport)가 만든 바이트코드 아카이브가 있으면 먼저 탐색
+_VENDOR_ZIP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'vendor.zip')
+if os.path.exists(_VENDOR_ZIP) and _VENDOR_ZIP not in sys.path:
+    sys.path.insert(0, _VENDOR_ZIP)
@@ -0,0 +1,200 @@
+"""
+유사 질문 답변 캐시
+문자 n-gram MinHash + LSH 밴딩으로 같은 퀴즈 문항의 유사 질문을 찾아 답변 재사용
+문자 유사도만으로는 '오르나요'/'떨어지나요'처럼 반대 질문도 비슷하게 보이므로
+경제 용어와 방향 표현(오르/내리/떨어 등)이 같은 질문만 재사용
+"""
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from chatbot_core.lexicon import extract_terms
+
+# MinHash 순열용 메르센 소수와 고정 시드 계수
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize_question(text):
+    """
+    비교용 질문 정규화 (소문자, 공백/문장부호 제거)
+    """
+    return re.sub(r'[\s\W_]+', '', text.lower())
+
+
+# 방향 표현 어간 → 방향 (등장 순서를 비교하므로 '금리가 오르면 주가가 떨어지나'와 반대 질문이 구분됨)
+DIRECTION_STEMS = {
+    '오르': 'up', '올라': 'up', '올리': 'up', '오른': 'up', '상승': 'up', '인상': 'up', '증가': 'up',
+    '늘어': 'up', '늘면': 'up', '높아': 'up', '급등': 'up', '강세': 'up',
+    '내리': 'down', '내려': 'down', '내린': 'down', '떨어': 'down', '하락': 'down', '인하': 'down',
+    '감소': 'down', '줄어': 'down', '줄면': 'down', '낮아': 'down', '급락': 'down', '약세': 'down'
+}
+_DIRECTION_PATTERN = re.compile('|'.join(sorted(DIRECTION_STEMS, key=len, reverse=True)))
+
+
+def question_guard(text):
+    """
+    재사용 조건 키 - (경제 용어 집합, 방향 표현 순서)가 같아야 유사 질문으로 인정
+    """
+    terms = frozenset(extract_terms(text, limit=10))
+    directions = []
+    for match in _DIRECTION_PATTERN.finditer(text):
+        direction = DIRECTION_STEMS[match.group()]
+        if not directions or directions[-1] != direction:
+            directions.append(direction)
+    return terms, tuple(directions)
+
+
+def _shingles(text, ngram):
+    if len(text) <= ngram:
+        return {text} if text else set()
+    return {text[i:i + ngram] for i in range(len(text) - ngram + 1)}
+
+
+def _base_hash(shingle):
+    digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') & _MAX_HASH
+
+
+def _permutations(num_perm):
+    """
+    MinHash 순열 계수 (a, b) - 컨테이너 간 동일하도록 결정적으로 생성
+    """
+    coefficients = []
+    for i in range(num_perm):
+        digest = hashlib.blake2b(f"minhash-{i}".encode('ascii'), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], 'little') % (_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], 'little') % _PRIME
+        coefficients.append((a, b))
+    return coefficients
+
+
+class SemanticAnswerCache:
+    """
+    (game_type, questionText) 범위 안에서 유사 질문의 답변을 재사용하는 캐시
+    threshold: 추정 자카드 유사도 하한, bands: LSH 밴드 수 (num_perm의 약수)
+    guard: 질문 → 재사용 조건 키 (다르면 유사도와 무관하게 미적중, None이면 확인 안 함)
+    """
+
+    def __init__(self, threshold=0.85, ttl=3600, max_entries=2048, num_perm=64, bands=16, ngram=2,
+                 guard=question_guard):
+        if num_perm % bands:
+            raise ValueError('num_perm must be divisible by bands')
+
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ngram = ngram
+        self.guard = guard
+        self._perms = _permutations(num_perm)
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'exact_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def signature(self, normalized):
+        """
+        정규화된 질문의 MinHash 시그니처
+        """
+        hashes = [_base_hash(s) for s in _shingles(normalized, self.ngram)]
+        if not hashes:
+            return (0,) * self.num_perm
+        return tuple(
+            min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+            for a, b in self._perms
+        )
+
+    def _band_keys(self, scope, signature):
+        return [
+            (scope, band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    def lookup(self, game_type, question_text, user_question):
+        """
+        유사 질문 답변 조회 - (답변, 유사도) 또는 None
+        """
+        scope = (game_type, question_text)
+        normalized = normalize_question(user_question)
+        signature = self.signature(normalized)
+        guard = self.guard(user_question) if self.guard else None
+        now = time.monotonic()
+
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(scope, signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if entry['expires_at'] <= now:
+                    continue
+                if entry['normalized'] == normalized:
+                    best_id, best_similarity = entry_id, 1.0
+                    break
+                if entry['guard'] != guard:
+                    continue
+                matches = sum(1 for x, y in zip(signature, entry['signature']) if x == y)
+                similarity = matches / self.num_perm
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None or best_similarity < self.threshold:
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self._stats['exact_hits' if best_similarity == 1.0 else 'hits'] += 1
+            return self._entries[best_id]['answer'], best_similarity
+
+    def store(self, game_type, question_text, user_question, answer):
+        """
+        답변 저장
+        """
+        scope = (game_type, question_text)
+        normalized = normalize_question(user_question)
+        signature = self.signature(normalized)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            band_keys = self._band_keys(scope, signature)
+            self._entries[entry_id] = {
+                'normalized': normalized,
+                'signature': signature,
+                'guard': self.guard(user_question) if self.guard else None,
+                'answer': answer,
+                'band_keys': band_keys,
+                'expires_at': time.monotonic() + self.ttl
+            }
+            for key in band_keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+            self._stats['stores'] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def _evict_oldest(self):
+        entry_id, entry = self._entries.popitem(last=False)
+        for key in entry['band_keys']:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+        self._stats['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['exact_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['exact_hits']) / lookups, 3) if lookups else 0.0
+        return stats
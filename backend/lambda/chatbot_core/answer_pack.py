@@ -0,0 +1,392 @@
+"""
+사전 생성 답변 팩
+퀴즈 세트 발행 시 문항별 예상 질문(정답 이유, 핵심 개념, 실제 사례)의 답변을 미리 생성해
+버전이 있는 gzip JSON 파일로 저장하고, 챗봇 핸들러는 실시간 생성 전에 팩에서 먼저 답변
+
+생성은 Converse 호출을 초당 요청 수(--rps)와 동시 실행 수(--concurrency)로 제한해 수행
+(StartAsyncInvoke는 비동기 미디어 생성 모델 전용이라 Claude 텍스트 생성에는 사용할 수 없음)
+
+팩은 컨테이너당 한 번 로드하므로 새 팩은 재배포(또는 ANSWER_PACK_PATH가 가리키는
+레이어/EFS 파일 교체 후 새로 뜨는 컨테이너)부터 반영
+
+사용법:
+    curl -s https://<quiz-api>/prod/quizzes/all > quizzes.json
+    python3 -m chatbot_core.answer_pack build quizzes.json -o chatbot_core/data/answer_pack.json.gz
+    python3 -m chatbot_core.answer_pack lookup "왜 정답이 이거예요?" -q "퀴즈 문제 원문" -g BlackSwan
+"""
+import os
+import sys
+import gzip
+import json
+import math
+import time
+import hashlib
+import threading
+import logging
+from datetime import datetime, timezone
+
+from chatbot_core.lexicon import AhoCorasickMatcher, extract_terms
+from chatbot_core.context_budget import estimate_tokens
+from chatbot_core.quiz_index import iter_snapshot_questions
+
+logger = logging.getLogger()
+
+DEFAULT_PACK_PATH = os.environ.get(
+    'ANSWER_PACK_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'answer_pack.json.gz')
+)
+
+# 팩 파일 형식 버전 (호환되지 않는 변경 시 증가, 다른 버전 파일은 로드하지 않음)
+PACK_FORMAT = 1
+
+# 예상 질문 템플릿: 생성 프롬프트 + 사용자 질문 매칭 단서 (표현, 가중치)
+# 단서는 템플릿 질문에만 나오는 구절로 한정 ('왜', '실제' 같은 단어 하나로는 매칭하지 않음)
+TEMPLATES = {
+    'why_answer': {
+        'prompt': "왜 정답이 '{answer}'인지 설명해 주세요.",
+        'cues': (
+            ('왜 정답이', 3.0), ('왜 답이', 3.0), ('정답이 왜', 3.0), ('답이 왜', 3.0),
+            ('정답인 이유', 3.0), ('답인 이유', 3.0), ('이해가 안', 2.5), ('이해 안', 2.5),
+            ('헷갈', 2.5), ('납득이 안', 2.5), ('해설 좀', 2.5)
+        )
+    },
+    'key_concept': {
+        'prompt': "이 문제의 핵심 경제 개념을 쉽게 설명해 주세요.",
+        'cues': (
+            ('핵심 개념', 3.0), ('무슨 개념', 3.0), ('어떤 개념', 3.0), ('개념 설명', 3.0),
+            ('개념을 설명', 3.0), ('쉽게 설명', 2.5), ('무슨 말인지', 2.5)
+        )
+    },
+    'real_world': {
+        'prompt': "이 문제와 관련된 실제 경제 사례를 알려주세요.",
+        'cues': (
+            ('실제 사례', 3.0), ('현실 사례', 3.0), ('실제 예시', 3.0), ('사례 알려', 3.0),
+            ('사례가 있', 2.5), ('사례를 들어', 2.5), ('실생활', 2.5)
+        )
+    }
+}
+
+# 템플릿 매칭 로지스틱 점수 (IntentRouter와 같은 방식)
+# 단서 하나(2.5 이상)만으로 threshold를 넘고, 질문이 길수록 구체적인 질문으로 보고 감점
+MATCH_BIAS = -1.0
+MATCH_LENGTH_WEIGHT = -0.08      # 12토큰 초과분 토큰당
+ANSWER_PACK_THRESHOLD = float(os.environ.get('ANSWER_PACK_THRESHOLD', '0.75'))
+
+# 이보다 긴 질문은 구체적인 질문으로 보고 실시간 생성
+MAX_QUESTION_TOKENS = 40
+
+SYSTEM_PROMPT = """당신은 경제 퀴즈 해설 도우미입니다.
+주어진 퀴즈 문제, 정답, 해설을 바탕으로 플레이어의 질문에 한국어로 답하세요.
+- 해설에 없는 사실을 지어내지 말 것
+- 300자 내외, 핵심부터 설명"""
+
+
+def question_key(game_type, question_text):
+    """
+    팩 항목 키 - 게임 종류 + 문제 원문(공백 정규화)의 해시
+    """
+    normalized = ' '.join((question_text or '').split())
+    return hashlib.sha1(f"{game_type}\n{normalized}".encode('utf-8')).hexdigest()[:16]
+
+
+def _source_hash(question):
+    """
+    정답/해설이 바뀌었는지 확인하는 해시 (바뀐 문항만 다시 생성)
+    """
+    source = json.dumps(
+        [question.get('answer', ''), question.get('explanation', ''), question.get('choices', [])],
+        ensure_ascii=False
+    )
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+
+
+def build_request(question, template):
+    """
+    문항 + 템플릿 → Anthropic Messages 형식 요청 본문 (ModelRouter.converse 입력)
+    """
+    lines = [f"퀴즈 문제: {question.get('question', '')}"]
+    if question.get('choices'):
+        lines.append("보기: " + " / ".join(str(choice) for choice in question['choices']))
+    lines.append(f"정답: {question.get('answer', '')}")
+    if question.get('explanation'):
+        lines.append(f"해설: {question['explanation']}")
+    lines.append("")
+    lines.append(f"플레이어 질문: {TEMPLATES[template]['prompt'].format(answer=question.get('answer', ''))}")
+
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 600,
+        "system": SYSTEM_PROMPT,
+        "messages": [{"role": "user", "content": "\n".join(lines)}],
+        "temperature": 0.3
+    }
+
+
+class RateLimiter:
+    """
+    초당 요청 수 제한 (스레드 간 공유, 호출 간격을 균등하게 배분)
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(self._next, now) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def generate_pack(snapshot, generate, existing=None, rps=1.0, concurrency=2, templates=None):
+    """
+    스냅샷 문항별 템플릿 답변 생성 - 반환: (팩 dict, {'generated', 'reused', 'failed'})
+
+    generate(request_body) → 답변 텍스트
+    existing 팩에서 정답/해설이 같은 문항의 답변은 다시 생성하지 않고 재사용
+    """
+    from chatbot_core.batch import fan_out
+
+    templates = templates or list(TEMPLATES)
+    previous = (existing or {}).get('entries', {})
+    entries = {}
+    jobs = []
+    counts = {'generated': 0, 'reused': 0, 'failed': 0}
+
+    for game_type, quiz_date, question in iter_snapshot_questions(snapshot):
+        if not question.get('question') or not question.get('answer'):
+            continue
+        key = question_key(game_type, question['question'])
+        source_hash = _source_hash(question)
+        old = previous.get(key)
+        reusable = old['answers'] if old and old.get('source') == source_hash else {}
+
+        entries[key] = {
+            'gameType': game_type,
+            'quizDate': quiz_date,
+            'source': source_hash,
+            'answer': str(question['answer']),
+            'answers': {}
+        }
+        for template in templates:
+            if template in reusable:
+                entries[key]['answers'][template] = reusable[template]
+                counts['reused'] += 1
+            else:
+                jobs.append((key, template, build_request(question, template)))
+
+    limiter = RateLimiter(rps)
+
+    def worker(job):
+        limiter.acquire()
+        return generate(job[2])
+
+    # 오프라인 작업이므로 데드라인 대신 충분히 긴 시간 예산
+    deadline = time.monotonic() + 6 * 3600
+    for index, status, result in fan_out(jobs, worker, concurrency, deadline):
+        key, template, _ = jobs[index]
+        if status == 'ok' and result:
+            entries[key]['answers'][template] = result.strip()
+            counts['generated'] += 1
+        else:
+            counts['failed'] += 1
+            logger.warning(f"Answer pack generation failed: {key}/{template} ({status})")
+
+    pack = {
+        'format': PACK_FORMAT,
+        'version': datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S'),
+        'templates': {name: TEMPLATES[name]['prompt'] for name in templates},
+        'entries': entries
+    }
+    return pack, counts
+
+
+def write_pack(pack, path):
+    """
+    gzip JSON으로 원자적 저장
+    """
+    tmp_path = f"{path}.tmp"
+    payload = json.dumps(pack, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with gzip.open(tmp_path, 'wb', compresslevel=9) as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def read_pack(path):
+    with gzip.open(path, 'rb') as f:
+        pack = json.loads(f.read().decode('utf-8'))
+    if pack.get('format') != PACK_FORMAT:
+        raise ValueError(f"Unsupported answer pack format: {pack.get('format')}")
+    return pack
+
+
+class AnswerPack:
+    """
+    로드된 답변 팩 - (게임, 문제 원문, 사용자 질문)으로 템플릿 답변 조회
+    """
+
+    def __init__(self, pack, threshold=ANSWER_PACK_THRESHOLD):
+        self.version = pack.get('version')
+        self.entries = pack.get('entries', {})
+        self.threshold = threshold
+        self._matcher = AhoCorasickMatcher([
+            (cue, weight, template)
+            for template, spec in TEMPLATES.items()
+            for cue, weight in spec['cues']
+        ])
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def match_template(self, user_question, quiz_text=''):
+        """
+        사용자 질문에 해당하는 템플릿 - 확신도가 threshold 이상이면 (템플릿, 확신도), 아니면 None
+        퀴즈 문제/정답(quiz_text)에 없는 경제 용어가 질문에 있으면 다른 내용을 묻는 질문이므로 None
+        """
+        tokens = estimate_tokens(user_question)
+        if tokens > MAX_QUESTION_TOKENS:
+            return None
+        cue_scores = {}
+        for _, _, weight, template in self._matcher.find_longest(user_question):
+            cue_scores[template] = cue_scores.get(template, 0.0) + weight
+        if not cue_scores:
+            return None
+
+        quiz_terms = set(extract_terms(quiz_text, limit=20))
+        if any(term not in quiz_terms for term in extract_terms(user_question, limit=5)):
+            return None
+
+        template = max(cue_scores, key=cue_scores.get)
+        value = MATCH_BIAS + cue_scores[template] + MATCH_LENGTH_WEIGHT * max(tokens - 12, 0)
+        confidence = round(1 / (1 + math.exp(-value)), 3)
+        if confidence < self.threshold:
+            return None
+        return template, confidence
+
+    def lookup(self, game_type, question_text, user_question):
+        """
+        (템플릿, 답변) 또는 None
+        """
+        entry = self.entries.get(question_key(game_type, question_text)) if question_text else None
+        matched = self.match_template(user_question, f"{question_text}\n{entry.get('answer', '')}") if entry else None
+        template = matched[0] if matched else None
+        answer = entry['answers'].get(template) if template else None
+
+        with self._lock:
+            self._stats['hits' if answer else 'misses'] += 1
+        return (template, answer) if answer else None
+
+    def stats(self):
+        with self._lock:
+            return {'version': self.version, 'entries': len(self.entries), **self._stats}
+
+
+_pack = None
+_pack_loaded = False
+_lock = threading.Lock()
+
+
+def get_answer_pack(path=None):
+    """
+    컨테이너 단위 답변 팩 (최초 호출 시 로드, 파일이 없거나 형식이 다르면 None)
+    """
+    global _pack, _pack_loaded
+
+    if _pack_loaded:
+        return _pack
+
+    with _lock:
+        if not _pack_loaded:
+            pack_path = path or DEFAULT_PACK_PATH
+            if os.path.exists(pack_path):
+                try:
+                    _pack = AnswerPack(read_pack(pack_path))
+                    logger.info(f"Answer pack loaded: version {_pack.version}, {len(_pack.entries)} questions")
+                except (OSError, ValueError) as e:
+                    logger.error(f"Answer pack load failed: {str(e)}")
+            else:
+                logger.info(f"Answer pack not found: {pack_path}")
+            _pack_loaded = True
+    return _pack
+
+
+def _prune_dates(pack, keep_dates):
+    """
+    최근 keep_dates개 퀴즈 날짜의 항목만 유지
+    """
+    dates = sorted({entry['quizDate'] for entry in pack['entries'].values()}, reverse=True)[:keep_dates]
+    pack['entries'] = {key: entry for key, entry in pack['entries'].items() if entry['quizDate'] in dates}
+
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python3 -m chatbot_core.answer_pack')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='스냅샷 문항별 예상 질문 답변 생성')
+    build_parser.add_argument('snapshot')
+    build_parser.add_argument('-o', '--output', default=DEFAULT_PACK_PATH)
+    build_parser.add_argument('--rps', type=float, default=1.0, help='초당 Bedrock 호출 수')
+    build_parser.add_argument('--concurrency', type=int, default=2)
+    build_parser.add_argument('--keep-dates', type=int, default=14, help='유지할 최근 퀴즈 날짜 수')
+    build_parser.add_argument('--fresh', action='store_true', help='기존 팩 답변을 재사용하지 않음')
+
+    lookup_parser = subparsers.add_parser('lookup', help='팩에서 답변 조회')
+    lookup_parser.add_argument('question')
+    lookup_parser.add_argument('-q', '--question-text', required=True)
+    lookup_parser.add_argument('-g', '--game-type', required=True)
+    lookup_parser.add_argument('-p', '--pack', default=DEFAULT_PACK_PATH)
+
+    args = parser.parse_args(argv[1:])
+
+    if args.command == 'lookup':
+        result = AnswerPack(read_pack(args.pack)).lookup(args.game_type, args.question_text, args.question)
+        if result is None:
+            print("(no match - live generation)")
+            return 1
+        print(f"[{result[0]}] {result[1]}")
+        return 0
+
+    from chatbot_core.model_router import ModelRouter, bedrock_client_config
+    from chatbot_core.regions import RegionPool
+
+    logging.basicConfig(level=logging.INFO)
+    with open(args.snapshot, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+
+    existing = None
+    if not args.fresh and os.path.exists(args.output):
+        existing = read_pack(args.output)
+
+    router = ModelRouter()
+    region_pool = RegionPool(config=bedrock_client_config)
+    started = time.perf_counter()
+    pack, counts = generate_pack(
+        snapshot,
+        # 문항마다 새 프록시 (리전 오류 기록은 요청 단위)
+        lambda request_body: router.converse(region_pool.bedrock(), request_body, 'complex'),
+        existing=existing,
+        rps=args.rps,
+        concurrency=args.concurrency
+    )
+
+    # 이번 스냅샷에 없는 이전 문항도 최근 날짜 범위 안이면 유지
+    if existing:
+        for key, entry in existing.get('entries', {}).items():
+            pack['entries'].setdefault(key, entry)
+    _prune_dates(pack, args.keep_dates)
+
+    write_pack(pack, args.output)
+    elapsed = time.perf_counter() - started
+    mark = '⚠️' if counts['failed'] else '✅'
+    print(f"{mark} answer pack {pack['version']}: {len(pack['entries'])} questions, "
+          f"{counts['generated']} generated / {counts['reused']} reused / {counts['failed']} failed "
+          f"({elapsed:.1f}s) → {args.output} ({os.path.getsize(args.output) / 1024:.1f}KB)")
+    return 0 if not counts['failed'] else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
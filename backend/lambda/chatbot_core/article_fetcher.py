@@ -0,0 +1,352 @@
+"""
+퀴즈 관련 기사 본문 수집
+공유 HTTP 세션으로 스트리밍 읽기(바이트 상한) + 점진적 HTML 본문 추출,
+URL 단위 캐시와 ETag/If-Modified-Since 재검증으로 같은 기사는 한 번만 내려받음
+"""
+import re
+import time
+import codecs
+import threading
+import logging
+from collections import OrderedDict
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from chatbot_core.http_session import get_session
+
+logger = logging.getLogger()
+
+# 본문 컨테이너로 보는 id/class/itemprop 값 (서울경제 등 국내 언론사 기사 템플릿)
+_BODY_MARKERS = ('articlebody', 'article_body', 'article-body', 'article_view', 'article_txt',
+                 'article_con', 'news_body', 'view_con', 'newsct_article')
+# 본문 추출에서 제외하는 요소
+_SKIP_TAGS = {'script', 'style', 'noscript', 'iframe', 'header', 'footer', 'nav', 'aside',
+              'form', 'button', 'select', 'figcaption', 'svg'}
+# 문단 경계로 보는 요소
+_BLOCK_TAGS = {'p', 'div', 'br', 'li', 'h1', 'h2', 'h3', 'h4', 'section', 'article', 'table', 'tr'}
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+              'source', 'track', 'wbr'}
+
+_CHARSET_PATTERN = re.compile(r'charset=["\']?([\w-]+)', re.IGNORECASE)
+_SPACE_PATTERN = re.compile(r'\s+')
+
+
+class _ArticleTextParser(HTMLParser):
+    """
+    청크 단위로 feed 받는 본문 추출기 - 문단 텍스트만 보관
+    본문 컨테이너가 닫히거나 글자 수 상한에 도달하면 done
+    """
+
+    def __init__(self, max_chars, min_paragraph_chars=20):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.min_paragraph_chars = min_paragraph_chars
+        self.title = ''
+        self.paragraphs = []
+        self.fallback_paragraphs = []
+        self.chars = 0
+        self.done = False
+        self._stack = []
+        self._body_depth = None
+        self._skip_depth = None
+        self._in_title = False
+        self._in_paragraph = False
+        self._buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+
+        if tag == 'meta':
+            attributes = dict(attrs)
+            if attributes.get('property') == 'og:title' and attributes.get('content'):
+                self.title = attributes['content'].strip()
+            return
+        if tag in _VOID_TAGS:
+            if tag == 'br':
+                self._flush()
+            return
+
+        self._stack.append(tag)
+        if tag == 'title' and not self.title:
+            self._in_title = True
+        if self._skip_depth is None and tag in _SKIP_TAGS:
+            self._skip_depth = len(self._stack)
+        if tag in _BLOCK_TAGS:
+            self._flush()
+            self._in_paragraph = tag == 'p'
+
+        if self._body_depth is None and not self.paragraphs:
+            attributes = dict(attrs)
+            marker = ' '.join(attributes.get(name) or '' for name in ('id', 'class', 'itemprop')).lower()
+            if any(name in marker for name in _BODY_MARKERS):
+                self._body_depth = len(self._stack)
+
+    def handle_endtag(self, tag):
+        if self.done or tag not in self._stack:
+            return
+
+        # 닫히지 않은 하위 요소까지 함께 닫음
+        while self._stack:
+            depth = len(self._stack)
+            closed = self._stack.pop()
+            if closed in _BLOCK_TAGS:
+                self._flush()
+            if closed == 'title':
+                self._in_title = False
+            if self._skip_depth == depth:
+                self._skip_depth = None
+            if self._body_depth == depth:
+                self._body_depth = None
+                self._flush()
+                self.done = bool(self.paragraphs)
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if self.done:
+            return
+        if self._in_title:
+            self.title = self.title or data.strip()
+            return
+        if self._skip_depth is None:
+            self._buffer.append(data)
+
+    def _flush(self):
+        text = _SPACE_PATTERN.sub(' ', ''.join(self._buffer)).strip()
+        self._buffer = []
+        in_paragraph = self._in_paragraph
+        self._in_paragraph = False
+        if len(text) < self.min_paragraph_chars:
+            return
+
+        if self._body_depth is not None:
+            self.paragraphs.append(text)
+            self.chars += len(text)
+            if self.chars >= self.max_chars:
+                self.done = True
+        elif in_paragraph:
+            # 본문 컨테이너를 못 찾은 페이지용 후보 (<p> 문단)
+            self.fallback_paragraphs.append(text)
+
+    def result(self):
+        self._flush()
+        paragraphs = self.paragraphs or self.fallback_paragraphs
+
+        selected = []
+        chars = 0
+        for paragraph in paragraphs:
+            if chars >= self.max_chars:
+                break
+            selected.append(paragraph[:self.max_chars - chars])
+            chars += len(selected[-1])
+        return self.title, selected
+
+
+def extract_article_text(chunks, max_chars=4000, encoding='utf-8'):
+    """
+    바이트 청크 이터러블에서 (제목, 문단 목록, 읽은 바이트 수) 추출
+    본문이 끝나면 나머지 청크는 읽지 않음
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    parser = _ArticleTextParser(max_chars)
+    bytes_read = 0
+    for chunk in chunks:
+        bytes_read += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.done:
+            break
+    else:
+        parser.feed(decoder.decode(b'', final=True))
+
+    title, paragraphs = parser.result()
+    return title, paragraphs, bytes_read
+
+
+class ArticleFetcher:
+    """
+    URL 단위 기사 캐시
+    fresh_ttl 동안은 네트워크 없이 응답, 이후에는 조건부 GET(304면 본문 재사용)
+    같은 URL 동시 요청은 하나의 다운로드를 공유
+    """
+
+    def __init__(self, allowed_hosts=('sedaily.com',), max_bytes=524288, max_chars=4000,
+                 fresh_ttl=300, negative_ttl=60, max_entries=64, timeout=(3, 5), max_redirects=3):
+        self.allowed_hosts = tuple(host.lower() for host in allowed_hosts)
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.fresh_ttl = fresh_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self._entries = OrderedDict()
+        self._url_locks = {}
+        self._lock = threading.Lock()
+        self._stats = {'fresh_hits': 0, 'revalidated': 0, 'downloads': 0, 'stale_served': 0,
+                       'errors': 0, 'bytes_read': 0, 'truncated': 0}
+
+    def is_allowed(self, url):
+        """
+        허용된 호스트의 http(s) URL인지 확인 (사용자 입력 URL로 임의 요청 방지)
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        if parts.scheme not in ('http', 'https') or not host:
+            return False
+        return any(host == allowed or host.endswith('.' + allowed) for allowed in self.allowed_hosts)
+
+    def fetch(self, url):
+        """
+        기사 반환: {'url', 'title', 'paragraphs', 'bytes_read', 'truncated'} 또는 None
+        """
+        if not self.is_allowed(url):
+            logger.warning(f"Article host not allowed: {url}")
+            return None
+
+        entry = self._fresh_entry(url)
+        if entry is not None:
+            return entry['article']
+
+        with self._url_lock(url):
+            # 대기하는 동안 다른 스레드가 받아왔으면 그대로 사용
+            entry = self._fresh_entry(url)
+            if entry is not None:
+                return entry['article']
+            return self._refresh(url)
+
+    def _url_lock(self, url):
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _fresh_entry(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry['fresh_until'] <= time.monotonic():
+                return None
+            self._entries.move_to_end(url)
+            self._stats['fresh_hits'] += 1
+            return entry
+
+    def _refresh(self, url):
+        with self._lock:
+            cached = self._entries.get(url)
+
+        headers = {'Accept': 'text/html', 'Accept-Encoding': 'gzip, deflate'}
+        if cached and cached['article']:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            response = self._get(url, headers)
+            try:
+                if response.status_code == 304 and cached and cached['article']:
+                    self._store(url, cached['article'], cached['etag'], cached['last_modified'], self.fresh_ttl)
+                    self._count('revalidated')
+                    return cached['article']
+
+                if response.status_code != 200:
+                    raise ValueError(f"HTTP {response.status_code}")
+                content_type = response.headers.get('Content-Type', '')
+                if 'html' not in content_type:
+                    raise ValueError(f"Unsupported content type: {content_type}")
+
+                article = self._read(url, response)
+                self._count('downloads')
+                self._store(url, article, response.headers.get('ETag'),
+                            response.headers.get('Last-Modified'),
+                            self.fresh_ttl if article else self.negative_ttl)
+                return article
+            finally:
+                response.close()
+
+        except Exception as e:
+            logger.error(f"Article fetch failed ({url}): {str(e)}")
+            self._count('errors')
+            # 재검증 실패 시 이전 본문 사용 (stale-if-error)
+            if cached and cached['article']:
+                self._store(url, cached['article'], cached['etag'], cached['last_modified'], self.negative_ttl)
+                self._count('stale_served')
+                return cached['article']
+            self._store(url, None, None, None, self.negative_ttl)
+            return None
+
+    def _get(self, url, headers):
+        """
+        리다이렉트를 직접 따라가며 매 단계 호스트 검사
+        """
+        session = get_session()
+        for _ in range(self.max_redirects + 1):
+            response = session.get(url, headers=headers, timeout=self.timeout, stream=True,
+                                   allow_redirects=False)
+            if not response.is_redirect:
+                return response
+            location = urljoin(url, response.headers.get('Location', ''))
+            response.close()
+            if not self.is_allowed(location):
+                raise ValueError(f"Redirect to disallowed host: {location}")
+            url = location
+        raise ValueError('Too many redirects')
+
+    def _read(self, url, response):
+        match = _CHARSET_PATTERN.search(response.headers.get('Content-Type', ''))
+        encoding = match.group(1) if match else 'utf-8'
+
+        truncated = False
+
+        def capped_chunks():
+            nonlocal truncated
+            remaining = self.max_bytes
+            for chunk in response.iter_content(chunk_size=16384):
+                if len(chunk) >= remaining:
+                    truncated = True
+                    yield chunk[:remaining]
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+        title, paragraphs, bytes_read = extract_article_text(capped_chunks(), self.max_chars, encoding)
+        with self._lock:
+            self._stats['bytes_read'] += bytes_read
+            self._stats['truncated'] += int(truncated)
+
+        logger.info(f"Article fetched: {url} ({bytes_read}B read, {len(paragraphs)} paragraphs"
+                    f"{', truncated' if truncated else ''})")
+        if not paragraphs:
+            return None
+        return {
+            'url': url,
+            'title': title,
+            'paragraphs': paragraphs,
+            'bytes_read': bytes_read,
+            'truncated': truncated
+        }
+
+    def _store(self, url, article, etag, last_modified, ttl):
+        with self._lock:
+            self._entries[url] = {
+                'article': article,
+                'etag': etag,
+                'last_modified': last_modified,
+                'fresh_until': time.monotonic() + ttl
+            }
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._url_locks.pop(evicted, None)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        return stats
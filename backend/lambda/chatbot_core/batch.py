@@ -0,0 +1,76 @@
+"""
+배치 요청 처리
+여러 질문을 중복 제거 후 제한된 동시성으로 병렬 처리하고, 항목별 오류를 격리하며
+전체 데드라인을 넘긴 항목은 기다리지 않고 timeout으로 반환
+"""
+import time
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+logger = logging.getLogger()
+
+
+def dedupe(items, key):
+    """
+    같은 키의 항목을 하나로 합침 - (고유 항목 목록, 원래 인덱스 → 고유 항목 인덱스)
+    """
+    unique = []
+    positions = {}
+    mapping = []
+    for item in items:
+        item_key = key(item)
+        if item_key not in positions:
+            positions[item_key] = len(unique)
+            unique.append(item)
+        mapping.append(positions[item_key])
+    return unique, mapping
+
+
+def fan_out(items, worker, max_concurrency, deadline):
+    """
+    항목별로 worker(item)를 병렬 실행하고 완료되는 순서대로 (인덱스, 상태, 결과) yield
+    상태: 'ok' | 'error' (결과는 예외) | 'timeout' (결과는 None)
+
+    배치 전용 스레드 풀 사용 - worker가 내부에서 RAG 스레드 풀을 쓰므로 같은 풀을 쓰면 교착 가능
+    """
+    if not items:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(min(max_concurrency, len(items)), 1), thread_name_prefix='batch')
+    # 항목은 제출 시점의 컨텍스트(호출별 추적)에서 실행
+    futures = {executor.submit(contextvars.copy_context().run, worker, item): index for index, item in enumerate(items)}
+    pending = set(futures)
+
+    try:
+        for future in as_completed(futures, timeout=max(deadline - time.monotonic(), 0)):
+            pending.discard(future)
+            index = futures[future]
+            try:
+                yield index, 'ok', future.result()
+            except Exception as e:
+                logger.error(f"Batch item {index} failed: {str(e)}")
+                yield index, 'error', e
+    except FuturesTimeoutError:
+        logger.warning(f"Batch deadline reached, {len(pending)} items dropped")
+        for future in sorted(pending, key=futures.get):
+            future.cancel()
+            yield futures[future], 'timeout', None
+    finally:
+        # 실행 중인 항목은 백그라운드에서 자연 종료 (응답을 기다리지 않음)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def in_order(results):
+    """
+    완료 순서의 (인덱스, ...) 결과를 입력 순서로 재배열 - 앞 항목이 끝나는 대로 바로 내보냄
+    """
+    buffered = {}
+    next_index = 0
+    for result in results:
+        buffered[result[0]] = result
+        while next_index in buffered:
+            yield buffered.pop(next_index)
+            next_index += 1
+    for index in sorted(buffered):
+        yield buffered[index]
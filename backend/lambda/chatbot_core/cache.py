@@ -0,0 +1,127 @@
+"""
+TTL + LRU 인프로세스 캐시
+선택적으로 /tmp 디렉토리에 JSON으로 내려쓰는 2차 저장소 지원
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger()
+
+
+class TTLCache:
+    """
+    크기 제한 LRU 캐시 (항목별 만료 시간)
+    값이 None인 항목은 부정 캐시(negative cache)로 짧은 TTL 적용
+    """
+
+    def __init__(self, max_entries=256, ttl=600, negative_ttl=60, spill_dir=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'negative_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        if spill_dir:
+            try:
+                os.makedirs(spill_dir, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Cache spill dir unavailable ({spill_dir}): {str(e)}")
+                self.spill_dir = None
+
+    def get(self, key):
+        """
+        (적중 여부, 값) 반환 - 부정 캐시 적중 시 (True, None)
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['negative_hits' if value is None else 'hits'] += 1
+                    return True, value
+                del self._entries[key]
+
+        found, value, remaining = self._read_spill(key)
+        with self._lock:
+            if found:
+                self._store(key, value, now + remaining)
+                self._stats['disk_hits'] += 1
+                return True, value
+            self._stats['misses'] += 1
+        return False, None
+
+    def set(self, key, value, ttl=None):
+        """
+        값 저장 (None은 부정 캐시 TTL 적용)
+        """
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+
+        with self._lock:
+            self._store(key, value, time.monotonic() + ttl)
+
+        self._write_spill(key, value, ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['negative_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _store(self, key, value, expires_at):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _spill_path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.json")
+
+    def _read_spill(self, key):
+        """
+        디스크 저장소 조회 - (발견 여부, 값, 남은 TTL 초)
+        """
+        if not self.spill_dir:
+            return False, None, 0
+
+        try:
+            with open(self._spill_path(key), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return False, None, 0
+
+        remaining = record.get('expires_at', 0) - time.time()
+        if remaining <= 0:
+            return False, None, 0
+        return True, record.get('value'), remaining
+
+    def _write_spill(self, key, value, ttl):
+        if not self.spill_dir:
+            return
+
+        path = self._spill_path(key)
+        try:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'expires_at': time.time() + ttl, 'value': value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Cache spill write failed: {str(e)}")
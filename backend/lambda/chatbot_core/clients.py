@@ -0,0 +1,96 @@
+"""
+AWS 클라이언트 레지스트리
+boto3 클라이언트를 컨테이너당 한 번만 생성하여 호출 간 재사용
+"""
+import copy
+import threading
+import logging
+
+from chatbot_core.lazy import lazy_import
+
+# boto3는 첫 클라이언트 생성 시점에 import (OPTIONS/검증 오류 경로는 SDK 로딩 없음)
+boto3 = lazy_import('boto3')
+
+logger = logging.getLogger()
+
+# (service, region, config, endpoint) 키별 클라이언트 캐시
+_clients = {}
+_lock = threading.Lock()
+_session = None
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _config_key(config):
+    """
+    botocore Config를 해시 가능한 키로 변환
+    """
+    if config is None:
+        return None
+    options = getattr(config, '_user_provided_options', {})
+    return tuple(sorted((name, repr(value)) for name, value in options.items()))
+
+
+def get_client(service_name, region_name=None, config=None, endpoint_url=None):
+    """
+    캐시된 boto3 클라이언트 반환 (없으면 생성)
+    클라이언트 생성은 lock 안에서 수행 (boto3 Session은 스레드 안전하지 않음)
+    endpoint_url: 로컬 대체 서비스용 (예: DynamoDB Local)
+    """
+    global _session
+
+    key = (service_name, region_name, _config_key(config), endpoint_url)
+
+    with _lock:
+        client = _clients.get(key)
+        if client is not None:
+            _stats['hits'] += 1
+            return client
+
+        _stats['misses'] += 1
+        if _session is None:
+            _session = boto3.Session()
+
+        # botocore가 클라이언트 생성 중 Config.retries를 고쳐 쓰므로 (max_attempts → total_max_attempts)
+        # 복사본을 넘겨 같은 설정 객체의 캐시 키가 바뀌지 않게 함 (예열한 클라이언트를 요청이 그대로 재사용)
+        client = _session.client(
+            service_name=service_name,
+            region_name=region_name,
+            config=copy.deepcopy(config),
+            endpoint_url=endpoint_url
+        )
+        _clients[key] = client
+
+    logger.info(f"AWS client created: {service_name} ({region_name})")
+    return client
+
+
+def get_bedrock_client(region_name='us-east-1', config=None):
+    """
+    Bedrock Runtime 클라이언트 반환
+    """
+    return get_client('bedrock-runtime', region_name=region_name, config=config)
+
+
+def get_client_stats():
+    """
+    클라이언트 레지스트리 적중/미스 통계
+    """
+    with _lock:
+        return {
+            'hits': _stats['hits'],
+            'misses': _stats['misses'],
+            'clients': len(_clients)
+        }
+
+
+def reset_clients():
+    """
+    캐시된 클라이언트와 통계 초기화 (테스트/디버깅용)
+    """
+    global _session
+
+    with _lock:
+        _clients.clear()
+        _session = None
+        _stats['hits'] = 0
+        _stats['misses'] = 0
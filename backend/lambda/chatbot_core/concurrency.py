@@ -0,0 +1,86 @@
+"""
+RAG 소스 병렬 수집
+컨테이너 단위 스레드 풀과 요청별 데드라인 관리
+"""
+import os
+import time
+import threading
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger()
+
+# 동시 수집 워커 수 (환경 변수로 조정)
+MAX_WORKERS = int(os.environ.get('RAG_MAX_WORKERS', '4'))
+
+# Bedrock 호출을 위해 남겨둘 시간과 수집 단계 최대 예산 (ms)
+DEFAULT_RESERVE_MS = int(os.environ.get('RAG_BEDROCK_RESERVE_MS', '20000'))
+DEFAULT_BUDGET_MS = int(os.environ.get('RAG_GATHER_BUDGET_MS', '5000'))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    컨테이너 단위 스레드 풀 반환 (최초 호출 시 생성)
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS,
+                thread_name_prefix='rag'
+            )
+        return _executor
+
+
+def deadline_from_context(context, reserve_ms=DEFAULT_RESERVE_MS, max_budget_ms=DEFAULT_BUDGET_MS):
+    """
+    Lambda context의 남은 시간으로 수집 데드라인(monotonic) 계산
+    context가 없으면 (로컬 실행) 최대 예산을 그대로 사용
+    """
+    budget_ms = max_budget_ms
+
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        remaining_ms = context.get_remaining_time_in_millis()
+        budget_ms = min(max_budget_ms, remaining_ms - reserve_ms)
+
+    return time.monotonic() + max(budget_ms, 0) / 1000.0
+
+
+def gather_with_deadline(tasks, deadline):
+    """
+    (이름, 함수) 목록을 병렬 실행하고 데드라인까지 완료된 결과만 반환
+    데드라인을 넘긴 작업은 기다리지 않고 버림 (백그라운드에서 자연 종료)
+    작업은 제출 시점의 컨텍스트(호출별 추적)에서 실행
+
+    반환: (결과 dict, 작업별 상태 dict - 'ok' | 'error' | 'timeout')
+    """
+    executor = get_executor()
+    futures = {executor.submit(contextvars.copy_context().run, func): name for name, func in tasks}
+
+    timeout = max(deadline - time.monotonic(), 0)
+    done, not_done = wait(futures, timeout=timeout)
+
+    results = {}
+    status = {}
+
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+            status[name] = 'ok'
+        except Exception as e:
+            logger.error(f"RAG source '{name}' failed: {str(e)}")
+            status[name] = 'error'
+
+    for future in not_done:
+        name = futures[future]
+        future.cancel()
+        status[name] = 'timeout'
+        logger.warning(f"RAG source '{name}' missed deadline, dropped")
+
+    return results, status
@@ -0,0 +1,125 @@
+"""
+토큰 예산 기반 RAG 컨텍스트 조립
+질문과의 겹침 정도로 구절(passage)을 정렬하고 예산 안에서 탐욕적으로 채움
+"""
+import re
+import json
+import math
+import logging
+
+logger = logging.getLogger()
+
+_WORD_PATTERN = re.compile(r'[0-9A-Za-z가-힣]+')
+
+
+def estimate_tokens(text):
+    """
+    로컬 토큰 수 추정 (Claude 토크나이저 근사)
+    ASCII는 약 4자당 1토큰, 한글 등 비ASCII는 글자당 약 0.7토큰
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    other_chars = len(text) - ascii_chars
+    return math.ceil(ascii_chars / 4 + other_chars * 0.7)
+
+
+def count_tokens_remote(bedrock, model_id, request_body):
+    """
+    Bedrock CountTokens로 실제 입력 토큰 수 조회 (실패 시 None)
+    """
+    try:
+        response = bedrock.count_tokens(
+            modelId=model_id,
+            input={'invokeModel': {'body': json.dumps(request_body).encode('utf-8')}}
+        )
+        return response.get('inputTokens')
+    except Exception as e:
+        logger.warning(f"CountTokens failed: {str(e)}")
+        return None
+
+
+def _terms(text):
+    """
+    겹침 계산용 용어 집합 (단어 + 한글 2-gram, 조사가 붙은 어절도 매칭되도록)
+    """
+    terms = set()
+    for word in _WORD_PATTERN.findall(text.lower()):
+        terms.add(word)
+        if len(word) > 2:
+            terms.update(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def overlap_score(question_terms, passage):
+    """
+    질문 용어 중 구절에 등장하는 비율
+    """
+    if not question_terms:
+        return 0.0
+    return len(question_terms & _terms(passage)) / len(question_terms)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    추정 토큰 수가 max_tokens 이하가 되도록 뒤를 잘라냄
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) + 1 <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low].rstrip() + '…'
+
+
+def select_passages(question, candidates, token_budget, max_passage_tokens=300):
+    """
+    후보 구절을 예산 안에서 선택
+
+    candidates: [{'source': 인덱스, 'text': 구절, 'pinned': bool}, ...]
+    pinned 구절(퀴즈 문제 등)은 관련도와 관계없이 먼저 배치
+
+    반환: (선택된 후보 목록 - 원래 순서, 통계 dict)
+    """
+    question_terms = _terms(question)
+
+    scored = []
+    candidate_tokens = 0
+    for order, candidate in enumerate(candidates):
+        full_tokens = estimate_tokens(candidate['text'])
+        candidate_tokens += full_tokens
+        text = truncate_to_tokens(candidate['text'], max_passage_tokens)
+        scored.append({
+            **candidate,
+            'text': text,
+            'tokens': estimate_tokens(text),
+            'score': overlap_score(question_terms, text),
+            'order': order
+        })
+
+    ranked = sorted(scored, key=lambda c: (not c.get('pinned'), -c['score'], c['order']))
+
+    selected = []
+    used_tokens = 0
+    for candidate in ranked:
+        if used_tokens + candidate['tokens'] > token_budget:
+            continue
+        selected.append(candidate)
+        used_tokens += candidate['tokens']
+
+    selected.sort(key=lambda c: c['order'])
+
+    stats = {
+        'candidates': len(candidates),
+        'selected': len(selected),
+        'candidate_tokens': candidate_tokens,
+        'used_tokens': used_tokens,
+        'saved_tokens': candidate_tokens - used_tokens,
+        'budget': token_budget
+    }
+    return selected, stats
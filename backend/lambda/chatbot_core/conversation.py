@@ -0,0 +1,292 @@
+"""
+멀티턴 대화 메모리
+클라이언트 세션 ID별로 최근 대화 턴을 보관하고, 오래된 턴은 요약으로 접어 프롬프트 길이를 일정하게 유지
+저장소는 교체 가능 (인프로세스 dict / /tmp 파일 / DynamoDB)
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+from chatbot_core.context_budget import estimate_tokens, truncate_to_tokens
+
+logger = logging.getLogger()
+
+_SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{1,128}$')
+_SENTENCE_PATTERN = re.compile(r'(?<=[.!?。])\s+|\n+')
+
+
+def valid_session_id(session_id):
+    """
+    저장소 키로 사용할 수 있는 세션 ID인지 확인
+    """
+    return isinstance(session_id, str) and bool(_SESSION_ID_PATTERN.match(session_id))
+
+
+class MemoryBackend:
+    """
+    인프로세스 LRU 저장소 (컨테이너 단위, 재시작 시 사라짐)
+    """
+
+    def __init__(self, max_sessions=1000):
+        self.max_sessions = max_sessions
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            record = self._records.get(session_id)
+            if record is not None:
+                self._records.move_to_end(session_id)
+            return record
+
+    def put(self, session_id, record):
+        with self._lock:
+            self._records[session_id] = record
+            self._records.move_to_end(session_id)
+            while len(self._records) > self.max_sessions:
+                self._records.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._records.pop(session_id, None)
+
+
+class FileBackend:
+    """
+    /tmp 파일 저장소 (같은 컨테이너의 재시작 간 유지, 세션당 JSON 파일 하나)
+    파일 수가 max_sessions를 넘으면 가장 오래 수정되지 않은 파일부터 삭제
+    """
+
+    def __init__(self, directory='/tmp/conversations', max_sessions=1000):
+        self.directory = directory
+        self.max_sessions = max_sessions
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id):
+        digest = hashlib.sha1(session_id.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, session_id):
+        try:
+            with open(self._path(session_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, session_id, record):
+        path = self._path(session_id)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        self._writes += 1
+        if self._writes % 50 == 0:
+            self._prune()
+
+    def delete(self, session_id):
+        try:
+            os.remove(self._path(session_id))
+        except OSError:
+            pass
+
+    def _prune(self):
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+        except OSError:
+            return
+        if len(entries) <= self.max_sessions:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_sessions]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class DynamoDBBackend:
+    """
+    DynamoDB 저장소 (컨테이너 간 공유)
+    테이블: 파티션 키 session_id(S), TTL 속성 expires_at(N)
+    client를 주입하면 DynamoDB Local 등 로컬 대체 구현으로 실행 가능
+    """
+
+    def __init__(self, table_name, client=None, region_name=None, endpoint_url=None):
+        self.table_name = table_name
+        self.region_name = region_name
+        self.endpoint_url = endpoint_url
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from chatbot_core.clients import get_client
+            self._client = get_client('dynamodb', region_name=self.region_name, endpoint_url=self.endpoint_url)
+        return self._client
+
+    def get(self, session_id):
+        response = self.client.get_item(
+            TableName=self.table_name,
+            Key={'session_id': {'S': session_id}},
+            ConsistentRead=True
+        )
+        item = response.get('Item')
+        if not item:
+            return None
+        return json.loads(item['record']['S'])
+
+    def put(self, session_id, record):
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'session_id': {'S': session_id},
+                'record': {'S': json.dumps(record, ensure_ascii=False)},
+                'expires_at': {'N': str(int(record['expires_at']))}
+            }
+        )
+
+    def delete(self, session_id):
+        self.client.delete_item(TableName=self.table_name, Key={'session_id': {'S': session_id}})
+
+
+def extractive_summary(summary, turns, max_tokens):
+    """
+    기본 요약기 (모델 호출 없음) - 기존 요약 + 접히는 턴의 질문과 답변 첫 문장
+    토큰 예산을 넘으면 오래된 내용부터 버림
+    """
+    lines = [line for line in (summary or '').split('\n') if line.strip()]
+    for turn in turns:
+        answer = _SENTENCE_PATTERN.split(turn['answer'].strip(), maxsplit=1)[0]
+        lines.append(f"- Q: {turn['question']} / A: {answer}")
+
+    while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > max_tokens:
+        lines.pop(0)
+    return truncate_to_tokens('\n'.join(lines), max_tokens)
+
+
+class ConversationStore:
+    """
+    세션별 대화 기록 관리
+    record: {'summary', 'turns': [{'question', 'answer'}], 'turn_count', 'updated_at', 'expires_at'}
+
+    max_turns를 넘으면 keep_turns만 남기고 나머지를 summarizer(기존 요약, 접을 턴, 최대 토큰)로 요약에 합침
+    """
+
+    def __init__(self, backend=None, ttl=1800, max_turns=6, keep_turns=3, turn_max_tokens=300,
+                 summary_max_tokens=300, summarizer=None):
+        if keep_turns > max_turns:
+            raise ValueError('keep_turns must not exceed max_turns')
+
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self.keep_turns = keep_turns
+        self.turn_max_tokens = turn_max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.summarizer = summarizer or extractive_summary
+        self._lock = threading.Lock()
+        self._stats = {'loads': 0, 'resumed': 0, 'expired': 0, 'saves': 0, 'summarized': 0, 'errors': 0}
+
+    def load(self, session_id):
+        """
+        세션 기록 조회 (없거나 만료되었으면 빈 기록)
+        """
+        self._count('loads')
+        try:
+            record = self.backend.get(session_id)
+        except Exception as e:
+            logger.error(f"Conversation load failed: {str(e)}")
+            self._count('errors')
+            record = None
+
+        if record is not None and record.get('expires_at', 0) <= time.time():
+            self._count('expired')
+            record = None
+        if record is None:
+            return {'summary': '', 'turns': [], 'turn_count': 0}
+
+        self._count('resumed')
+        return record
+
+    def history(self, record):
+        """
+        프롬프트용 (요약, Claude messages 목록) - 최근 턴을 user/assistant 메시지로 변환
+        """
+        messages = []
+        for turn in record.get('turns', []):
+            messages.append({'role': 'user', 'content': turn['question']})
+            messages.append({'role': 'assistant', 'content': turn['answer']})
+        return record.get('summary', ''), messages
+
+    def append(self, session_id, record, question, answer):
+        """
+        턴 추가 후 저장 (필요하면 오래된 턴을 요약으로 접음)
+        """
+        turns = list(record.get('turns', []))
+        turns.append({
+            'question': truncate_to_tokens(question, self.turn_max_tokens),
+            'answer': truncate_to_tokens(answer, self.turn_max_tokens)
+        })
+        summary = record.get('summary', '')
+
+        if len(turns) > self.max_turns:
+            folded, turns = turns[:-self.keep_turns], turns[-self.keep_turns:]
+            try:
+                summary = self.summarizer(summary, folded, self.summary_max_tokens)
+            except Exception as e:
+                logger.error(f"Conversation summarizer failed, using extractive summary: {str(e)}")
+                summary = extractive_summary(summary, folded, self.summary_max_tokens)
+            self._count('summarized')
+
+        now = time.time()
+        record = {
+            'summary': summary,
+            'turns': turns,
+            'turn_count': record.get('turn_count', 0) + 1,
+            'updated_at': now,
+            'expires_at': now + self.ttl
+        }
+
+        try:
+            self.backend.put(session_id, record)
+            self._count('saves')
+        except Exception as e:
+            logger.error(f"Conversation save failed: {str(e)}")
+            self._count('errors')
+        return record
+
+    def reset(self, session_id):
+        self.backend.delete(session_id)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+def create_backend_from_env():
+    """
+    CONVERSATION_BACKEND 환경 변수로 저장소 선택: memory(기본) | file | dynamodb
+    """
+    backend = os.environ.get('CONVERSATION_BACKEND', 'memory')
+    max_sessions = int(os.environ.get('CONVERSATION_MAX_SESSIONS', '1000'))
+
+    if backend == 'file':
+        return FileBackend(os.environ.get('CONVERSATION_DIR', '/tmp/conversations'), max_sessions=max_sessions)
+    if backend == 'dynamodb':
+        return DynamoDBBackend(
+            os.environ.get('CONVERSATION_TABLE', 'chatbot-conversations'),
+            region_name=os.environ.get('CONVERSATION_TABLE_REGION'),
+            endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL')
+        )
+    return MemoryBackend(max_sessions=max_sessions)
@@ -0,0 +1,134 @@
+"""
+API Gateway 이벤트 정규화
+REST API(v1)와 HTTP API(v2) / 함수 URL 이벤트를 같은 요청 dict로 변환하고
+base64/gzip 요청 본문을 디코딩 (OPTIONS 처리 경로에서 무거운 모듈을 불러오지 않도록 표준 라이브러리만 사용)
+"""
+import os
+import json
+import base64
+import binascii
+
+# 압축 해제 후 허용하는 최대 요청 본문 크기 (압축 폭탄 방지)
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', '1048576'))
+
+
+class RequestError(ValueError):
+    """
+    잘못된 요청 (400으로 응답)
+    """
+
+
+def normalize_event(event):
+    """
+    Lambda 이벤트를 공통 요청 dict로 변환
+
+    반환: {'version', 'method', 'path', 'headers'(소문자 키), 'query', 'body'(원본), 'is_base64'}
+    version: 'v1' (REST API) | 'v2' (HTTP API, 함수 URL) | 'direct' (콘솔/SDK 직접 호출)
+    """
+    event = event or {}
+    request_context = event.get('requestContext') or {}
+    http = request_context.get('http') or {}
+
+    if http.get('method'):
+        version = 'v2'
+        method = http['method']
+        path = event.get('rawPath') or http.get('path') or '/'
+    elif event.get('httpMethod'):
+        version = 'v1'
+        method = event['httpMethod']
+        path = event.get('path') or '/'
+    else:
+        version = 'direct'
+        method = 'POST'
+        path = '/'
+
+    headers = {str(key).lower(): value for key, value in (event.get('headers') or {}).items()}
+    if version == 'v2' and event.get('cookies') and 'cookie' not in headers:
+        headers['cookie'] = '; '.join(event['cookies'])
+
+    return {
+        'version': version,
+        'method': method.upper(),
+        'path': path,
+        'headers': headers,
+        'query': event.get('queryStringParameters') or {},
+        'body': event.get('body'),
+        'is_base64': bool(event.get('isBase64Encoded'))
+    }
+
+
+def decode_body(request):
+    """
+    요청 본문을 문자열로 디코딩 (base64 → Content-Encoding 해제 → UTF-8)
+    """
+    body = request.get('body')
+    if body is None:
+        return ''
+    if isinstance(body, (dict, list)):
+        # 직접 호출 시 본문이 이미 JSON 객체인 경우
+        return json.dumps(body, ensure_ascii=False)
+
+    if request.get('is_base64'):
+        try:
+            raw = base64.b64decode(body, validate=True)
+        except (binascii.Error, ValueError):
+            raise RequestError('Invalid base64 body')
+    else:
+        raw = body.encode('utf-8') if isinstance(body, str) else bytes(body)
+
+    encoding = (request['headers'].get('content-encoding') or '').strip().lower()
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        raw = _decompress(raw, encoding)
+    elif encoding and encoding != 'identity':
+        raise RequestError(f"Unsupported Content-Encoding: {encoding}")
+
+    if len(raw) > MAX_REQUEST_BYTES:
+        raise RequestError('Request body too large')
+
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        raise RequestError('Request body is not valid UTF-8')
+
+
+def _decompress(raw, encoding):
+    import zlib
+
+    # gzip은 헤더 포함(wbits 16+), deflate는 zlib 래핑 형식
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding != 'deflate' else zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(raw, MAX_REQUEST_BYTES + 1)
+    except zlib.error:
+        raise RequestError(f"Invalid {encoding} body")
+    if len(data) > MAX_REQUEST_BYTES or decompressor.unconsumed_tail:
+        raise RequestError('Request body too large')
+    return data
+
+
+def parse_json_body(request):
+    """
+    요청 본문을 JSON 객체로 파싱 (빈 본문은 빈 dict)
+    """
+    text = decode_body(request)
+    if not text.strip():
+        return {}
+    try:
+        body = json.loads(text)
+    except ValueError:
+        raise RequestError('Invalid JSON body')
+    if not isinstance(body, dict):
+        raise RequestError('JSON body must be an object')
+    return body
+
+
+
+def string_field(body, key, default=''):
+    """
+    문자열 필드 조회 - 없거나 null이면 default, 문자열이 아니면 RequestError
+    """
+    value = body.get(key)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise RequestError(f"{key} must be a string")
+    return value
@@ -0,0 +1,171 @@
+"""
+컨테이너 단위 HTTP 세션
+커넥션 풀 + keep-alive + 재시도 정책을 갖춘 requests.Session 재사용
+"""
+import os
+import socket
+import threading
+import logging
+
+from chatbot_core.lazy import lazy_import
+
+# requests/urllib3는 첫 세션 생성 시점에 import
+requests = lazy_import('requests')
+
+logger = logging.getLogger()
+
+# 풀/재시도 설정 (환경 변수로 조정)
+POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '4'))
+POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '8'))
+RETRY_TOTAL = int(os.environ.get('HTTP_RETRY_TOTAL', '2'))
+RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', '0.2'))
+KEEPALIVE_IDLE = int(os.environ.get('HTTP_KEEPALIVE_IDLE', '30'))
+
+_session = None
+_adapters = []
+_host_mounts = {}
+_adapter_class = None
+_lock = threading.RLock()
+
+
+def _keepalive_socket_options(idle_seconds):
+    """
+    TCP keep-alive 소켓 옵션 (플랫폼이 지원하는 항목만)
+    """
+    from urllib3.connection import HTTPConnection
+
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle_seconds))
+    if hasattr(socket, 'TCP_KEEPINTVL'):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(idle_seconds // 3, 1)))
+    return options
+
+
+def _keepalive_adapter_class():
+    """
+    TCP keep-alive 소켓 옵션을 적용하는 HTTPAdapter 클래스 (requests 로딩 후 생성)
+    """
+    global _adapter_class
+
+    if _adapter_class is None:
+        class KeepAliveAdapter(requests.adapters.HTTPAdapter):
+            def __init__(self, keepalive_idle=KEEPALIVE_IDLE, **kwargs):
+                self.keepalive_idle = keepalive_idle
+                super().__init__(**kwargs)
+
+            def init_poolmanager(self, *args, **kwargs):
+                kwargs['socket_options'] = _keepalive_socket_options(self.keepalive_idle)
+                super().init_poolmanager(*args, **kwargs)
+
+        _adapter_class = KeepAliveAdapter
+    return _adapter_class
+
+
+def _build_adapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                   retry_total=RETRY_TOTAL, keepalive_idle=KEEPALIVE_IDLE, hedged=False):
+    """
+    hedged=True: 호출부에서 헤징/타임아웃을 관리하는 호스트용
+    요청이 전송되지 않은 연결 실패만 재시도 (읽기/상태 코드 재시도는 헤징 예산을 넘기므로 끔)
+    """
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retry_total,
+        connect=retry_total,
+        read=0 if hedged else retry_total,
+        status=0 if hedged else retry_total,
+        backoff_factor=0 if hedged else RETRY_BACKOFF,
+        status_forcelist=() if hedged else (429, 500, 502, 503, 504),
+        # BigKinds 검색은 POST지만 멱등 조회이므로 재시도 허용
+        allowed_methods=frozenset(['GET', 'HEAD', 'POST']),
+        raise_on_status=False
+    )
+    adapter = _keepalive_adapter_class()(
+        keepalive_idle=keepalive_idle,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+    _adapters.append(adapter)
+    return adapter
+
+
+def get_session():
+    """
+    컨테이너 단위 공유 세션 반환 (최초 호출 시 생성)
+    """
+    global _session
+
+    if _session is not None:
+        return _session
+
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = _build_adapter()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            for prefix, options in _host_mounts.items():
+                session.mount(prefix, _build_adapter(**options))
+            _session = session
+    return _session
+
+
+def mount_host(prefix, **adapter_options):
+    """
+    특정 호스트 전용 풀 설정 (예: 'https://www.bigkinds.or.kr')
+    ResilientEndpoint로 헤징하는 호스트는 hedged=True로 등록 (어댑터 재시도 없음)
+    세션이 아직 없으면 등록만 하고 세션 생성 시 적용
+    """
+    with _lock:
+        _host_mounts[prefix] = adapter_options
+        if _session is not None:
+            _session.mount(prefix, _build_adapter(**adapter_options))
+
+
+def prewarm(urls, timeout=2, background=False):
+    """
+    초기화 단계에서 TCP+TLS 연결을 미리 열어 풀에 보관
+    background=True면 별도 스레드에서 실행 (SDK import와 연결을 핸들러와 겹쳐 처리)
+    실패해도 요청 처리에는 영향 없음
+    """
+    if background:
+        thread = threading.Thread(target=prewarm, args=(urls, timeout), name='http-prewarm', daemon=True)
+        thread.start()
+        return thread
+
+    session = get_session()
+    for url in urls:
+        try:
+            session.head(url, timeout=timeout, allow_redirects=False)
+            logger.info(f"HTTP pool pre-warmed: {url}")
+        except Exception as e:
+            logger.warning(f"HTTP pre-warm failed ({url}): {str(e)}")
+
+
+def get_connection_stats():
+    """
+    커넥션 재사용 통계 (요청 수 대비 새 연결 수)
+    """
+    requests_count = 0
+    new_connections = 0
+
+    with _lock:
+        for adapter in _adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_count += pool.num_requests
+                new_connections += pool.num_connections
+
+    reused = max(requests_count - new_connections, 0)
+    return {
+        'requests': requests_count,
+        'new_connections': new_connections,
+        'reused': reused,
+        'reuse_rate': round(reused / requests_count, 3) if requests_count else 0.0
+    }
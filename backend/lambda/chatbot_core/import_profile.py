@@ -0,0 +1,191 @@
+"""
+콜드 스타트 import 프로파일러
+-X importtime 형식의 모듈별 import 시간 트리 기록
+
+핸들러 파일 최상단에서 IMPORT_PROFILE=1 일 때 install() 호출,
+또는 CLI로 핸들러별 리포트 생성:
+    python3 -m chatbot_core.import_profile enhanced-chatbot-handler.py
+"""
+import os
+import sys
+import time
+import threading
+
+_installed = None
+_records = []
+_local = threading.local()
+
+
+class _TimingLoader:
+    """
+    exec_module 실행 시간을 기록하는 로더 래퍼
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+
+        record = {'name': module.__name__, 'depth': len(stack), 'children_us': 0}
+        stack.append(record)
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            cumulative_us = int((time.perf_counter() - started) * 1e6)
+            stack.pop()
+            record['cumulative_us'] = cumulative_us
+            record['self_us'] = max(cumulative_us - record['children_us'], 0)
+            if stack:
+                stack[-1]['children_us'] += cumulative_us
+            _records.append(record)
+
+
+class _TimingFinder:
+    """
+    다른 finder가 찾은 spec의 로더를 _TimingLoader로 감싸는 meta path finder
+    """
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimingLoader(spec.loader)
+                return spec
+        return None
+
+
+def install():
+    """
+    import 시간 기록 시작 (중복 호출 무시)
+    """
+    global _installed
+
+    if _installed is None:
+        _installed = _TimingFinder()
+        sys.meta_path.insert(0, _installed)
+    return _installed
+
+
+def uninstall():
+    global _installed
+
+    if _installed is not None:
+        sys.meta_path.remove(_installed)
+        _installed = None
+
+
+def mark():
+    """
+    현재까지 기록된 import 수 (구간별 리포트용)
+    """
+    return len(_records)
+
+
+def report(since=0, until=None, min_us=0):
+    """
+    -X importtime 형식 리포트 문자열
+    기록은 완료 순서(자식 먼저)이므로 importtime과 같은 순서로 출력
+    """
+    lines = ["import time: self [us] | cumulative | imported package"]
+    for record in _records[since:until]:
+        if record['cumulative_us'] < min_us:
+            continue
+        indent = '  ' * record['depth']
+        lines.append(
+            f"import time: {record['self_us']:>9} | {record['cumulative_us']:>10} | {indent}{record['name']}"
+        )
+    return "\n".join(lines)
+
+
+def summary(since=0):
+    """
+    최상위 패키지별 self 시간 합계 (ms)와 전체 모듈 수
+    """
+    totals = {}
+    records = _records[since:]
+    for record in records:
+        top_level = record['name'].split('.')[0]
+        totals[top_level] = totals.get(top_level, 0) + record['self_us']
+    packages = {
+        name: round(us / 1000, 1)
+        for name, us in sorted(totals.items(), key=lambda item: -item[1])
+    }
+    return {'modules': len(records), 'total_ms': round(sum(totals.values()) / 1000, 1), 'packages': packages}
+
+
+def _load_handler(path):
+    import importlib.util
+
+    name = os.path.splitext(os.path.basename(path))[0].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main(argv):
+    """
+    핸들러 콜드 스타트 리포트
+    1) 모듈 로드 2) OPTIONS preflight 3) 400 검증 오류 각 구간의 추가 import 측정
+    """
+    import json
+
+    if len(argv) < 2:
+        print("usage: python3 -m chatbot_core.import_profile <handler.py> [--tree]")
+        return 1
+
+    path = os.path.abspath(argv[1])
+    sys.path.insert(0, os.path.dirname(path))
+    install()
+
+    phases = []
+    start = mark()
+    handler = _load_handler(path)
+    phases.append(('module load', start))
+
+    start = mark()
+    handler.lambda_handler({
+        'httpMethod': 'OPTIONS',
+        'requestContext': {'http': {'method': 'OPTIONS'}},
+        'headers': {},
+        'body': None
+    }, None)
+    phases.append(('OPTIONS preflight', start))
+
+    start = mark()
+    handler.lambda_handler({
+        'httpMethod': 'POST',
+        'requestContext': {'http': {'method': 'POST'}},
+        'headers': {},
+        'body': json.dumps({'question': ''})
+    }, None)
+    phases.append(('400 validation error', start))
+
+    boundaries = [start for _, start in phases] + [mark()]
+    for index, (label, start) in enumerate(phases):
+        records = _records[start:boundaries[index + 1]]
+        total_ms = round(sum(r['self_us'] for r in records) / 1000, 1)
+        print(f"== {label}: {len(records)} modules, {total_ms}ms")
+        if '--tree' in argv and records:
+            print(report(since=start, until=boundaries[index + 1], min_us=100))
+
+    loaded = [name for name in ('boto3', 'botocore', 'requests', 'urllib3') if name in sys.modules]
+    print(f"heavy SDK modules loaded: {', '.join(loaded) if loaded else 'none'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
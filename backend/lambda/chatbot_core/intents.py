@@ -0,0 +1,268 @@
+"""
+빠른 경로 의도 분류
+정형화된 질문(정답 해설 요청, 힌트, 인사, 감사, 게임 방법)을 Bedrock 호출 없이
+게임별 템플릿과 퀴즈 해설/힌트로 바로 답변
+
+- 분류: 의도별 단서 표현을 Aho-Corasick 자동자 하나로 매칭 + 로지스틱 점수
+- 확신도가 threshold 미만이면 None (LLM 경로)
+
+    python3 -m chatbot_core.intents    # 회귀 예문 확인
+"""
+import math
+import threading
+import logging
+
+from chatbot_core.lexicon import AhoCorasickMatcher, extract_terms
+from chatbot_core.context_budget import estimate_tokens
+
+logger = logging.getLogger()
+
+# 의도별 단서 표현: (표현, 가중치[, 위치 조건])
+# 위치 조건 'word': 어절 첫머리에서만 매칭 ('신용점수'의 '점수' 제외)
+#           'short': 어절 첫머리 + SHORT_UTTERANCE_TOKENS 이하의 짧은 발화에서만 매칭
+# '감사'(audit)처럼 경제 용어와 겹치는 짧은 단어는 단서로 쓰지 않고 완성된 표현만 사용
+INTENT_CUES = {
+    'explain_answer': [
+        ('정답', 1.5), ('이해가 안', 2.5), ('이해 안', 2.5), ('이해가 잘 안', 2.5), ('헷갈', 2.5),
+        ('모르겠', 2.0), ('해설', 2.0), ('왜 답이', 2.5), ('왜 정답', 2.5), ('납득', 2.0)
+    ],
+    'hint': [
+        ('힌트', 3.0), ('실마리', 2.5), ('귀띔', 2.5), ('단서', 2.0), ('감이 안', 2.0), ('도와줘', 1.0)
+    ],
+    'greeting': [
+        ('안녕', 3.0), ('반가워', 2.5), ('반갑습니다', 2.5), ('hello', 3.0), ('hi', 2.5, 'short'),
+        ('하이', 2.0, 'short')
+    ],
+    'thanks': [
+        ('고마워', 3.0), ('고맙습니다', 3.0), ('감사합니다', 3.0), ('감사해요', 3.0), ('감사드립니다', 3.0),
+        ('땡큐', 3.0), ('thank', 3.0), ('thx', 3.0)
+    ],
+    'game_rules': [
+        ('게임 방법', 3.0), ('게임 규칙', 3.0), ('규칙', 2.0), ('어떻게 하는', 1.5), ('어떻게 해요', 1.5),
+        ('게임 설명', 3.0), ('룰', 1.5, 'word'), ('점수', 1.0, 'word')
+    ]
+}
+
+# 로지스틱 점수 가중치
+# 단서가 있어도 경제 용어가 들어 있거나 질문이 길면 구체적인 질문일 가능성이 높아 LLM으로 보냄
+INTENT_BIAS = -1.0
+ECONOMIC_TERM_WEIGHT = -1.5
+LENGTH_WEIGHT = -0.08        # 12토큰 초과분 토큰당
+FOLLOW_UP_WEIGHT = -0.5
+QUIZ_DATA_WEIGHT = 0.5       # 해설/힌트가 필요한 의도에서 퀴즈 데이터가 있을 때
+
+SHORT_UTTERANCE_TOKENS = 6
+
+# 퀴즈 데이터(해설/힌트)를 사용하는 의도
+QUIZ_DATA_INTENTS = {'explain_answer': 'explanation', 'hint': 'hint'}
+
+GAME_TEMPLATES = {
+    'explain_answer': {
+        'BlackSwan': """블랙스완 게임에서 정답이 이해가 안 가신다면, 다음을 고려해보세요:
+
+1. **예측 불가능성**: 블랙스완 이벤트는 일반적인 예측 모델로는 파악하기 어려운 극단적 사건입니다.
+
+2. **낮은 확률, 높은 영향**: 발생 확률은 매우 낮지만, 한 번 발생하면 경제 전체에 큰 충격을 줍니다.
+
+3. **사후 설명 가능성**: 일어난 후에는 그럴듯한 설명이 가능하지만, 사전에는 예측하기 어렵습니다.""",
+        'PrisonersDilemma': """죄수의 딜레마에서 정답이 헷갈리신다면, 핵심 원리를 이해해보세요:
+
+1. **개인 vs 집단 이익**: 각자가 자신의 이익만 추구하면 모두에게 나쁜 결과가 나올 수 있습니다.
+
+2. **협력의 딜레마**: 협력이 최선이지만, 상대방이 배신할 가능성 때문에 협력하기 어렵습니다.
+
+3. **경제적 적용**: 가격 경쟁, 환경 보호, 공공재 문제 등에서 자주 나타납니다.""",
+        'SignalDecoding': """경제 신호 해석이 어려우시다면, 다음 접근법을 시도해보세요:
+
+1. **다중 지표 분석**: 하나의 지표만 보지 말고 여러 경제 지표를 종합적으로 판단하세요.
+
+2. **맥락 이해**: 같은 지표라도 경제 상황에 따라 다른 의미를 가질 수 있습니다.
+
+3. **시간적 관점**: 단기적 변동과 장기적 추세를 구분해서 해석하세요.""",
+        None: """경제 문제의 정답을 이해하기 어려우시군요. 경제학에서는 다음과 같은 접근이 도움됩니다:
+
+1. **기본 원리 파악**: 수요와 공급, 기회비용 등 기본 개념부터 차근차근 이해하세요.
+
+2. **실제 사례 연결**: 이론을 현실의 경제 상황과 연결해서 생각해보세요.
+
+3. **단계별 분석**: 복잡한 문제는 작은 단위로 나누어 분석하세요."""
+    },
+    'hint': {
+        'BlackSwan': "발생 확률보다 한 번 일어났을 때의 파급력에 주목해 보세요. 시장이 미처 대비하지 못한 충격이 무엇이었는지 생각하면 답에 가까워집니다.",
+        'PrisonersDilemma': "각 참여자가 상대의 선택을 모른 채 자기 이익만 따질 때 어떤 선택을 할지 먼저 생각해 보세요. 개인의 최선과 모두의 최선이 같은지 비교해 보면 실마리가 보입니다.",
+        'SignalDecoding': "지표가 평소보다 오르거나 내린 방향과 그 이유를 먼저 확인해 보세요. 다른 지표와 함께 움직이는지 보면 신호의 의미를 해석하기 쉬워집니다.",
+        None: "문제에 나온 핵심 경제 용어의 정의부터 떠올려 보세요. 원인과 결과의 방향을 차근차근 따라가면 답에 가까워집니다."
+    },
+    'greeting': {
+        None: "안녕하세요! 경제 퀴즈 도우미입니다. 문제나 경제 개념에 대해 궁금한 점을 편하게 물어봐 주세요."
+    },
+    'thanks': {
+        None: "도움이 되었다니 기쁩니다! 다른 문제나 경제 개념도 궁금하면 언제든 물어봐 주세요."
+    },
+    'game_rules': {
+        'BlackSwan': "블랙스완은 예측하기 어려운 극단적 경제 이벤트를 다루는 퀴즈입니다. 실제 경제 뉴스를 바탕으로 한 문제를 읽고, 사건의 원인과 파급 효과를 가장 잘 설명하는 답을 고르면 됩니다.",
+        'PrisonersDilemma': "죄수의 딜레마는 경제적 딜레마와 게임이론 상황을 다루는 퀴즈입니다. 각 참여자의 선택과 그 결과를 따져 보고 상황에 가장 알맞은 답을 고르면 됩니다.",
+        'SignalDecoding': "시그널 디코딩은 경제 지표와 신호를 해석하는 퀴즈입니다. 문제에 나온 지표 변화가 경제에 어떤 의미인지 판단해 가장 알맞은 답을 고르면 됩니다.",
+        None: "경제 뉴스를 바탕으로 한 퀴즈를 풀며 경제 개념을 익히는 게임입니다. 문제를 읽고 가장 알맞은 답을 고른 뒤 해설로 개념을 정리해 보세요."
+    }
+}
+
+CLOSING = "\n\n더 궁금한 점이 있으면 구체적으로 물어봐 주세요."
+
+
+# 회귀 예문: (질문, 기대 의도 또는 None) - 경제 질문이 빠른 경로로 새지 않는지 확인
+REGRESSION_EXAMPLES = [
+    ("감사보고서 의견 거절이 무슨 뜻이에요?", None),
+    ("감사원 감사 결과가 왜 중요해?", None),
+    ("회계 감사에서 적정 의견이란?", None),
+    ("신용점수가 낮으면 대출 금리가 왜 올라가요?", None),
+    ("high yield 채권이 뭐예요?", None),
+    ("this is 인플레이션 맞나요?", None),
+    ("감사합니다!", 'thanks'),
+    ("고마워요", 'thanks'),
+    ("hi", 'greeting'),
+    ("안녕하세요", 'greeting'),
+    ("힌트 주세요", 'hint'),
+    ("게임 방법 알려줘", 'game_rules')
+]
+
+
+def _sigmoid(value):
+    return 1 / (1 + math.exp(-value))
+
+
+class IntentRouter:
+    """
+    의도 분류 + 템플릿 답변 + 빠른 경로 통계
+
+    classify()는 (의도, 확신도) 또는 None, answer()는 템플릿/퀴즈 데이터로 답변 생성
+    LLM 경로 지연 시간을 함께 기록해 빠른 경로로 절약한 시간을 추정
+    """
+
+    def __init__(self, threshold=0.75, cues=None):
+        self.threshold = threshold
+        entries = [
+            (cue[0], cue[1], (intent, cue[2] if len(cue) > 2 else None))
+            for intent, intent_cues in (cues or INTENT_CUES).items()
+            for cue in intent_cues
+        ]
+        self._matcher = AhoCorasickMatcher(entries)
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'fast_path': 0, 'fast_ms': 0.0, 'llm': 0, 'llm_ms': 0.0, 'intents': {}}
+
+    def score(self, question, follow_up=False, quiz=None):
+        """
+        의도별 확신도 {의도: 0~1} (단서가 하나도 없는 의도는 제외)
+        """
+        tokens = estimate_tokens(question)
+        cue_scores = {}
+        for start, _, weight, (intent, anchor) in self._matcher.find_longest(question):
+            if anchor and start > 0 and question[start - 1].isalnum():
+                continue
+            if anchor == 'short' and tokens > SHORT_UTTERANCE_TOKENS:
+                continue
+            cue_scores[intent] = cue_scores.get(intent, 0.0) + weight
+        if not cue_scores:
+            return {}
+
+        shared = INTENT_BIAS
+        shared += ECONOMIC_TERM_WEIGHT * len(extract_terms(question, limit=5))
+        shared += LENGTH_WEIGHT * max(tokens - 12, 0)
+        if follow_up:
+            shared += FOLLOW_UP_WEIGHT
+
+        scores = {}
+        for intent, cue_score in cue_scores.items():
+            value = shared + cue_score
+            field = QUIZ_DATA_INTENTS.get(intent)
+            if field and quiz and quiz.get(field):
+                value += QUIZ_DATA_WEIGHT
+            scores[intent] = round(_sigmoid(value), 3)
+        return scores
+
+    def classify(self, question, follow_up=False, quiz=None):
+        """
+        가장 확신도가 높은 의도가 threshold 이상이면 (의도, 확신도), 아니면 None
+        """
+        scores = self.score(question, follow_up, quiz)
+        if not scores:
+            return None
+        intent = max(scores, key=scores.get)
+        if scores[intent] < self.threshold:
+            return None
+        return intent, scores[intent]
+
+    def answer(self, intent, game_type, quiz=None):
+        """
+        의도별 답변 - 퀴즈 해설/힌트가 있으면 우선 사용, 없으면 게임별 템플릿
+        """
+        if intent == 'explain_answer' and quiz and quiz.get('explanation'):
+            return f"이 문제의 해설을 정리해 드릴게요.\n\n{quiz['explanation']}{CLOSING}"
+        if intent == 'hint' and quiz and quiz.get('hint'):
+            hints = quiz['hint'] if isinstance(quiz['hint'], list) else [quiz['hint']]
+            lines = "\n".join(f"• {hint}" for hint in hints)
+            return f"정답을 바로 알려드리기보다 힌트를 드릴게요.\n\n{lines}{CLOSING}"
+
+        templates = GAME_TEMPLATES[intent]
+        text = templates.get(game_type) or templates[None]
+        if intent in ('greeting', 'thanks'):
+            return text
+        return text + CLOSING
+
+    def record_fast_path(self, intent, elapsed_ms):
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['fast_path'] += 1
+            self._stats['fast_ms'] += elapsed_ms
+            self._stats['intents'][intent] = self._stats['intents'].get(intent, 0) + 1
+
+    def record_llm(self, elapsed_ms):
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['llm'] += 1
+            self._stats['llm_ms'] += elapsed_ms
+
+    def estimated_saving_ms(self, elapsed_ms):
+        """
+        빠른 경로 한 건이 절약한 시간 추정 (LLM 경로 평균 - 실제 시간, LLM 기록이 없으면 None)
+        """
+        with self._lock:
+            if not self._stats['llm']:
+                return None
+            return max(self._stats['llm_ms'] / self._stats['llm'] - elapsed_ms, 0.0)
+
+    def stats(self):
+        """
+        빠른 경로 비율, 의도별 건수, 평균 지연 시간, 누적 절약 시간 추정
+        """
+        with self._lock:
+            stats = self._stats
+            fast_avg = stats['fast_ms'] / stats['fast_path'] if stats['fast_path'] else 0.0
+            llm_avg = stats['llm_ms'] / stats['llm'] if stats['llm'] else None
+            return {
+                'requests': stats['requests'],
+                'fast_path': stats['fast_path'],
+                'fast_path_share': round(stats['fast_path'] / stats['requests'], 3) if stats['requests'] else 0.0,
+                'intents': dict(stats['intents']),
+                'fast_path_avg_ms': round(fast_avg, 1),
+                'llm_avg_ms': round(llm_avg, 1) if llm_avg is not None else None,
+                'saved_ms': round((llm_avg - fast_avg) * stats['fast_path'], 1) if llm_avg is not None else None
+            }
+
+
+def _check_regressions():
+    router = IntentRouter()
+    failures = 0
+    for question, expected in REGRESSION_EXAMPLES:
+        result = router.classify(question)
+        intent = result[0] if result else None
+        mark = '✅' if intent == expected else '❌'
+        failures += intent != expected
+        print(f"{mark} {question!r}: {result} (expected {expected})")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(_check_regressions())
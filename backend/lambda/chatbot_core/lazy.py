@@ -0,0 +1,75 @@
+"""
+지연 import 유틸리티
+boto3/requests 같은 무거운 SDK를 처음 필요한 시점에만 import
+"""
+import sys
+import time
+import types
+import importlib
+import threading
+import logging
+
+logger = logging.getLogger()
+
+_lock = threading.RLock()
+_load_times = {}
+
+
+class LazyModule(types.ModuleType):
+    """
+    첫 속성 접근 시 실제 모듈을 import하는 프록시 모듈
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = None
+
+    def _load(self):
+        target = self.__dict__['_lazy_target']
+        if target is not None:
+            return target
+
+        with _lock:
+            target = self.__dict__['_lazy_target']
+            if target is None:
+                name = self.__name__
+                already_loaded = name in sys.modules
+                started = time.perf_counter()
+                target = importlib.import_module(name)
+                if not already_loaded:
+                    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+                    _load_times[name] = elapsed_ms
+                    logger.info(f"Lazy import: {name} ({elapsed_ms}ms)")
+                self.__dict__['_lazy_target'] = target
+        return target
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """
+    지연 로딩 모듈 반환 (이미 import된 모듈이면 그대로 반환)
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(name):
+    """
+    실제 모듈이 import되었는지 여부
+    """
+    return name in sys.modules
+
+
+def get_lazy_load_times():
+    """
+    지연 import된 모듈별 로딩 시간 (ms)
+    """
+    with _lock:
+        return dict(_load_times)
@@ -0,0 +1,216 @@
+"""
+경제 용어 사전 매칭
+Aho-Corasick 자동자로 질문 텍스트에서 사전 용어를 한 번의 스캔으로 찾고,
+사전에 없는 어절은 한국어 조사를 떼어낸 어간으로 사용
+"""
+import os
+import re
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger()
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'economic_lexicon.tsv')
+
+# 어절 끝에서 떼어낼 조사/어미 (긴 것부터 검사)
+KOREAN_PARTICLES = sorted([
+    '이라는', '에서는', '에게서', '으로서', '으로써', '이라고', '까지는', '부터는',
+    '에서', '에게', '으로', '이나', '이란', '라는', '까지', '부터', '처럼', '보다',
+    '하고', '이랑', '에는', '과는', '와는', '이다', '인가', '인지', '이요', '이에요', '예요',
+    '은', '는', '이', '가', '을', '를', '의', '에', '로', '와', '과', '도', '만', '나', '란', '요',
+], key=len, reverse=True)
+
+# 검색 키워드로 의미가 없는 질문 표현
+STOPWORDS = {
+    '어떻게', '어떤', '무엇', '무엇인가', '뭔가', '뭐', '왜', '언제', '얼마나', '정말', '그럼',
+    '이게', '이건', '그게', '그건', '저게', '이것', '그것', '정답', '이해', '설명', '궁금',
+    '궁금합니다', '알려주세요', '되나', '되나요', '됐나', '하나', '인데', '있나', '없나', '가요',
+}
+
+_TOKEN_PATTERN = re.compile(r'[0-9A-Za-z가-힣&/·]+')
+
+
+def strip_particle(word):
+    """
+    어절 끝의 조사 제거 ('금리가' → '금리'), 어간이 2자 미만이 되면 원형 유지
+    """
+    for particle in KOREAN_PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= 2:
+            return word[:-len(particle)]
+    return word
+
+
+class AhoCorasickMatcher:
+    """
+    다중 패턴 매처 - 사전 크기와 무관하게 텍스트 길이에 비례하는 시간으로 매칭
+    패턴은 소문자로 정규화, ASCII 패턴은 단어 경계에서만 매칭
+    """
+
+    def __init__(self, entries):
+        # entries: [(용어, 가중치, 대표어), ...]
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.size = 0
+
+        for term, weight, canonical in entries:
+            self._add(term.lower(), (len(term), weight, canonical, term.isascii()))
+            self.size += 1
+        self._build_failure_links()
+
+    def _add(self, pattern, payload):
+        node = 0
+        for ch in pattern:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(payload)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text):
+        """
+        모든 매치 반환: [(시작, 끝, 가중치, 대표어), ...]
+        """
+        lowered = text.lower()
+        matches = []
+        node = 0
+        for index, ch in enumerate(lowered):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for length, weight, canonical, is_ascii in self._output[node]:
+                start = index - length + 1
+                end = index + 1
+                if is_ascii and not _ascii_boundary(lowered, start, end):
+                    continue
+                matches.append((start, end, weight, canonical))
+        return matches
+
+    def find_longest(self, text):
+        """
+        겹치는 매치 중 가장 왼쪽-가장 긴 것만 선택 ('기준금리'가 '금리'보다 우선)
+        """
+        selected = []
+        last_end = -1
+        for start, end, weight, canonical in sorted(self.find_all(text), key=lambda m: (m[0], -(m[1] - m[0]))):
+            if start >= last_end:
+                selected.append((start, end, weight, canonical))
+                last_end = end
+        return selected
+
+
+def _ascii_boundary(text, start, end):
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    return not (before.isascii() and before.isalnum()) and not (after.isascii() and after.isalnum())
+
+
+def load_lexicon(path=DEFAULT_LEXICON_PATH):
+    """
+    TSV 사전 로드: 용어<TAB>가중치<TAB>대표어(선택), '#'으로 시작하는 줄은 주석
+    """
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            columns = line.split('\t')
+            term = columns[0].strip()
+            weight = float(columns[1]) if len(columns) > 1 and columns[1] else 1.0
+            canonical = columns[2].strip() if len(columns) > 2 and columns[2].strip() else term
+            entries.append((term, weight, canonical))
+    return entries
+
+
+def build_matcher(entries):
+    started = time.perf_counter()
+    matcher = AhoCorasickMatcher(entries)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Economic lexicon compiled: {matcher.size} terms ({elapsed_ms}ms)")
+    return matcher
+
+
+# 컨테이너 초기화 시 한 번만 컴파일
+DEFAULT_MATCHER = build_matcher(load_lexicon())
+
+
+def extract_terms(text, limit=3, matcher=None):
+    """
+    사전 용어를 가중치(가중치 × 등장 횟수) 순으로 반환 (대표어 기준 중복 제거)
+    """
+    matcher = matcher or DEFAULT_MATCHER
+    scores = {}
+    first_seen = {}
+    for start, _, weight, canonical in matcher.find_longest(text):
+        scores[canonical] = scores.get(canonical, 0) + weight
+        first_seen.setdefault(canonical, start)
+    ranked = sorted(scores, key=lambda term: (-scores[term], first_seen[term]))
+    return ranked[:limit]
+
+
+def extract_stems(text, min_length=2, matcher=None):
+    """
+    사전 용어와 겹치지 않는 어절의 어간 (조사 제거, 불용어 제외, 등장 순서 유지)
+    """
+    matcher = matcher or DEFAULT_MATCHER
+    spans = [(start, end) for start, end, _, _ in matcher.find_longest(text)]
+
+    stems = []
+    for token in _TOKEN_PATTERN.finditer(text):
+        if any(start < token.end() and token.start() < end for start, end in spans):
+            continue
+        stem = strip_particle(token.group())
+        if len(stem) >= min_length and stem not in STOPWORDS and stem not in stems:
+            stems.append(stem)
+    return stems
+
+
+def _benchmark(sizes=(100, 1000, 10000, 50000), repeat=2000):
+    """
+    사전 크기별 추출 시간 측정 (합성 용어 + 기본 사전)
+    """
+    import random
+
+    base = load_lexicon()
+    syllables = [chr(code) for code in range(0xAC00, 0xAC00 + 400)]
+    rng = random.Random(42)
+    question = "기준금리가 오르면 환율과 코스피는 어떻게 되나요? 스태그플레이션 우려도 궁금합니다"
+
+    print(f"{'terms':>8} {'compile(ms)':>12} {'extract(us)':>12}")
+    for size in sizes:
+        synthetic = [(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 5))), 1.0, None)
+                     for _ in range(max(size - len(base), 0))]
+        entries = base + [(term, weight, term) for term, weight, _ in synthetic]
+
+        started = time.perf_counter()
+        matcher = AhoCorasickMatcher(entries)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            extract_terms(question, matcher=matcher)
+        extract_us = (time.perf_counter() - started) / repeat * 1e6
+        print(f"{matcher.size:>8} {compile_ms:>12.1f} {extract_us:>12.1f}")
+
+
+if __name__ == '__main__':
+    _benchmark()
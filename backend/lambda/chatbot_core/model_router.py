@@ -0,0 +1,375 @@
+"""
+Bedrock 모델 라우팅
+질문 복잡도로 빠른/강한 모델 체인을 고르고, Converse API로 호출하며
+스로틀링/타임아웃 시 체인의 다음 모델로 넘어감 (모델별 지연 시간/실패 이력으로 순서 조정)
+"""
+import os
+import re
+import time
+import threading
+import logging
+
+from chatbot_core.context_budget import estimate_tokens
+from chatbot_core.resilience import LatencyHistogram, CircuitBreaker
+from chatbot_core.streaming import stream_converse_tokens
+from chatbot_core.usage import usage_from_response
+
+logger = logging.getLogger()
+
+HAIKU_MODEL_ID = 'anthropic.claude-3-haiku-20240307-v1:0'
+SONNET_MODEL_ID = 'anthropic.claude-3-sonnet-20240229-v1:0'
+
+# 다음 모델로 넘어가는 오류 (일시적 과부하/지연, 해당 모델 사용 불가)
+FAILOVER_ERROR_CODES = {
+    'ThrottlingException', 'ServiceUnavailableException', 'ModelTimeoutException',
+    'ModelNotReadyException', 'InternalServerException', 'ServiceQuotaExceededException',
+    'ModelErrorException', 'AccessDeniedException', 'ResourceNotFoundException'
+}
+FAILOVER_EXCEPTION_NAMES = {
+    'ReadTimeoutError', 'ConnectTimeoutError', 'EndpointConnectionError', 'ConnectionClosedError',
+    'EventStreamError'
+}
+
+# 분석/추론이 필요한 질문에 자주 나오는 표현
+_COMPLEX_CUES = ('왜', '이유', '원인', '비교', '차이', '분석', '영향', '전망', '관계', '메커니즘',
+                 '장단점', '시나리오', '예측', '어떻게 되', '설명해', '자세히', 'why', 'compare', 'impact')
+# 짧은 확인/재질문 표현
+_SIMPLE_CUES = ('정답', '뭐예요', '뭔가요', '맞나요', '맞아요', '무슨 뜻', '뜻이', '다시', '요약', '한 줄')
+_CLAUSE_PATTERN = re.compile(r'[?？]|그리고|또한|그런데|반면')
+
+# 모델 호출 타임아웃 (SDK 재시도는 끄고 재시도는 데드라인을 아는 모델/리전 전환이 담당)
+MODEL_READ_TIMEOUT = int(os.environ.get('MODEL_READ_TIMEOUT', '25'))
+MODEL_MAX_ATTEMPTS = int(os.environ.get('MODEL_MAX_ATTEMPTS', '1'))
+# 리전별 클라이언트 커넥션 풀 크기 (배치 요청의 동시 호출 수 이상)
+MODEL_MAX_POOL_CONNECTIONS = int(os.environ.get('MODEL_MAX_POOL_CONNECTIONS', '10'))
+
+# 데드라인이 있는 호출: 남은 시간이 이보다 적으면 다음 모델/리전을 시도하지 않음
+MODEL_MIN_ATTEMPT_MS = int(os.environ.get('MODEL_MIN_ATTEMPT_MS', '2000'))
+
+_client_config = None
+
+
+class ModelChainExhausted(Exception):
+    """
+    체인의 모든 모델이 실패
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        summary = ', '.join(f"{model_id}: {type(error).__name__}" for model_id, error in errors)
+        super().__init__(f"All models failed ({summary})")
+
+
+def classify_complexity(question, context_tokens=0, follow_up=False):
+    """
+    질문 복잡도 분류 (모델 호출 없음) - 'simple' | 'complex'
+    짧은 확인 질문은 빠른 모델, 분석형 질문이나 긴 질문/긴 컨텍스트는 강한 모델
+    """
+    text = question.strip().lower()
+    tokens = estimate_tokens(text)
+
+    score = 0
+    if tokens > 60:
+        score += 2
+    elif tokens > 25:
+        score += 1
+    score += sum(1 for cue in _COMPLEX_CUES if cue in text)
+    score += max(len(_CLAUSE_PATTERN.findall(text)) - 1, 0)
+    if context_tokens > 600:
+        score += 1
+    if any(cue in text for cue in _SIMPLE_CUES):
+        score -= 1
+    if follow_up and tokens <= 25:
+        # 이전 대화에 기대는 짧은 후속 질문
+        score -= 1
+
+    return 'complex' if score >= 2 else 'simple'
+
+
+def to_converse_request(request_body):
+    """
+    Anthropic Messages 형식 요청 본문 → Converse 인자
+    """
+    messages = []
+    for message in request_body.get('messages', []):
+        content = message['content']
+        if isinstance(content, str):
+            blocks = [{'text': content}]
+        else:
+            blocks = [{'text': block['text']} for block in content if block.get('text')]
+        messages.append({'role': message['role'], 'content': blocks})
+
+    inference_config = {'maxTokens': request_body.get('max_tokens', 1000)}
+    if 'temperature' in request_body:
+        inference_config['temperature'] = request_body['temperature']
+    if 'top_p' in request_body:
+        inference_config['topP'] = request_body['top_p']
+
+    converse_request = {'messages': messages, 'inferenceConfig': inference_config}
+    if request_body.get('system'):
+        converse_request['system'] = [{'text': request_body['system']}]
+    return converse_request
+
+
+def is_model_unavailable_error(error):
+    """
+    호출한 리전에서 제공하지 않는 모델 (잘못된 모델 ID 검증 오류)
+    """
+    details = getattr(error, 'response', {}).get('Error', {})
+    return details.get('Code') == 'ValidationException' and 'model identifier' in details.get('Message', '')
+
+
+def is_failover_error(error):
+    """
+    다음 모델로 넘어갈 오류인지 판단 (botocore를 import하지 않고 오류 코드/클래스 이름으로 확인)
+    """
+    code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+    if code in FAILOVER_ERROR_CODES or is_model_unavailable_error(error):
+        return True
+    return any(cls.__name__ in FAILOVER_EXCEPTION_NAMES for cls in type(error).__mro__)
+
+
+def bedrock_client_config():
+    """
+    라우터용 Bedrock 클라이언트 설정 (botocore는 첫 호출 시 import)
+    리전마다 이 설정 하나로 만든 클라이언트(커넥션 풀)를 예열/요청이 함께 사용
+    """
+    global _client_config
+
+    if _client_config is None:
+        from botocore.config import Config
+
+        _client_config = Config(
+            connect_timeout=3,
+            read_timeout=MODEL_READ_TIMEOUT,
+            retries={'mode': 'standard', 'max_attempts': MODEL_MAX_ATTEMPTS},
+            max_pool_connections=MODEL_MAX_POOL_CONNECTIONS
+        )
+    return _client_config
+
+
+def remaining_ms(deadline):
+    """
+    데드라인(monotonic)까지 남은 시간 (ms), 데드라인이 없으면 None
+    """
+    if deadline is None:
+        return None
+    return (deadline - time.monotonic()) * 1000
+
+
+class DeadlineExceeded(Exception):
+    """
+    남은 응답 시간이 부족해 모델/리전 호출을 시작하지 않음
+    """
+
+
+class RegionsExhausted(Exception):
+    """
+    이번 요청에서 모든 리전이 이미 리전 단위 오류(스로틀링 등)로 실패해 호출하지 않음
+    다른 모델도 같은 리전을 써야 하므로 체인을 멈춤 (모델 실패로 기록하지 않음)
+    """
+
+
+def _parse_chain(value, default):
+    models = [model.strip() for model in (value or '').split(',') if model.strip()]
+    return models or list(default)
+
+
+class ModelRouter:
+    """
+    복잡도별 모델 체인 + 모델별 지연 시간 히스토그램/서킷 브레이커
+
+    chains: {'simple': [모델...], 'complex': [모델...]}
+    최근 p95가 latency_slo_ms를 넘거나 서킷이 열린 모델은 체인 뒤로 이동
+    """
+
+    def __init__(self, chains=None, latency_slo_ms=8000, min_samples=10, failure_threshold=2, cooldown=60):
+        self.chains = chains or {
+            'simple': _parse_chain(os.environ.get('MODEL_CHAIN_SIMPLE'), (HAIKU_MODEL_ID, SONNET_MODEL_ID)),
+            'complex': _parse_chain(os.environ.get('MODEL_CHAIN_COMPLEX'), (SONNET_MODEL_ID, HAIKU_MODEL_ID))
+        }
+        self.latency_slo_ms = latency_slo_ms
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._histograms = {}
+        self._breakers = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def _model_state(self, model_id):
+        with self._lock:
+            if model_id not in self._histograms:
+                self._histograms[model_id] = LatencyHistogram(window=100)
+                self._breakers[model_id] = CircuitBreaker(self.failure_threshold, self.cooldown)
+                self._counts[model_id] = {'calls': 0, 'failures': 0, 'failovers': 0}
+            return self._histograms[model_id], self._breakers[model_id], self._counts[model_id]
+
+    def _is_slow(self, model_id):
+        histogram, _, _ = self._model_state(model_id)
+        if len(histogram) < self.min_samples:
+            return False
+        return histogram.percentile(95) > self.latency_slo_ms
+
+    def route(self, complexity):
+        """
+        호출 순서 결정 - 정상 모델 먼저, 느린 모델, 서킷이 열린 모델 순 (같은 그룹은 설정 순서 유지)
+        """
+        chain = self.chains.get(complexity) or self.chains['complex']
+
+        def rank(model_id):
+            _, breaker, _ = self._model_state(model_id)
+            return (breaker.state == 'open', self._is_slow(model_id))
+
+        return sorted(chain, key=rank)
+
+    def _attempts(self, complexity):
+        """
+        시도할 모델 순회 - 서킷이 열린 모델은 건너뛰되, 체인의 마지막 모델은 항상 시도
+        시도마다 성공/실패를 기록해야 하며, 기록 없이 끝난 시도(중단된 스트림 등)는
+        다음 모델로 넘어가거나 순회가 끝날 때 half-open 시험 권한을 반환
+        """
+        ordered = self.route(complexity)
+        for index, model_id in enumerate(ordered):
+            _, breaker, _ = self._model_state(model_id)
+            allowed = breaker.allow()
+            if not allowed and index < len(ordered) - 1:
+                continue
+            attempt = {'model_id': model_id, 'recorded': False}
+            try:
+                yield attempt
+            finally:
+                if allowed and not attempt['recorded']:
+                    breaker.release()
+
+    def _record_success(self, attempt, latency_ms):
+        model_id = attempt['model_id']
+        attempt['recorded'] = True
+        histogram, breaker, counts = self._model_state(model_id)
+        histogram.record(latency_ms)
+        breaker.record_success()
+        with self._lock:
+            counts['calls'] += 1
+
+    def _record_failure(self, attempt, error):
+        model_id = attempt['model_id']
+        attempt['recorded'] = True
+        _, breaker, counts = self._model_state(model_id)
+        breaker.record_failure()
+        with self._lock:
+            counts['calls'] += 1
+            counts['failures'] += 1
+            counts['failovers'] += int(is_failover_error(error))
+
+    def converse(self, bedrock, request_body, complexity, metrics=None, deadline=None):
+        """
+        Converse 호출 - 응답 텍스트 반환, 모든 모델 실패 시 ModelChainExhausted
+        metrics에 model_id, complexity, attempts, input_tokens, output_tokens, latency_ms,
+        model_latency_ms(서버 처리 시간), region 기록
+        deadline(monotonic)이 있으면 남은 시간이 MODEL_MIN_ATTEMPT_MS 미만일 때 다음 모델을 시도하지 않음
+        (bedrock도 같은 데드라인의 RegionalClient를 넘겨야 시도별 읽기 타임아웃이 남은 시간에 맞춰짐)
+        """
+        if metrics is None:
+            metrics = {}
+        converse_request = to_converse_request(request_body)
+        metrics['complexity'] = complexity
+        metrics['attempts'] = []
+
+        errors = []
+        for attempt in self._attempts(complexity):
+            model_id = attempt['model_id']
+            if deadline is not None and remaining_ms(deadline) < MODEL_MIN_ATTEMPT_MS:
+                errors.append((model_id, DeadlineExceeded(f"{remaining_ms(deadline):.0f}ms left")))
+                logger.warning(f"Model chain stopped before {model_id}: response deadline reached")
+                break
+            metrics['attempts'].append(model_id)
+            started = time.monotonic()
+            try:
+                response = bedrock.converse(modelId=model_id, **converse_request)
+            except RegionsExhausted as e:
+                errors.append((model_id, e))
+                logger.warning(f"Model chain stopped before {model_id}: {str(e)}")
+                break
+            except Exception as e:
+                self._record_failure(attempt, e)
+                errors.append((model_id, e))
+                logger.warning(f"Model {model_id} failed ({type(e).__name__}): {str(e)}")
+                if not is_failover_error(e):
+                    break
+                continue
+
+            latency_ms = (time.monotonic() - started) * 1000
+            self._record_success(attempt, latency_ms)
+
+            input_tokens, output_tokens, model_latency_ms = usage_from_response(response)
+            metrics['model_id'] = model_id
+            metrics['input_tokens'] = input_tokens
+            metrics['output_tokens'] = output_tokens
+            metrics['latency_ms'] = round(latency_ms, 1)
+            metrics['model_latency_ms'] = model_latency_ms
+            metrics['stop_reason'] = response.get('stopReason')
+            metrics['region'] = response.get('ResponseMetadata', {}).get('Region')
+
+            content = response.get('output', {}).get('message', {}).get('content', [])
+            return ''.join(block.get('text', '') for block in content)
+
+        raise ModelChainExhausted(errors)
+
+    def converse_stream(self, bedrock, request_body, complexity, metrics=None, deadline=None):
+        """
+        ConverseStream 호출 - 텍스트 조각 yield
+        첫 토큰 전에 실패하면 다음 모델로 넘어감 (토큰 전송 후 실패는 그대로 예외)
+        deadline은 converse와 같음 (이미 받기 시작한 스트림은 끝까지 전달)
+        """
+        if metrics is None:
+            metrics = {}
+        converse_request = to_converse_request(request_body)
+        metrics['complexity'] = complexity
+        metrics['attempts'] = []
+
+        errors = []
+        for attempt in self._attempts(complexity):
+            model_id = attempt['model_id']
+            if deadline is not None and remaining_ms(deadline) < MODEL_MIN_ATTEMPT_MS:
+                errors.append((model_id, DeadlineExceeded(f"{remaining_ms(deadline):.0f}ms left")))
+                logger.warning(f"Model stream chain stopped before {model_id}: response deadline reached")
+                break
+            metrics['attempts'].append(model_id)
+            metrics['model_id'] = model_id
+            sent_any = False
+            try:
+                for text in stream_converse_tokens(bedrock, model_id, converse_request, metrics):
+                    sent_any = True
+                    yield text
+            except RegionsExhausted as e:
+                errors.append((model_id, e))
+                logger.warning(f"Model stream chain stopped before {model_id}: {str(e)}")
+                break
+            except Exception as e:
+                self._record_failure(attempt, e)
+                errors.append((model_id, e))
+                logger.warning(f"Model {model_id} stream failed ({type(e).__name__}): {str(e)}")
+                if sent_any or not is_failover_error(e):
+                    raise
+                continue
+
+            self._record_success(attempt, metrics.get('total_ms') or 0)
+            return
+
+        raise ModelChainExhausted(errors)
+
+    def stats(self):
+        """
+        모델별 호출/실패 수, 서킷 상태, 지연 시간 분포
+        """
+        with self._lock:
+            model_ids = list(self._counts)
+        stats = {}
+        for model_id in model_ids:
+            histogram, breaker, counts = self._model_state(model_id)
+            with self._lock:
+                model_stats = dict(counts)
+            model_stats['circuit'] = breaker.state
+            model_stats['latency'] = histogram.snapshot()
+            stats[model_id] = model_stats
+        return stats
@@ -0,0 +1,294 @@
+"""
+퀴즈 코퍼스 BM25 인덱스
+/quizzes/all 스냅샷(QuizItem 문제/정답/해설/힌트)으로 역색인을 만들고
+mmap 가능한 배열 기반 포스팅 파일로 저장, 네트워크 없이 로컬 검색
+
+사용법:
+    curl -s https://<quiz-api>/prod/quizzes/all > quizzes.json
+    python3 -m chatbot_core.quiz_index build quizzes.json -o chatbot_core/data/quiz_index.bin
+    python3 -m chatbot_core.quiz_index search "기준금리 동결"
+"""
+import os
+import re
+import sys
+import json
+import math
+import mmap
+import array
+import struct
+import threading
+import logging
+
+logger = logging.getLogger()
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    'QUIZ_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'quiz_index.bin')
+)
+
+GAME_TYPES = ('BlackSwan', 'PrisonersDilemma', 'SignalDecoding')
+
+# 파일 형식: MAGIC | header 길이(uint32) | header JSON | 4바이트 정렬 패딩 | 포스팅(uint32 배열)
+MAGIC = b'QBM25\x00\x01\x00'
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_PATTERN = re.compile(r'[0-9a-z가-힣]+')
+
+
+def tokenize(text):
+    """
+    색인/검색용 용어 (영문/숫자 단어, 한글은 어절 + 2-gram)
+    형태소 분석기 없이 조사가 붙은 어절도 매칭되도록 2-gram 사용
+    """
+    terms = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        terms.append(word)
+        if len(word) > 2 and not word.isascii():
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def iter_snapshot_questions(snapshot):
+    """
+    /quizzes/all 응답 형식 정규화 → (gameType, quizDate, question dict)
+    API Gateway 래핑({'body': '...'})과 gameType별 dict 형식 모두 지원
+    """
+    if isinstance(snapshot, dict) and 'body' in snapshot:
+        body = snapshot['body']
+        snapshot = json.loads(body) if isinstance(body, str) else body
+
+    if isinstance(snapshot, dict):
+        for game_type, by_date in snapshot.items():
+            for quiz_date, questions in (by_date or {}).items():
+                for question in questions or []:
+                    yield game_type, quiz_date, question
+        return
+
+    for item in snapshot or []:
+        questions = (item.get('data') or {}).get('questions') or []
+        for question in questions:
+            yield item.get('gameType', ''), item.get('quizDate', ''), question
+
+
+def _hints(question):
+    hints = question.get('hint') or question.get('hints') or []
+    if isinstance(hints, str):
+        hints = [hints]
+    return [hint for hint in hints if hint]
+
+
+def _document_text(question):
+    hints = _hints(question)
+    parts = [question.get('question', ''), question.get('answer', ''), question.get('explanation', '')]
+    parts.extend(hints)
+    return '\n'.join(part for part in parts if part)
+
+
+def build_index(snapshot, output_path):
+    """
+    스냅샷으로 인덱스 파일 생성 - 반환: 문서 수
+    """
+    docs = []
+    doc_lengths = []
+    postings = {}
+
+    for game_type, quiz_date, question in iter_snapshot_questions(snapshot):
+        text = _document_text(question)
+        if not text:
+            continue
+
+        doc_id = len(docs)
+        terms = tokenize(text)
+        doc_lengths.append(len(terms))
+
+        frequencies = {}
+        for term in terms:
+            frequencies[term] = frequencies.get(term, 0) + 1
+        for term, tf in frequencies.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+        docs.append({
+            'gameType': game_type,
+            'quizDate': quiz_date,
+            'questionId': question.get('questionId', question.get('id')),
+            'question': question.get('question', ''),
+            'answer': question.get('answer', ''),
+            'explanation': question.get('explanation', ''),
+            'hint': _hints(question)
+        })
+
+    # 용어별로 [doc_id..., tf...]를 이어붙인 uint32 배열
+    data = array.array('I')
+    vocab = {}
+    for term in sorted(postings):
+        entries = postings[term]
+        vocab[term] = [len(data), len(entries)]
+        data.extend(doc_id for doc_id, _ in entries)
+        data.extend(tf for _, tf in entries)
+
+    header = json.dumps({
+        'version': 1,
+        'docs': docs,
+        'doc_lengths': doc_lengths,
+        'avgdl': (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0,
+        'vocab': vocab
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    padding = (-(len(MAGIC) + 4 + len(header))) % 4
+    if sys.byteorder != 'little':
+        data.byteswap()
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(b'\x00' * padding)
+        data.tofile(f)
+    os.replace(tmp_path, output_path)
+
+    return len(docs)
+
+
+class QuizIndex:
+    """
+    mmap으로 연 BM25 인덱스 (포스팅은 필요한 용어만 페이지 단위로 읽힘)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Invalid quiz index file: {path}")
+
+        header_length = struct.unpack_from('<I', self._mmap, len(MAGIC))[0]
+        header_start = len(MAGIC) + 4
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode('utf-8'))
+
+        postings_start = header_start + header_length
+        postings_start += (-postings_start) % 4
+        self._postings = memoryview(self._mmap)[postings_start:].cast('I')
+
+        self.docs = header['docs']
+        self.doc_lengths = header['doc_lengths']
+        self.avgdl = header['avgdl'] or 1.0
+        self.vocab = header['vocab']
+
+    def search(self, query, limit=3, game_type=None):
+        """
+        BM25 상위 문서 반환: [(점수, 문서 메타), ...]
+        game_type이 주어지면 같은 게임 문서에 가산점
+        """
+        total_docs = len(self.docs)
+        if not total_docs:
+            return []
+
+        scores = {}
+        for term in set(tokenize(query)):
+            entry = self.vocab.get(term)
+            if entry is None:
+                continue
+            offset, df = entry
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            doc_ids = self._postings[offset:offset + df]
+            tfs = self._postings[offset + df:offset + 2 * df]
+            for doc_id, tf in zip(doc_ids, tfs):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / self.avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        if game_type:
+            for doc_id in scores:
+                if self.docs[doc_id]['gameType'] == game_type:
+                    scores[doc_id] *= 1.2
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+        return [(round(score, 3), self.docs[doc_id]) for doc_id, score in ranked]
+
+    def find_question(self, question_text, game_type=None):
+        """
+        문제 원문과 같은 문서 반환 (공백 차이 무시, 없으면 None)
+        """
+        target = ' '.join(question_text.split())
+        if not target:
+            return None
+        for _, doc in self.search(question_text, limit=3, game_type=game_type):
+            if ' '.join(doc['question'].split()) == target:
+                return doc
+        return None
+
+    def close(self):
+        self._postings.release()
+        self._mmap.close()
+        self._file.close()
+
+
+_index = None
+_index_loaded = False
+_lock = threading.Lock()
+
+
+def get_quiz_index(path=None):
+    """
+    컨테이너 단위 인덱스 (최초 호출 시 로드, 파일이 없으면 None)
+    """
+    global _index, _index_loaded
+
+    if _index_loaded:
+        return _index
+
+    with _lock:
+        if not _index_loaded:
+            index_path = path or DEFAULT_INDEX_PATH
+            if os.path.exists(index_path):
+                try:
+                    _index = QuizIndex(index_path)
+                    logger.info(f"Quiz index loaded: {len(_index.docs)} docs, {len(_index.vocab)} terms")
+                except (OSError, ValueError) as e:
+                    logger.error(f"Quiz index load failed: {str(e)}")
+            else:
+                logger.info(f"Quiz index not found: {index_path}")
+            _index_loaded = True
+    return _index
+
+
+def main(argv):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(prog='python3 -m chatbot_core.quiz_index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='스냅샷으로 인덱스 생성')
+    build_parser.add_argument('snapshot')
+    build_parser.add_argument('-o', '--output', default=DEFAULT_INDEX_PATH)
+
+    search_parser = subparsers.add_parser('search', help='인덱스 검색')
+    search_parser.add_argument('query')
+    search_parser.add_argument('-i', '--index', default=DEFAULT_INDEX_PATH)
+    search_parser.add_argument('-g', '--game-type', choices=GAME_TYPES)
+    search_parser.add_argument('-k', '--limit', type=int, default=3)
+
+    args = parser.parse_args(argv[1:])
+
+    if args.command == 'build':
+        with open(args.snapshot, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        count = build_index(snapshot, args.output)
+        print(f"✅ {count} questions indexed → {args.output} ({os.path.getsize(args.output) / 1024:.1f}KB)")
+        return 0
+
+    index = QuizIndex(args.index)
+    started = time.perf_counter()
+    results = index.search(args.query, limit=args.limit, game_type=args.game_type)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for score, doc in results:
+        print(f"{score:>7.3f}  [{doc['gameType']} {doc['quizDate']}] {doc['question']} → {doc['answer']}")
+    print(f"({elapsed_ms:.2f}ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
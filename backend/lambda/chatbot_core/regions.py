@@ -0,0 +1,357 @@
+"""
+멀티 리전 Bedrock 클라이언트 풀
+설정된 리전별 클라이언트를 유지하고, 관측 지연 시간(EWMA)과 오류율로 순위를 매겨
+가까운 정상 리전을 우선 사용하며 리전 단위 오류 시 다음 리전으로 자동 전환
+"""
+import os
+import time
+import socket
+import threading
+import logging
+
+from chatbot_core.clients import get_client
+from chatbot_core.resilience import CircuitBreaker
+from chatbot_core.model_router import (
+    is_failover_error, is_model_unavailable_error, remaining_ms, DeadlineExceeded, RegionsExhausted,
+    MODEL_MIN_ATTEMPT_MS
+)
+
+logger = logging.getLogger()
+
+# 기본값: 배포 리전(서울) → 도쿄 → 버지니아 순
+DEFAULT_REGIONS = ('ap-northeast-2', 'ap-northeast-1', 'us-east-1')
+
+# 프로브(TCP 연결 시간)를 API 호출 지연으로 환산하는 배수 (TLS + 요청 왕복)
+PROBE_RTT_FACTOR = 3
+PROBE_INTERVAL = int(os.environ.get('BEDROCK_REGION_PROBE_INTERVAL', '300'))
+
+# 리전에 없는 모델 기록 유지 시간 (초) - 지나면 모델 출시/활성화 여부를 다시 확인
+MODEL_UNAVAILABLE_TTL = int(os.environ.get('BEDROCK_MODEL_UNAVAILABLE_TTL', '3600'))
+
+# 예열 요청용 모델 ID - 서버가 검증 오류로 바로 거절하므로 추론/과금 없음
+WARMUP_MODEL_ID = 'warmup'
+
+
+def regions_from_env():
+    value = os.environ.get('BEDROCK_REGIONS', '')
+    regions = [region.strip() for region in value.split(',') if region.strip()]
+    return regions or list(DEFAULT_REGIONS)
+
+
+class RegionPool:
+    """
+    리전별 상태: 지연 시간 EWMA, 오류율(시간 감쇠), 서킷 브레이커, 최근 프로브 결과
+
+    순위: 서킷이 닫힌 리전 → 지연 시간 추정치(관측값, 없으면 프로브 환산값) × (1 + 3 × 오류율) → 설정 순서
+    추정치가 없는 리전은 가장 빠른 리전과 같다고 보고, 오류율은 error_half_life마다 절반으로 줄어
+    한동안 오류가 없던 가까운 리전이 다시 우선 순위로 돌아옴
+
+    리전에서 제공하지 않는 모델은 리전 장애와 따로 (리전, 모델) 단위로 기록해
+    그 모델 호출에서만 해당 리전을 건너뜀 (오류율/서킷에는 반영하지 않음)
+    """
+
+    def __init__(self, regions=None, service_name='bedrock-runtime', config=None, alpha=0.3,
+                 failure_threshold=2, cooldown=30, error_half_life=60):
+        self.regions = list(regions or regions_from_env())
+        self.service_name = service_name
+        self.config = config
+        self.alpha = alpha
+        self.error_half_life = error_half_life
+        self._lock = threading.Lock()
+        self._probing = False
+        self._last_probe = 0.0
+        # (리전, 모델 ID) → (기록 시각, 오류)
+        self._unavailable = {}
+        self._state = {
+            region: {
+                'latency_ms': None,
+                'error_rate': 0.0,
+                'error_at': 0.0,
+                'probe_ms': None,
+                'calls': 0,
+                'failures': 0,
+                'breaker': CircuitBreaker(failure_threshold, cooldown)
+            }
+            for region in self.regions
+        }
+
+    def client(self, region):
+        config = self.config() if callable(self.config) else self.config
+        return get_client(self.service_name, region_name=region, config=config)
+
+    def _estimate(self, state):
+        if state['latency_ms'] is not None:
+            return state['latency_ms']
+        if state['probe_ms'] is not None:
+            return state['probe_ms'] * PROBE_RTT_FACTOR
+        return None
+
+    def _error_rate(self, state, now):
+        if not state['error_rate']:
+            return 0.0
+        return state['error_rate'] * 0.5 ** ((now - state['error_at']) / self.error_half_life)
+
+    def ranked(self):
+        """
+        현재 선호 순서의 리전 목록
+        """
+        now = time.monotonic()
+        with self._lock:
+            estimates = {region: self._estimate(self._state[region]) for region in self.regions}
+            known = [estimate for estimate in estimates.values() if estimate is not None]
+            prior = min(known) if known else 1.0
+
+            entries = []
+            for order, region in enumerate(self.regions):
+                state = self._state[region]
+                estimate = estimates[region] if estimates[region] is not None else prior
+                error_rate = self._error_rate(state, now)
+                # 남은 오류율이 작으면 무시 (가까운 리전으로 복귀)
+                penalty = 1 + 3 * error_rate if error_rate >= 0.05 else 1
+                entries.append((state['breaker'].state == 'open', estimate * penalty, order, region))
+        return [entry[-1] for entry in sorted(entries)]
+
+    def record_success(self, region, latency_ms):
+        now = time.monotonic()
+        with self._lock:
+            state = self._state[region]
+            state['calls'] += 1
+            if state['latency_ms'] is None:
+                state['latency_ms'] = latency_ms
+            else:
+                state['latency_ms'] += self.alpha * (latency_ms - state['latency_ms'])
+            state['error_rate'] = self._error_rate(state, now) * (1 - self.alpha)
+            state['error_at'] = now
+        state['breaker'].record_success()
+
+    def mark_unavailable(self, region, model_id, error):
+        with self._lock:
+            self._unavailable[(region, model_id)] = (time.monotonic(), error)
+
+    def unavailable_error(self, region, model_id):
+        """
+        리전에 없는 것으로 기록된 모델이면 그때의 오류, 아니면 None (MODEL_UNAVAILABLE_TTL 지나면 만료)
+        """
+        if not model_id:
+            return None
+        with self._lock:
+            entry = self._unavailable.get((region, model_id))
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > MODEL_UNAVAILABLE_TTL:
+                del self._unavailable[(region, model_id)]
+                return None
+            return entry[1]
+
+    def record_failure(self, region):
+        now = time.monotonic()
+        with self._lock:
+            state = self._state[region]
+            state['calls'] += 1
+            state['failures'] += 1
+            error_rate = self._error_rate(state, now)
+            state['error_rate'] = error_rate + self.alpha * (1 - error_rate)
+            state['error_at'] = now
+        state['breaker'].record_failure()
+
+    def call(self, operation, deadline=None, failed_regions=None, **kwargs):
+        """
+        순위대로 리전을 시도하며 클라이언트 메서드 호출
+        리전 단위 오류면 다음 리전, 그 외 오류나 마지막 리전 실패는 그대로 예외
+        failed_regions: 요청 단위 set - 리전 단위 오류가 난 리전을 추가하고, 이미 있는 리전은 시도하지 않음
+        (다음 모델로 넘어가도 스로틀링 중인 리전을 다시 호출하지 않도록, 남은 리전이 없으면 RegionsExhausted)
+        deadline(monotonic)이 있으면 남은 시간이 MODEL_MIN_ATTEMPT_MS 미만일 때 다음 리전을 시도하지 않음
+        (시도별 읽기 타임아웃은 클라이언트 설정값 고정 - 리전당 클라이언트/커넥션 풀 하나 유지)
+        """
+        self._maybe_reprobe()
+
+        model_id = kwargs.get('modelId')
+        ordered = []
+        skipped = []
+        last_error = None
+        for region in self.ranked():
+            if failed_regions and region in failed_regions:
+                skipped.append(region)
+                continue
+            unavailable = self.unavailable_error(region, model_id)
+            if unavailable is None:
+                ordered.append(region)
+            else:
+                last_error = unavailable
+        if not ordered:
+            if skipped:
+                raise RegionsExhausted(f"regions already failed in this request: {', '.join(skipped)}")
+            # 설정된 모든 리전에 없는 모델 - 호출 없이 실패 (모델 라우터가 다음 모델로 전환)
+            raise last_error
+
+        for index, region in enumerate(ordered):
+            breaker = self._state[region]['breaker']
+            allowed = breaker.allow()
+            if not allowed and index < len(ordered) - 1:
+                continue
+
+            if deadline is not None and remaining_ms(deadline) < MODEL_MIN_ATTEMPT_MS:
+                if allowed:
+                    breaker.release()
+                logger.warning(f"Bedrock {operation} not attempted in {region}: response deadline reached")
+                raise last_error or DeadlineExceeded(f"{remaining_ms(deadline):.0f}ms left")
+
+            started = time.monotonic()
+            try:
+                response = getattr(self.client(region), operation)(**kwargs)
+            except Exception as e:
+                if is_model_unavailable_error(e):
+                    # 리전 장애가 아니므로 오류율/서킷에 반영하지 않고 이 모델만 이 리전을 건너뜀
+                    if allowed:
+                        breaker.release()
+                    self.mark_unavailable(region, model_id, e)
+                    last_error = e
+                    logger.warning(f"Bedrock model {model_id} not offered in {region}, trying next region")
+                    continue
+                if not is_failover_error(e):
+                    # 요청/자격 증명 오류 등은 리전 상태와 무관하므로 기록하지 않고,
+                    # half-open 시험 권한만 반환 (반환하지 않으면 이 리전은 다시 시험 호출을 받지 못함)
+                    if allowed:
+                        breaker.release()
+                    raise
+                self.record_failure(region)
+                if failed_regions is not None:
+                    failed_regions.add(region)
+                last_error = e
+                logger.warning(f"Bedrock {operation} failed in {region} ({type(e).__name__}), trying next region")
+                continue
+
+            elapsed_ms = (time.monotonic() - started) * 1000
+            # Converse는 모델 처리 시간을 빼서 리전 간 비교 가능한 네트워크/대기 시간만 반영
+            server_ms = response.get('metrics', {}).get('latencyMs') if isinstance(response, dict) else None
+            self.record_success(region, max(elapsed_ms - server_ms, 0) if server_ms else elapsed_ms)
+            if isinstance(response, dict):
+                response.setdefault('ResponseMetadata', {})['Region'] = region
+            return response
+
+        raise last_error
+
+    def probe(self, timeout=1.0, background=False):
+        """
+        리전 엔드포인트 TCP 연결 시간 측정 (SDK 호출 없음)
+        """
+        if background:
+            with self._lock:
+                if self._probing:
+                    return None
+                self._probing = True
+            thread = threading.Thread(target=self._probe_all, args=(timeout,), name='region-probe', daemon=True)
+            thread.start()
+            return thread
+
+        with self._lock:
+            self._probing = True
+        self._probe_all(timeout)
+        return self.snapshot()
+
+    def _probe_all(self, timeout):
+        try:
+            for region in self.regions:
+                host = f"{self.service_name}.{region}.amazonaws.com"
+                started = time.monotonic()
+                try:
+                    with socket.create_connection((host, 443), timeout=timeout):
+                        probe_ms = (time.monotonic() - started) * 1000
+                except OSError as e:
+                    logger.warning(f"Region probe failed ({region}): {str(e)}")
+                    probe_ms = None
+                with self._lock:
+                    self._state[region]['probe_ms'] = probe_ms
+        finally:
+            with self._lock:
+                self._probing = False
+                self._last_probe = time.monotonic()
+
+    def _maybe_reprobe(self):
+        if PROBE_INTERVAL > 0 and self._last_probe and time.monotonic() - self._last_probe > PROBE_INTERVAL:
+            self.probe(background=True)
+
+    def snapshot(self):
+        """
+        디버깅용 순위/상태 목록
+        """
+        ranking = self.ranked()
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'region': region,
+                    'rank': rank,
+                    'latency_ms': round(self._state[region]['latency_ms'], 1)
+                    if self._state[region]['latency_ms'] is not None else None,
+                    'probe_ms': round(self._state[region]['probe_ms'], 1)
+                    if self._state[region]['probe_ms'] is not None else None,
+                    'error_rate': round(self._error_rate(self._state[region], now), 3),
+                    'calls': self._state[region]['calls'],
+                    'failures': self._state[region]['failures'],
+                    'circuit': self._state[region]['breaker'].state,
+                    'unavailable_models': sorted(
+                        model_id for unavailable_region, model_id in self._unavailable
+                        if unavailable_region == region
+                    )
+                }
+                for rank, region in enumerate(ranking)
+            ]
+
+    def warm(self, limit=None):
+        """
+        순위 상위 리전 예열 - 클라이언트 생성 후 잘못된 모델 ID로 Converse를 두 번 호출
+        첫 호출은 자격 증명/엔드포인트 확인 + TLS 연결, 두 번째는 재사용 연결의 왕복 시간(순위에 반영)
+        """
+        timings = {}
+        for region in self.ranked()[:limit]:
+            started = time.perf_counter()
+            try:
+                client = self.client(region)
+                client_ms = (time.perf_counter() - started) * 1000
+                connect_ms = self._warm_request(client)
+                rtt_ms = self._warm_request(client)
+            except Exception as e:
+                logger.warning(f"Region warm-up failed ({region}): {str(e)}")
+                timings[region] = {'error': type(e).__name__}
+                continue
+            self.record_success(region, rtt_ms)
+            timings[region] = {
+                'client_ms': round(client_ms, 1),
+                'connect_ms': round(connect_ms, 1),
+                'rtt_ms': round(rtt_ms, 1)
+            }
+        return timings
+
+    def _warm_request(self, client):
+        started = time.perf_counter()
+        try:
+            client.converse(modelId=WARMUP_MODEL_ID, messages=[{'role': 'user', 'content': [{'text': '.'}]}])
+        except Exception as e:
+            # 서버가 응답한 오류(HTTP 상태 코드 있음)면 연결은 성공
+            if not getattr(e, 'response', {}).get('ResponseMetadata', {}).get('HTTPStatusCode'):
+                raise
+        return (time.perf_counter() - started) * 1000
+
+    def bedrock(self, deadline=None):
+        """
+        단일 클라이언트처럼 쓸 수 있는 리전 전환 프록시 (converse, converse_stream, count_tokens 등)
+        요청마다 새로 만들어 씀 - deadline(monotonic)과 리전 단위 오류가 난 리전 목록을 요청 안에서 공유
+        """
+        return RegionalClient(self, deadline)
+
+
+class RegionalClient:
+    """
+    RegionPool을 boto3 클라이언트 인터페이스로 감싼 프록시
+    """
+
+    def __init__(self, pool, deadline=None):
+        self._pool = pool
+        self._deadline = deadline
+        self._failed_regions = set()
+
+    def __getattr__(self, operation):
+        def call(**kwargs):
+            return self._pool.call(operation, deadline=self._deadline, failed_regions=self._failed_regions, **kwargs)
+        return call
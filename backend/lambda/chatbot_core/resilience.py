@@ -0,0 +1,229 @@
+"""
+외부 API 호출 보호 계층
+최근 지연 시간 분포(롤링 히스토그램) 기반 헤징 요청 + 연속 실패 시 서킷 브레이커
+"""
+import os
+import time
+import bisect
+import threading
+import logging
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger()
+
+# 헤징 요청 전용 워커 수 (RAG 수집 풀 안에서 호출되므로 별도 풀 사용)
+HEDGE_MAX_WORKERS = int(os.environ.get('HEDGE_MAX_WORKERS', '4'))
+
+# 히스토그램 버킷 상한 (ms)
+LATENCY_BUCKETS_MS = (50, 100, 200, 400, 800, 1600, 3200, 6400, 12800)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """
+    서킷이 열려 있어 호출을 건너뜀
+    """
+
+
+def _get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix='hedge')
+        return _executor
+
+
+class LatencyHistogram:
+    """
+    최근 window개 성공 호출의 지연 시간 (백분위 계산용) + 누적 버킷 카운트
+    """
+
+    def __init__(self, window=200, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._samples = deque(maxlen=window)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms):
+        with self._lock:
+            self._samples.append(latency_ms)
+            self._counts[bisect.bisect_left(self.buckets, latency_ms)] += 1
+
+    def percentile(self, p):
+        """
+        롤링 윈도 백분위 (ms), 샘플이 없으면 None
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(int(round(p / 100 * (len(samples) - 1))), len(samples) - 1)
+        return samples[index]
+
+    def __len__(self):
+        return len(self._samples)
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            'samples': len(self),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': {label: count for label, count in zip(labels, counts) if count}
+        }
+
+
+class CircuitBreaker:
+    """
+    연속 failure_threshold회 실패 시 cooldown초 동안 열림(open)
+    쿨다운 후 한 번의 시험 호출(half-open)이 성공하면 닫힘
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=30):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release(self):
+        """
+        결과를 기록하지 않고 끝난 호출(요청 오류, 중단된 스트림 등)의 half-open 시험 권한 반환
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                return 'half_open'
+            return 'open'
+
+
+class ResilientEndpoint:
+    """
+    외부 API 한 곳에 대한 호출 정책
+    첫 요청이 최근 p{hedge_percentile}을 넘기면 같은 요청을 한 번 더 보내고 먼저 성공한 응답 사용
+    """
+
+    def __init__(self, name, timeout=5.0, hedge_percentile=95, default_hedge_ms=1500, min_hedge_ms=200,
+                 min_samples=20, failure_threshold=3, cooldown=30, window=200):
+        self.name = name
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_ms = default_hedge_ms
+        self.min_hedge_ms = min_hedge_ms
+        self.min_samples = min_samples
+        self.histogram = LatencyHistogram(window=window)
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, cooldown=cooldown)
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'hedged': 0, 'hedge_wins': 0, 'failures': 0, 'timeouts': 0,
+                       'short_circuited': 0}
+
+    def hedge_delay_ms(self):
+        """
+        헤징 대기 시간 - 샘플이 충분하면 롤링 백분위, 아니면 기본값
+        """
+        if len(self.histogram) < self.min_samples:
+            return self.default_hedge_ms
+        return max(self.histogram.percentile(self.hedge_percentile), self.min_hedge_ms)
+
+    def call(self, func):
+        """
+        func()를 보호 정책으로 실행하고 결과 반환
+        서킷이 열려 있으면 CircuitOpenError, 전체 타임아웃이면 TimeoutError, 모든 시도 실패 시 마지막 예외
+        """
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise CircuitOpenError(f"{self.name} circuit open")
+
+        self._count('calls')
+        executor = _get_executor()
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        def attempt():
+            attempt_started = time.monotonic()
+            return func(), (time.monotonic() - attempt_started) * 1000
+
+        # 시도는 호출 스레드의 컨텍스트(호출별 추적)에서 실행 - 헤징 시도마다 별도 복사본
+        primary = executor.submit(contextvars.copy_context().run, attempt)
+        pending = {primary}
+        done, _ = wait(pending, timeout=min(self.hedge_delay_ms() / 1000, self.timeout))
+        if not done:
+            self._count('hedged')
+            pending.add(executor.submit(contextvars.copy_context().run, attempt))
+
+        last_error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                try:
+                    result, latency_ms = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if future is not primary:
+                    self._count('hedge_wins')
+                self.histogram.record(latency_ms)
+                self.breaker.record_success()
+                return result
+
+        # 남은 요청은 백그라운드에서 자연 종료 (결과는 버림)
+        self.breaker.record_failure()
+        if last_error is None:
+            self._count('timeouts')
+            raise TimeoutError(f"{self.name} did not respond within {self.timeout}s")
+        self._count('failures')
+        raise last_error
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['circuit'] = self.breaker.state
+        stats['hedge_delay_ms'] = round(self.hedge_delay_ms())
+        stats['latency'] = self.histogram.snapshot()
+        return stats
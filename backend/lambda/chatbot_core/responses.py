@@ -0,0 +1,148 @@
+"""
+API Gateway 응답 인코딩
+JSON은 이스케이프 없는 UTF-8로 직렬화(orjson이 있으면 사용)하고,
+Accept-Encoding이 허용하면 일정 크기 이상의 본문을 brotli/gzip으로 압축해 base64로 전달
+"""
+import os
+import json
+import base64
+import zlib
+import logging
+
+from chatbot_core import tracing
+
+logger = logging.getLogger()
+
+# 이 크기(바이트) 미만의 본문은 압축하지 않음 (압축 이득보다 헤더/CPU 비용이 큼)
+COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '5'))
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_brotli = None
+_brotli_checked = False
+
+
+def _get_brotli():
+    """
+    brotli 모듈 (설치된 경우만, 첫 사용 시 import)
+    """
+    global _brotli, _brotli_checked
+
+    if not _brotli_checked:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = None
+        _brotli_checked = True
+    return _brotli
+
+
+def encode_json(payload):
+    """
+    JSON 직렬화 → UTF-8 바이트 (한글을 \\uXXXX로 이스케이프하지 않음)
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            # orjson이 지원하지 않는 타입은 표준 json으로 처리
+            pass
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _accepted_encodings(accept_encoding):
+    """
+    Accept-Encoding 헤더 → 허용된 인코딩 집합 (q=0 제외)
+    """
+    accepted = set()
+    for item in (accept_encoding or '').lower().split(','):
+        name, _, params = item.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip())
+    return accepted
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    사용할 압축 방식 선택: brotli(설치된 경우) > gzip > 없음(None)
+    """
+    accepted = _accepted_encodings(accept_encoding)
+    if ('br' in accepted or '*' in accepted) and _get_brotli() is not None:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return _get_brotli().compress(data, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def build_response(status_code, body, headers, request=None):
+    """
+    본문(str 또는 bytes)으로 API Gateway 응답 생성
+    request(events.normalize_event 결과)의 Accept-Encoding에 따라 압축
+    """
+    raw = body.encode('utf-8') if isinstance(body, str) else body
+    headers = dict(headers)
+
+    encoding = None
+    if request is not None and len(raw) >= COMPRESS_MIN_BYTES:
+        encoding = negotiate_encoding(request['headers'].get('accept-encoding'))
+        headers['Vary'] = 'Accept-Encoding'
+
+    if encoding is None:
+        tracing.record('ResponseBytes', len(raw), 'Bytes')
+        return {
+            'statusCode': status_code,
+            'headers': headers,
+            'body': raw.decode('utf-8')
+        }
+
+    compressed = compress(raw, encoding)
+    if len(compressed) >= len(raw):
+        tracing.record('ResponseBytes', len(raw), 'Bytes')
+        return {
+            'statusCode': status_code,
+            'headers': headers,
+            'body': raw.decode('utf-8')
+        }
+
+    saved = len(raw) - len(compressed)
+    tracing.record('ResponseBytes', len(compressed), 'Bytes')
+    tracing.record('ResponseBytesSaved', saved, 'Bytes')
+    logger.info(f"Response compressed ({encoding}): {len(raw)}B → {len(compressed)}B, saved {saved}B")
+
+    headers['Content-Encoding'] = encoding
+    return {
+        'statusCode': status_code,
+        'headers': headers,
+        'body': base64.b64encode(compressed).decode('ascii'),
+        'isBase64Encoded': True
+    }
+
+
+def json_response(status_code, payload, headers, request=None):
+    """
+    JSON 응답 생성 (UTF-8 직렬화 + 협상된 압축)
+    """
+    return build_response(status_code, encode_json(payload), headers, request)
@@ -0,0 +1,67 @@
+"""
+Bedrock 스트리밍 응답 처리
+ConverseStream 이벤트 스트림을 토큰 단위로 디코딩하고 SSE로 변환
+"""
+import json
+import time
+import logging
+
+logger = logging.getLogger()
+
+
+def stream_converse_tokens(bedrock, model_id, converse_request, metrics=None):
+    """
+    ConverseStream 호출 - 모델 종류와 무관한 공통 이벤트 형식
+    metrics dict에 ttft_ms, total_ms, input_tokens, output_tokens, model_latency_ms, stop_reason, region 기록
+    """
+    if metrics is None:
+        metrics = {}
+
+    started = time.monotonic()
+    metrics['ttft_ms'] = None
+
+    response = bedrock.converse_stream(modelId=model_id, **converse_request)
+    metrics['region'] = response.get('ResponseMetadata', {}).get('Region')
+
+    for event in response['stream']:
+        if 'contentBlockDelta' in event:
+            text = event['contentBlockDelta'].get('delta', {}).get('text', '')
+            if text:
+                if metrics['ttft_ms'] is None:
+                    metrics['ttft_ms'] = round((time.monotonic() - started) * 1000, 1)
+                yield text
+        elif 'messageStop' in event:
+            metrics['stop_reason'] = event['messageStop'].get('stopReason')
+        elif 'metadata' in event:
+            usage = event['metadata'].get('usage', {})
+            metrics['input_tokens'] = usage.get('inputTokens', 0)
+            metrics['output_tokens'] = usage.get('outputTokens', 0)
+            metrics['model_latency_ms'] = event['metadata'].get('metrics', {}).get('latencyMs')
+
+    metrics['total_ms'] = round((time.monotonic() - started) * 1000, 1)
+    logger.info(f"Converse stream finished ({model_id}): ttft={metrics['ttft_ms']}ms total={metrics['total_ms']}ms")
+
+
+def format_sse(data, event=None):
+    """
+    Server-Sent Events 한 건 직렬화
+    """
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    payload = json.dumps(data, ensure_ascii=False)
+    lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+def collect_sse(events, writer=None):
+    """
+    SSE 이벤트 모음 - writer가 있으면 생성 즉시 writer(event)로 전달하고 빈 문자열 반환 (로컬 실시간 스트리밍),
+    없으면 모두 이어 붙여 반환 (Lambda 응답 본문)
+    """
+    if writer is None:
+        return ''.join(events)
+
+    for event in events:
+        writer(event)
+    return ''
@@ -0,0 +1,295 @@
+"""
+호출 단위 구간별 지연 시간 추적
+구간(stage) 타이밍과 Bedrock 토큰 사용량을 모아 호출 종료 시 CloudWatch EMF(JSON) 한 줄로 stdout에 기록
+
+    trace = tracing.start('enhanced-chatbot', game_type='BlackSwan')
+    with tracing.stage('bedrock'):
+        ...
+    tracing.flush()
+
+비활성(TRACE_ENABLED=0) 또는 샘플링에서 제외된 호출은 아무 일도 하지 않는 NullTrace 사용
+현재 추적은 contextvars로 보관 - 스레드 풀에 넘기는 작업은 contextvars.copy_context()로 제출해야 같은 추적에 기록됨
+"""
+import os
+import sys
+import json
+import time
+import random
+import functools
+import threading
+import contextlib
+import contextvars
+
+TRACE_ENABLED = os.environ.get('TRACE_ENABLED', '1') == '1'
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '1.0'))
+TRACE_NAMESPACE = os.environ.get('TRACE_NAMESPACE', 'EconomicQuiz/Chatbot')
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullTrace:
+    """
+    추적 비활성 시 사용 - 모든 기록 호출이 즉시 반환
+    """
+    sampled = False
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def record(self, name, value, unit='Count'):
+        pass
+
+    def record_usage(self, input_tokens=None, output_tokens=None):
+        pass
+
+    def set_property(self, key, value):
+        pass
+
+    def set_dimension(self, key, value):
+        pass
+
+    def to_emf(self):
+        return None
+
+    def flush(self, stream=None):
+        return None
+
+
+class _Stage:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.monotonic() - self.started) * 1000
+        self.trace.record(f"{self.name}Ms", elapsed_ms, 'Milliseconds')
+        if exc_type is not None:
+            self.trace.set_property(f"{self.name}Error", exc_type.__name__)
+        return False
+
+
+class Trace:
+    """
+    한 번의 호출에 대한 지표 모음
+    같은 구간이 여러 번 실행되면 시간을 합산 (RAG 수집 스레드에서 동시에 기록 가능)
+    flush 이후의 기록은 버림 (데드라인을 넘겨 늦게 끝난 작업)
+    """
+    sampled = True
+
+    def __init__(self, service, namespace=TRACE_NAMESPACE, **properties):
+        self.namespace = namespace
+        self.started = time.monotonic()
+        self.dimensions = {'Service': service}
+        self.properties = {key: value for key, value in properties.items() if value is not None}
+        self.metrics = {}
+        self.units = {}
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def record(self, name, value, unit='Count'):
+        with self._lock:
+            if self._closed:
+                return
+            self.metrics[name] = self.metrics.get(name, 0) + value
+            self.units[name] = unit
+
+    def record_usage(self, input_tokens=None, output_tokens=None):
+        """
+        Bedrock 토큰 사용량 기록
+        """
+        if input_tokens is not None:
+            self.record('InputTokens', input_tokens)
+        if output_tokens is not None:
+            self.record('OutputTokens', output_tokens)
+
+    def set_property(self, key, value):
+        with self._lock:
+            if not self._closed:
+                self.properties[key] = value
+
+    def set_dimension(self, key, value):
+        """
+        지표 차원 추가 (예: GameType) - 값의 종류가 적은 항목만 사용
+        """
+        if value:
+            with self._lock:
+                if not self._closed:
+                    self.dimensions[key] = value
+
+    def merge(self, other):
+        """
+        동시에 실행된 하위 작업(배치 항목)의 지표 병합
+        시간 지표는 최댓값 (병렬 구간을 합산하면 실제 소요 시간보다 커짐), 나머지는 합산
+        """
+        with other._lock:
+            metrics = dict(other.metrics)
+            units = dict(other.units)
+
+        with self._lock:
+            if self._closed:
+                return
+            for name, value in metrics.items():
+                if units[name] == 'Milliseconds':
+                    self.metrics[name] = max(self.metrics.get(name, 0), value)
+                else:
+                    self.metrics[name] = self.metrics.get(name, 0) + value
+                self.units[name] = units[name]
+
+    def to_emf(self):
+        """
+        EMF 문서 (dict) 생성
+        """
+        with self._lock:
+            self.metrics['TotalMs'] = (time.monotonic() - self.started) * 1000
+            self.units['TotalMs'] = 'Milliseconds'
+            metrics = {name: round(value, 2) for name, value in self.metrics.items()}
+            units = dict(self.units)
+            dimensions = dict(self.dimensions)
+            properties = dict(self.properties)
+
+        dimension_sets = [['Service']]
+        extra = [key for key in dimensions if key != 'Service']
+        if extra:
+            dimension_sets.append(['Service'] + extra)
+
+        document = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': dimension_sets,
+                    'Metrics': [{'Name': name, 'Unit': units[name]} for name in metrics]
+                }]
+            }
+        }
+        document.update(properties)
+        document.update(dimensions)
+        document.update(metrics)
+        return document
+
+    def flush(self, stream=None):
+        """
+        EMF 한 줄 출력 (Lambda 로거 접두어가 붙지 않도록 stdout에 직접 기록)
+        이후 기록은 버림
+        """
+        document = self.to_emf()
+        with self._lock:
+            self._closed = True
+        line = json.dumps(document, ensure_ascii=False, separators=(',', ':'))
+        stream = stream or sys.stdout
+        stream.write(line + '\n')
+        stream.flush()
+        return line
+
+
+_NULL_TRACE = NullTrace()
+# 이전 호출에서 남은 스레드가 다음 호출의 추적에 기록하지 않도록 모듈 전역 대신 컨텍스트 변수 사용
+_current = contextvars.ContextVar('trace', default=_NULL_TRACE)
+
+
+def start(service, sample_rate=None, **properties):
+    """
+    호출 시작 - 샘플링된 경우 Trace, 아니면 NullTrace를 현재 추적으로 설정
+    """
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if not TRACE_ENABLED or rate <= 0 or (rate < 1 and random.random() >= rate):
+        trace = _NULL_TRACE
+    else:
+        trace = Trace(service, **properties)
+    _current.set(trace)
+    return trace
+
+
+def current():
+    return _current.get()
+
+
+@contextlib.contextmanager
+def scope():
+    """
+    동시에 실행되는 하위 작업(배치 항목)용 추적 구간
+    항목별 Trace에 기록한 뒤 끝나면 부모 추적에 병합 (Trace.merge)
+    """
+    parent = _current.get()
+    if not parent.sampled:
+        yield parent
+        return
+
+    child = Trace(parent.dimensions['Service'], namespace=parent.namespace)
+    token = _current.set(child)
+    try:
+        yield child
+    finally:
+        _current.reset(token)
+        parent.merge(child)
+
+
+def stage(name):
+    """
+    현재 추적의 구간 타이머 (with 문)
+    """
+    return _current.get().stage(name)
+
+
+def record(name, value, unit='Count'):
+    _current.get().record(name, value, unit)
+
+
+def record_usage(input_tokens=None, output_tokens=None):
+    _current.get().record_usage(input_tokens, output_tokens)
+
+
+def set_property(key, value):
+    _current.get().set_property(key, value)
+
+
+def set_dimension(key, value):
+    _current.get().set_dimension(key, value)
+
+
+def flush(stream=None):
+    """
+    현재 추적을 출력하고 비활성 상태로 되돌림
+    """
+    trace = _current.get()
+    _current.set(_NULL_TRACE)
+    return trace.flush(stream)
+
+
+def traced(name):
+    """
+    함수 전체를 하나의 구간으로 기록하는 데코레이터
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _current.get().stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def parse_emf(line):
+    """
+    EMF 한 줄을 {지표 이름: 값} dict로 변환 (오프라인 검증용)
+    """
+    document = json.loads(line)
+    definitions = document['_aws']['CloudWatchMetrics'][0]['Metrics']
+    return {definition['Name']: document[definition['Name']] for definition in definitions}
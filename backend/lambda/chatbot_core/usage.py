@@ -0,0 +1,405 @@
+"""
+Bedrock 토큰/지연 시간 집계
+호출마다 입력/출력 토큰, 모델 처리 시간, 첫 토큰 시간, 전체 응답 시간을
+(게임 종류, 프롬프트 형태, RAG 소스 수, 모델) 키별 롤링 히스토그램에 모으고
+emit_interval마다 직전 집계 이후의 구간 히스토그램을 JSON 한 줄로 stdout에 기록
+
+로그를 모아 로컬 보고서로 조회 (예: RAG를 쓴 SignalDecoding 호출의 p95 전체 응답 시간)
+
+    python3 -m chatbot_core.usage report logs.txt -g SignalDecoding --rag on -m total_ms -p 95
+"""
+import os
+import sys
+import json
+import math
+import time
+import threading
+import logging
+
+logger = logging.getLogger()
+
+# 로그 버킷 증가율 - 백분위 상대 오차 약 5% 이내, 구간 히스토그램끼리 그대로 합산 가능
+HISTOGRAM_GROWTH = 1.1
+
+USAGE_FIELDS = ('input_tokens', 'output_tokens', 'model_ms', 'ttft_ms', 'total_ms')
+KEY_FIELDS = ('game_type', 'shape', 'sources', 'model')
+
+USAGE_EMIT_INTERVAL = int(os.environ.get('USAGE_EMIT_INTERVAL', '60'))
+USAGE_WINDOW = int(os.environ.get('USAGE_WINDOW', '3600'))
+
+# InvokeModel 응답 헤더 (Converse는 응답 본문의 usage/metrics 사용)
+INVOCATION_LATENCY_HEADER = 'x-amzn-bedrock-invocation-latency'
+INPUT_TOKENS_HEADER = 'x-amzn-bedrock-input-token-count'
+OUTPUT_TOKENS_HEADER = 'x-amzn-bedrock-output-token-count'
+
+
+def _header_int(headers, name):
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def usage_from_response(response):
+    """
+    Bedrock 응답에서 (입력 토큰, 출력 토큰, 모델 처리 시간 ms) 추출
+    Converse 응답 본문의 usage/metrics를 우선 사용하고, 없으면 InvokeModel 응답 헤더 사용
+    """
+    usage = response.get('usage', {})
+    headers = response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+    input_tokens = usage.get('inputTokens')
+    output_tokens = usage.get('outputTokens')
+    model_ms = response.get('metrics', {}).get('latencyMs')
+    if input_tokens is None:
+        input_tokens = _header_int(headers, INPUT_TOKENS_HEADER)
+    if output_tokens is None:
+        output_tokens = _header_int(headers, OUTPUT_TOKENS_HEADER)
+    if model_ms is None:
+        model_ms = _header_int(headers, INVOCATION_LATENCY_HEADER)
+    return input_tokens, output_tokens, model_ms
+
+
+def prompt_shape(complexity, follow_up=False):
+    """
+    프롬프트 형태 라벨 - 질문 복잡도 + 이전 대화 포함 여부 (예: 'complex', 'simple+history')
+    """
+    shape = complexity or 'unknown'
+    return f"{shape}+history" if follow_up else shape
+
+
+class LogHistogram:
+    """
+    로그 버킷 히스토그램 - 버킷 i는 (GROWTH^(i-1), GROWTH^i] 구간 (1 이하는 버킷 0)
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def bucket(value):
+        if value <= 1:
+            return 0
+        return int(math.ceil(math.log(value, HISTOGRAM_GROWTH)))
+
+    def add(self, value):
+        index = self.bucket(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, p):
+        """
+        p 백분위 추정값 (버킷 기하 중앙값, 관측 최소/최대 범위로 제한), 샘플이 없으면 None
+        """
+        if not self.count:
+            return None
+        rank = max(math.ceil(p / 100 * self.count), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                value = HISTOGRAM_GROWTH ** (index - 0.5) if index else 1.0
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            'n': self.count,
+            'sum': round(self.total, 1),
+            'min': round(self.min, 1) if self.min is not None else None,
+            'max': round(self.max, 1) if self.max is not None else None,
+            'b': {str(index): count for index, count in self.counts.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data.get('b', {}).items()}
+        histogram.count = data.get('n', 0)
+        histogram.total = data.get('sum', 0.0)
+        histogram.min = data.get('min')
+        histogram.max = data.get('max')
+        return histogram
+
+
+class RollingHistogram:
+    """
+    최근 window초 히스토그램 - slots개 시간 칸에 나눠 기록하고 지난 칸은 버림
+    """
+
+    def __init__(self, window=3600, slots=12):
+        self.slot_seconds = window / slots
+        self.slots = slots
+        self._slots = {}
+
+    def add(self, value, now):
+        slot = int(now // self.slot_seconds)
+        if slot not in self._slots:
+            self._slots[slot] = LogHistogram()
+            for old in [key for key in self._slots if key <= slot - self.slots]:
+                del self._slots[old]
+        self._slots[slot].add(value)
+
+    def merged(self, now):
+        oldest = int(now // self.slot_seconds) - self.slots
+        histogram = LogHistogram()
+        for slot, slot_histogram in self._slots.items():
+            if slot > oldest:
+                histogram.merge(slot_histogram)
+        return histogram
+
+
+def _key_matches(key, filters):
+    """
+    filters: game_type, shape, model, sources(정수), rag(True/False)
+    """
+    entry = dict(zip(KEY_FIELDS, key))
+    for field, expected in filters.items():
+        if expected is None:
+            continue
+        if field == 'rag':
+            if bool(entry['sources']) != expected:
+                return False
+        elif entry.get(field) != expected:
+            return False
+    return True
+
+
+def summarize(histograms, metric, percentiles=(50, 95, 99), **filters):
+    """
+    키별 히스토그램 {키: {지표: LogHistogram}}에서 조건에 맞는 키를 합쳐 호출 수/평균/백분위 계산
+    """
+    merged = LogHistogram()
+    for key, fields in histograms.items():
+        if metric in fields and _key_matches(key, filters):
+            merged.merge(fields[metric])
+
+    summary = {'metric': metric, 'calls': merged.count, 'mean': None}
+    if merged.count:
+        summary['mean'] = round(merged.mean(), 1)
+    for p in percentiles:
+        value = merged.quantile(p)
+        summary[f"p{p:g}"] = round(value, 1) if value is not None else None
+    return summary
+
+
+def group_by(histograms, fields):
+    """
+    키를 fields 기준으로 묶음 - {묶음 키: {원래 키: 지표별 히스토그램}}
+    """
+    groups = {}
+    for key, metrics in histograms.items():
+        entry = dict(zip(KEY_FIELDS, key))
+        entry['rag'] = 'on' if entry['sources'] else 'off'
+        group = tuple(entry[field] for field in fields)
+        groups.setdefault(group, {})[key] = metrics
+    return groups
+
+
+class UsageLedger:
+    """
+    Bedrock 호출 집계
+    키별 롤링 히스토그램(컨테이너 내 조회용)과 직전 출력 이후 구간 히스토그램(로그 출력용)을 함께 유지
+    """
+
+    def __init__(self, service, window=USAGE_WINDOW, slots=12, emit_interval=USAGE_EMIT_INTERVAL):
+        self.service = service
+        self.window = window
+        self.slots = slots
+        self.emit_interval = emit_interval
+        self._lock = threading.Lock()
+        self._rolling = {}
+        self._pending = {}
+        self._fallbacks = {}
+        self._last_emit = time.monotonic()
+
+    def record(self, game_type, shape, sources, model, input_tokens=None, output_tokens=None,
+               model_ms=None, ttft_ms=None, total_ms=None, fallback=False):
+        """
+        호출 한 건 기록 (값이 None인 지표는 건너뜀, 대체 응답은 모델을 'fallback'으로 기록)
+        """
+        key = (game_type or 'none', shape, int(sources or 0), 'fallback' if fallback else (model or 'unknown'))
+        values = {
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'model_ms': model_ms,
+            'ttft_ms': ttft_ms,
+            'total_ms': total_ms
+        }
+        now = time.monotonic()
+        with self._lock:
+            rolling = self._rolling.setdefault(key, {})
+            pending = self._pending.setdefault(key, {})
+            for field, value in values.items():
+                if value is None:
+                    continue
+                if field not in rolling:
+                    rolling[field] = RollingHistogram(self.window, self.slots)
+                rolling[field].add(value, now)
+                pending.setdefault(field, LogHistogram()).add(value)
+            if fallback:
+                self._fallbacks[key] = self._fallbacks.get(key, 0) + 1
+
+    def histograms(self):
+        """
+        최근 window초 키별 히스토그램 {키: {지표: LogHistogram}}
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: {field: rolling.merged(now) for field, rolling in fields.items()}
+                for key, fields in self._rolling.items()
+            }
+
+    def query(self, metric='total_ms', percentiles=(50, 95, 99), **filters):
+        """
+        예: query('total_ms', (95,), game_type='SignalDecoding', rag=True)
+        """
+        return summarize(self.histograms(), metric, percentiles, **filters)
+
+    def report(self, fields=('game_type', 'rag'), metrics=('total_ms', 'model_ms', 'input_tokens', 'output_tokens')):
+        """
+        fields 기준으로 묶은 지표별 요약 목록
+        """
+        rows = []
+        for group, histograms in sorted(group_by(self.histograms(), fields).items(), key=str):
+            row = dict(zip(fields, group))
+            for metric in metrics:
+                row[metric] = summarize(histograms, metric)
+            rows.append(row)
+        return rows
+
+    def maybe_emit(self, stream=None):
+        """
+        emit_interval이 지났으면 구간 집계 출력 (호출 종료 시마다 호출)
+        """
+        if self.emit_interval <= 0 or time.monotonic() - self._last_emit < self.emit_interval:
+            return None
+        return self.emit(stream)
+
+    def emit(self, stream=None):
+        """
+        직전 출력 이후 구간 히스토그램을 JSON 한 줄로 stdout에 기록하고 초기화 (기록이 없으면 None)
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            fallbacks, self._fallbacks = self._fallbacks, {}
+            started, self._last_emit = self._last_emit, time.monotonic()
+        if not pending:
+            return None
+
+        entries = []
+        for key, fields in pending.items():
+            entry = dict(zip(KEY_FIELDS, key))
+            entry['fallbacks'] = fallbacks.get(key, 0)
+            entry['histograms'] = {field: histogram.to_dict() for field, histogram in fields.items()}
+            entries.append(entry)
+
+        line = json.dumps({
+            'usageAggregate': self.service,
+            'timestamp': int(time.time() * 1000),
+            'intervalMs': round((time.monotonic() - started) * 1000),
+            'entries': entries
+        }, ensure_ascii=False, separators=(',', ':'))
+        stream = stream or sys.stdout
+        stream.write(line + '\n')
+        stream.flush()
+        return line
+
+
+def parse_usage_lines(lines):
+    """
+    로그 줄에서 구간 집계를 찾아 키별로 합침 (CloudWatch 내보내기처럼 앞에 접두어가 붙은 줄도 허용)
+    """
+    histograms = {}
+    for line in lines:
+        start = line.find('{"usageAggregate"')
+        if start < 0:
+            continue
+        try:
+            document = json.loads(line[start:])
+        except ValueError:
+            continue
+        for entry in document.get('entries', []):
+            key = tuple(entry.get(field) for field in KEY_FIELDS)
+            fields = histograms.setdefault(key, {})
+            for field, data in entry.get('histograms', {}).items():
+                fields.setdefault(field, LogHistogram()).merge(LogHistogram.from_dict(data))
+    return histograms
+
+
+def main(argv=None):
+    # CLI 전용 (Lambda 초기화 시 import하지 않음)
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python3 -m chatbot_core.usage', description='Bedrock 토큰/지연 시간 보고서')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    report = subparsers.add_parser('report', help='로그 파일의 구간 집계를 합쳐 백분위 조회')
+    report.add_argument('logs', nargs='+', help='핸들러 로그 파일 (- 는 stdin)')
+    report.add_argument('-g', '--game-type', help='게임 종류')
+    report.add_argument('--rag', choices=('on', 'off'), help='RAG 소스 사용 여부')
+    report.add_argument('--shape', help='프롬프트 형태 (simple, complex, simple+history 등)')
+    report.add_argument('--sources', type=int, help='RAG 소스 수')
+    report.add_argument('--model', help='모델 ID')
+    report.add_argument('-m', '--metric', choices=USAGE_FIELDS, default='total_ms')
+    report.add_argument('-p', '--percentile', type=float, nargs='+', default=[50, 95, 99])
+    report.add_argument('--by', nargs='+', choices=KEY_FIELDS + ('rag',), help='묶어서 보여줄 항목')
+
+    args = parser.parse_args(argv)
+
+    histograms = {}
+    for path in args.logs:
+        if path == '-':
+            parsed = parse_usage_lines(sys.stdin)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                parsed = parse_usage_lines(f)
+        for key, fields in parsed.items():
+            merged = histograms.setdefault(key, {})
+            for field, histogram in fields.items():
+                merged.setdefault(field, LogHistogram()).merge(histogram)
+
+    filters = {
+        'game_type': args.game_type,
+        'rag': None if args.rag is None else args.rag == 'on',
+        'shape': args.shape,
+        'sources': args.sources,
+        'model': args.model
+    }
+    percentiles = tuple(args.percentile)
+
+    if not args.by:
+        print(json.dumps(summarize(histograms, args.metric, percentiles, **filters), ensure_ascii=False))
+        return 0
+
+    for group, grouped in sorted(group_by(histograms, args.by).items(), key=str):
+        summary = summarize(grouped, args.metric, percentiles, **filters)
+        if summary['calls']:
+            label = ' '.join(f"{field}={value}" for field, value in zip(args.by, group))
+            print(f"{label}\t{json.dumps(summary, ensure_ascii=False)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
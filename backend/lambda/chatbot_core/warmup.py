@@ -0,0 +1,119 @@
+"""
+컨테이너 예열
+SDK import, 클라이언트 생성, 자격 증명/엔드포인트 확인, 업스트림 TLS 연결, 인덱스 로딩을
+첫 사용자 요청 전에 한 번 수행하고 단계별 시간을 반환
+
+- 예열 이벤트: {"warmup": true} 직접 호출, serverless-plugin-warmup, EventBridge 스케줄
+- 초기화 훅: 프로비저닝된 동시성 초기화(또는 WARMUP_ON_INIT=1)일 때 모듈 로딩 중 실행
+"""
+import os
+import time
+import threading
+import logging
+
+logger = logging.getLogger()
+
+WARMUP_SOURCES = {'serverless-plugin-warmup', 'warmup'}
+
+
+def is_warmup_event(event):
+    """
+    예열 이벤트인지 확인 (API Gateway 요청은 해당 없음)
+    """
+    if not isinstance(event, dict):
+        return False
+    if event.get('warmup') is True or event.get('source') in WARMUP_SOURCES:
+        return True
+    return event.get('source') == 'aws.events' and event.get('detail-type') == 'Scheduled Event'
+
+
+class Warmer:
+    """
+    예열 단계 등록/실행
+
+    once=True 단계(import, 인덱스 로딩 등)는 성공하면 이후 실행에서 건너뛰고,
+    once=False 단계(커넥션 예열)는 유휴 연결이 끊겼을 수 있으므로 매번 다시 실행
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self._steps = []
+        self._done = set()
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._requests = 0
+
+    def step(self, name, once=True):
+        """
+        예열 단계 등록 데코레이터 - 함수 반환값은 결과 상세로 보고서에 포함
+        """
+        def decorator(func):
+            self._steps.append((name, func, once))
+            return func
+        return decorator
+
+    @property
+    def warmed(self):
+        return self._runs > 0
+
+    def run(self, reason='event'):
+        """
+        등록된 단계를 순서대로 실행하고 단계별 시간 보고서 반환 (실패한 단계는 오류만 기록)
+        """
+        with self._lock:
+            started = time.perf_counter()
+            steps = {}
+            for name, func, once in self._steps:
+                if once and name in self._done:
+                    steps[name] = {'ms': 0.0, 'skipped': True}
+                    continue
+
+                step_started = time.perf_counter()
+                result = {}
+                try:
+                    detail = func()
+                    if detail is not None:
+                        result['detail'] = detail
+                    self._done.add(name)
+                except Exception as e:
+                    logger.warning(f"Warm-up step failed ({name}): {str(e)}")
+                    result['error'] = f"{type(e).__name__}: {str(e)}"
+                result['ms'] = round((time.perf_counter() - step_started) * 1000, 1)
+                steps[name] = result
+
+            self._runs += 1
+            report = {
+                'warmup': True,
+                'service': self.service,
+                'reason': reason,
+                'initType': os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE', 'on-demand'),
+                'run': self._runs,
+                'servedRequests': self._requests,
+                'steps': steps,
+                'totalMs': round((time.perf_counter() - started) * 1000, 1)
+            }
+
+        timings = {name: step['ms'] for name, step in steps.items()}
+        logger.info(f"Warm-up finished ({reason}): {report['totalMs']}ms {timings}")
+        return report
+
+    def run_on_init(self):
+        """
+        초기화 단계 훅 - 프로비저닝된 동시성 초기화는 사용자 요청과 무관하므로 기본 실행
+        WARMUP_ON_INIT=1이면 온디맨드 초기화에서도 실행, 0이면 실행 안 함
+        """
+        setting = os.environ.get('WARMUP_ON_INIT', 'auto')
+        if setting == '0':
+            return None
+        if setting != '1' and os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') != 'provisioned-concurrency':
+            return None
+        return self.run(reason='init')
+
+    def request_started(self):
+        """
+        사용자 요청 시작 기록 - (컨테이너 내 요청 순번, 예열 여부) 반환
+        첫 요청과 이후 요청의 지연 시간을 예열 여부별로 비교하는 데 사용
+        """
+        with self._lock:
+            self._requests += 1
+            return self._requests, self._runs > 0
@@ -1,18 +1,211 @@
-import json
-import boto3
-import requests
 import os
+
+# 콜드 스타트 import 프로파일링 (IMPORT_PROFILE=1, 다른 import보다 먼저 설치)
+if os.environ.get('IMPORT_PROFILE') == '1':
+    from chatbot_core import import_profile
+    import_profile.install()
+
+import time
 from datetime import datetime, timedelta
 import logging
 
+from chatbot_core.events import normalize_event, parse_json_body, string_field, RequestError
+from chatbot_core.responses import json_response, build_response
+from chatbot_core.clients import get_client_stats
+from chatbot_core.concurrency import deadline_from_context, gather_with_deadline
+from chatbot_core.cache import TTLCache
+from chatbot_core.http_session import get_session, get_connection_stats, mount_host, prewarm
+from chatbot_core.streaming import format_sse, collect_sse
+from chatbot_core.answer_cache import SemanticAnswerCache
+from chatbot_core.context_budget import select_passages, count_tokens_remote, estimate_tokens
+from chatbot_core.model_router import ModelRouter, classify_complexity, bedrock_client_config, remaining_ms, DeadlineExceeded, MODEL_MIN_ATTEMPT_MS
+from chatbot_core.regions import RegionPool
+from chatbot_core.lexicon import extract_terms, extract_stems
+from chatbot_core.quiz_index import get_quiz_index, GAME_TYPES
+from chatbot_core.answer_pack import get_answer_pack
+from chatbot_core.article_fetcher import ArticleFetcher
+from chatbot_core.resilience import ResilientEndpoint, CircuitOpenError
+from chatbot_core.conversation import ConversationStore, DynamoDBBackend, create_backend_from_env, valid_session_id
+from chatbot_core.warmup import Warmer, is_warmup_event
+from chatbot_core.intents import IntentRouter
+from chatbot_core.batch import dedupe, fan_out, in_order
+from chatbot_core.usage import UsageLedger, prompt_shape
+from chatbot_core import tracing
+from chatbot_core.tracing import traced
+
 # 로깅 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-def lambda_handler(event, context):
+# BigKinds 검색 결과 캐시 (컨테이너 단위, 빈 결과/오류는 짧게 부정 캐시)
+bigkinds_cache = TTLCache(
+    max_entries=int(os.environ.get('BIGKINDS_CACHE_SIZE', '256')),
+    ttl=int(os.environ.get('BIGKINDS_CACHE_TTL', '900')),
+    negative_ttl=int(os.environ.get('BIGKINDS_CACHE_NEGATIVE_TTL', '60')),
+    spill_dir=os.environ.get('BIGKINDS_CACHE_DIR')  # 예: /tmp/bigkinds-cache
+)
+
+# 유사 질문 답변 캐시 (같은 게임/퀴즈 문항 범위)
+answer_cache = SemanticAnswerCache(
+    threshold=float(os.environ.get('ANSWER_CACHE_THRESHOLD', '0.85')),
+    ttl=int(os.environ.get('ANSWER_CACHE_TTL', '3600')),
+    max_entries=int(os.environ.get('ANSWER_CACHE_SIZE', '2048'))
+)
+
+# 퀴즈 관련 기사 캐시 (같은 날 퀴즈는 모든 사용자가 같은 기사 URL을 공유)
+article_fetcher = ArticleFetcher(
+    allowed_hosts=os.environ.get('ARTICLE_ALLOWED_HOSTS', 'sedaily.com').split(','),
+    max_bytes=int(os.environ.get('ARTICLE_MAX_BYTES', '524288')),
+    max_chars=int(os.environ.get('ARTICLE_MAX_CHARS', '4000')),
+    fresh_ttl=int(os.environ.get('ARTICLE_CACHE_TTL', '300'))
+)
+
+# 세션별 대화 기록 (최근 턴 + 오래된 턴 요약, CONVERSATION_BACKEND=memory|file|dynamodb)
+conversation_store = ConversationStore(
+    backend=create_backend_from_env(),
+    ttl=int(os.environ.get('CONVERSATION_TTL', '1800')),
+    max_turns=int(os.environ.get('CONVERSATION_MAX_TURNS', '6')),
+    keep_turns=int(os.environ.get('CONVERSATION_KEEP_TURNS', '3')),
+    summary_max_tokens=int(os.environ.get('CONVERSATION_SUMMARY_TOKENS', '300')),
+    # CONVERSATION_SUMMARIZER=claude면 Claude 요약, 기본은 모델 호출 없는 추출 요약
+    # (summarize_conversation은 아래에 정의되어 있어 호출 시점에 찾도록 lambda로 전달)
+    summarizer=(lambda *args: summarize_conversation(*args))
+    if os.environ.get('CONVERSATION_SUMMARIZER') == 'claude' else None
+)
+
+# 질문 복잡도별 모델 체인 (MODEL_CHAIN_SIMPLE / MODEL_CHAIN_COMPLEX, 쉼표 구분)
+# 스로틀링/타임아웃 시 다음 모델, 체인이 모두 실패하면 템플릿 대체 응답
+model_router = ModelRouter(
+    latency_slo_ms=int(os.environ.get('MODEL_LATENCY_SLO_MS', '8000')),
+    failure_threshold=int(os.environ.get('MODEL_BREAKER_THRESHOLD', '2')),
+    cooldown=int(os.environ.get('MODEL_BREAKER_COOLDOWN', '60'))
+)
+
+# 빠른 경로 의도 분류 (정답 해설/힌트/인사 등은 Bedrock 없이 템플릿과 퀴즈 해설로 답변)
+intent_router = IntentRouter(threshold=float(os.environ.get('INTENT_THRESHOLD', '0.75')))
+INTENT_FAST_PATH = os.environ.get('INTENT_FAST_PATH', '1') == '1'
+
+# Bedrock 호출별 토큰/지연 시간 집계 (게임 종류, 프롬프트 형태, RAG 소스 수, 모델별)
+# USAGE_EMIT_INTERVAL(60)초마다 구간 집계를 로그 한 줄로 출력 → python3 -m chatbot_core.usage report
+usage_ledger = UsageLedger('enhanced-chatbot')
+
+# Bedrock 리전 풀 (BEDROCK_REGIONS, 쉼표 구분 - 가까운 리전부터)
+# 관측 지연 시간/오류율로 순위를 매기고 스로틀링/장애 시 다음 리전으로 전환
+region_pool = RegionPool(
+    config=bedrock_client_config,
+    failure_threshold=int(os.environ.get('BEDROCK_REGION_BREAKER_THRESHOLD', '2')),
+    cooldown=int(os.environ.get('BEDROCK_REGION_BREAKER_COOLDOWN', '30'))
+)
+
+# RAG 컨텍스트 토큰 예산 (RAG_COUNT_TOKENS=1이면 CountTokens로 실제 토큰 수 확인)
+RAG_TOKEN_BUDGET = int(os.environ.get('RAG_TOKEN_BUDGET', '800'))
+RAG_MAX_PASSAGE_TOKENS = int(os.environ.get('RAG_MAX_PASSAGE_TOKENS', '300'))
+
+# 응답 데드라인 (API Gateway 29초 통합 타임아웃/Lambda 타임아웃 전에 응답)
+# Bedrock 모델/리전 전환과 시도별 읽기 타임아웃이 이 안에서만 이뤄짐
+RESPONSE_BUDGET_MS = int(os.environ.get('RESPONSE_BUDGET_MS', '27000'))
+RESPONSE_RESERVE_MS = int(os.environ.get('RESPONSE_RESERVE_MS', '1500'))
+# 대화 요약 호출 예산
+SUMMARY_BUDGET_MS = int(os.environ.get('SUMMARY_BUDGET_MS', '8000'))
+
+BIGKINDS_PROVIDERS = ['서울경제', '한국경제', '매일경제', '연합뉴스']
+BIGKINDS_HOST = "https://www.bigkinds.or.kr"
+
+# 배치 요청 (questions 목록) - 최대 항목 수, 동시 처리 수, 전체 시간 예산
+# API Gateway 통합 타임아웃(29초) 안에 끝나도록 기본 예산 25초
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', '30'))
+BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', '4'))
+BATCH_BUDGET_MS = int(os.environ.get('BATCH_BUDGET_MS', '25000'))
+
+# BigKinds 호출 보호 (p95 초과 시 헤징 요청, 연속 실패 시 쿨다운 동안 호출 생략)
+bigkinds_endpoint = ResilientEndpoint(
+    'bigkinds',
+    timeout=float(os.environ.get('BIGKINDS_TIMEOUT', '5')),
+    hedge_percentile=float(os.environ.get('BIGKINDS_HEDGE_PERCENTILE', '95')),
+    default_hedge_ms=float(os.environ.get('BIGKINDS_HEDGE_DEFAULT_MS', '1500')),
+    failure_threshold=int(os.environ.get('BIGKINDS_BREAKER_THRESHOLD', '3')),
+    cooldown=int(os.environ.get('BIGKINDS_BREAKER_COOLDOWN', '30'))
+)
+
+# BigKinds 전용 커넥션 풀 + 초기화 단계 연결 예열 (백그라운드, 요청 경로를 막지 않음)
+# 재시도는 bigkinds_endpoint 헤징이 담당하므로 어댑터는 읽기/상태 코드 재시도 없음
+mount_host(BIGKINDS_HOST, pool_maxsize=int(os.environ.get('BIGKINDS_POOL_MAXSIZE', '8')), hedged=True)
+if os.environ.get('BIGKINDS_API_KEY') and os.environ.get('HTTP_PREWARM', '1') == '1':
+    prewarm([BIGKINDS_HOST], background=True)
+
+# 리전 엔드포인트 연결 시간 측정 (백그라운드, 실제 호출 기록이 쌓이기 전 초기 순위용)
+if os.environ.get('BEDROCK_REGION_PROBE', '1') == '1':
+    region_pool.probe(background=True)
+
+# 컨테이너 예열 단계 (예열 이벤트 또는 프로비저닝된 동시성 초기화 시 실행)
+warmer = Warmer('enhanced-chatbot')
+
+@warmer.step('Sdk')
+def warm_sdk():
+    """
+    지연 import 대상 SDK 로딩
+    """
+    import boto3
+    import requests
+    bedrock_client_config()
+
+@warmer.step('Bedrock', once=False)
+def warm_bedrock():
+    """
+    상위 리전 Bedrock 클라이언트 생성 + 자격 증명/엔드포인트 확인 + TLS 연결
+    요청 경로와 같은 클라이언트(region_pool.client)를 예열 - 이후 요청은 레지스트리 적중(hits)으로 나타남
+    """
+    timings = region_pool.warm(limit=int(os.environ.get('WARMUP_BEDROCK_REGIONS', '2')))
+    return {'regions': timings, 'clients': get_client_stats()}
+
+@warmer.step('BigKinds', once=False)
+def warm_bigkinds():
+    """
+    BigKinds 커넥션 풀에 TLS 연결 확보
+    """
+    if not os.environ.get('BIGKINDS_API_KEY'):
+        return None
+    prewarm([BIGKINDS_HOST])
+    return get_connection_stats()
+
+@warmer.step('Conversation', once=False)
+def warm_conversation():
+    """
+    DynamoDB 대화 저장소 클라이언트 생성 + 연결 (다른 저장소는 할 일 없음)
+    """
+    backend = conversation_store.backend
+    if isinstance(backend, DynamoDBBackend):
+        backend.get('warmup')
+
+@warmer.step('AnswerPack')
+def warm_answer_pack():
+    """
+    사전 생성 답변 팩 로드
+    """
+    pack = get_answer_pack()
+    return pack.stats() if pack else None
+
+@warmer.step('QuizIndex')
+def warm_quiz_index():
+    """
+    퀴즈 인덱스 로드 + 자주 쓰는 용어의 포스팅 페이지 적재
+    """
+    index = get_quiz_index()
+    if index is None:
+        return None
+    index.search('금리 물가 환율 주가', limit=1)
+    return {'docs': len(index.docs)}
+
+warmer.run_on_init()
+
+if os.environ.get('IMPORT_PROFILE') == '1':
+    logger.info(f"Cold start imports: {import_profile.summary()}")
+
+def lambda_handler(event, context, sse_writer=None):
     """
     RAG 기반 Claude 챗봇 Lambda 핸들러
     메인: Claude 순수 응답 / RAG: BigKinds + 퀴즈 기사 + 퀴즈 문제
+    sse_writer: 스트리밍 요청의 SSE 이벤트를 생성 즉시 받는 함수 (local-stream-server.py 전용, 이때 응답 본문은 비어 있음)
     """
     
     # CORS 헤더
@@ -23,105 +216,509 @@ def lambda_handler(event, context):
         'Access-Control-Allow-Headers': 'Content-Type'
     }
     
+    # 예열 이벤트 (단계별 시간 보고서 반환)
+    if is_warmup_event(event):
+        return warmer.run()
+    
+    # 요청 정규화 (REST API v1 / HTTP API v2)
+    request = normalize_event(event)
+    
     # OPTIONS 요청 처리
-    if event['httpMethod'] == 'OPTIONS':
+    if request['method'] == 'OPTIONS':
         return {
             'statusCode': 200,
             'headers': headers,
             'body': ''
         }
     
+    # 호출 단위 구간 추적 (종료 시 EMF 한 줄 출력)
+    tracing.start('enhanced-chatbot', requestId=getattr(context, 'aws_request_id', None))
+    request_started = time.perf_counter()
+    response_deadline = deadline_from_context(context, reserve_ms=RESPONSE_RESERVE_MS, max_budget_ms=RESPONSE_BUDGET_MS)
+    # 컨테이너 첫 요청과 이후 요청 비교용
+    request_number, prewarmed = warmer.request_started()
+    tracing.set_property('ContainerRequest', request_number)
+    tracing.set_property('Prewarmed', prewarmed)
+    
     try:
         # 요청 데이터 파싱
-        body = json.loads(event['body'])
-        user_question = body.get('question', '')
-        game_type = body.get('gameType', '')
-        question_text = body.get('questionText', '')
-        quiz_article_url = body.get('quizArticleUrl', '')
+        with tracing.stage('Parse'):
+            body = parse_json_body(request)
+            user_question = string_field(body, 'question')
+            game_type = string_field(body, 'gameType')
+            question_text = string_field(body, 'questionText')
+            quiz_article_url = string_field(body, 'quizArticleUrl')
+            stream = bool(body.get('stream', False))
+            session_id = body.get('sessionId') or body.get('conversationId')
+            if not valid_session_id(session_id):
+                session_id = None
+        
+        if game_type in GAME_TYPES:
+            tracing.set_dimension('GameType', game_type)
+        tracing.set_property('Stream', stream)
+        
+        # 배치 요청: {"questions": [...]} (문항별 결과를 입력 순서 또는 완료 순서로 반환)
+        if isinstance(body.get('questions'), list):
+            return handle_batch_request(body, request, headers, context, sse_writer)
         
         if not user_question:
-            return {
-                'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({
-                    'error': '질문이 필요합니다.',
-                    'success': False
-                })
-            }
+            return json_response(400, {
+                'error': '질문이 필요합니다.',
+                'success': False
+            }, headers, request)
         
         logger.info(f"RAG Query: {user_question[:50]}... (Game: {game_type})")
         
-        # RAG 지식 베이스 수집
-        knowledge_base = build_rag_knowledge_base(
-            user_question, 
-            question_text, 
-            quiz_article_url, 
-            game_type
-        )
+        # 이전 대화 기록 (세션 ID가 있는 경우)
+        conversation = None
+        if session_id:
+            with tracing.stage('Conversation'):
+                conversation = conversation_store.load(session_id)
+            tracing.set_property('ConversationTurn', conversation['turn_count'])
+        follow_up = bool(conversation and conversation['turn_count'])
+        
+        # 사전 생성 답변 팩 (퀴즈 발행 시 만든 예상 질문 답변, 후속 질문은 제외)
+        packed = None
+        if not follow_up:
+            with tracing.stage('AnswerPack'):
+                packed = lookup_answer_pack(game_type, question_text, user_question)
+            tracing.record('AnswerPackHit', 1 if packed else 0)
+        if packed:
+            template, packed_answer = packed
+            logger.info(f"Answer pack hit ({template}): {get_answer_pack().stats()}")
+            
+            if session_id:
+                conversation = conversation_store.append(session_id, conversation, user_question, packed_answer)
+            if stream:
+                return build_response(
+                    200,
+                    collect_sse(build_instant_sse_events(packed_answer, answer_pack=True, template=template), sse_writer),
+                    {**headers, 'Content-Type': 'text/event-stream; charset=utf-8', 'Cache-Control': 'no-cache'},
+                    request
+                )
+            response_payload = {
+                'response': packed_answer,
+                'answer_pack': True,
+                'template': template,
+                'timestamp': datetime.now().isoformat(),
+                'success': True
+            }
+            if session_id:
+                response_payload['sessionId'] = session_id
+                response_payload['turn'] = conversation['turn_count']
+            return json_response(200, response_payload, headers, request)
+        
+        # 빠른 경로: 확신도가 높은 정형 의도는 Bedrock 없이 바로 답변
+        if INTENT_FAST_PATH:
+            fast_started = time.perf_counter()
+            with tracing.stage('Intent'):
+                quiz = find_quiz_question(question_text, game_type)
+                intent = intent_router.classify(user_question, follow_up, quiz)
+            tracing.record('FastPath', 1 if intent else 0)
+            if intent:
+                intent_name, confidence = intent
+                fast_answer = intent_router.answer(intent_name, game_type, quiz)
+                elapsed_ms = (time.perf_counter() - fast_started) * 1000
+                saved_ms = intent_router.estimated_saving_ms(elapsed_ms)
+                intent_router.record_fast_path(intent_name, elapsed_ms)
+                tracing.set_property('Intent', intent_name)
+                if saved_ms is not None:
+                    tracing.record('FastPathSavedMs', round(saved_ms, 1), 'Milliseconds')
+                logger.info(f"Intent fast path: {intent_name} ({confidence}) {intent_router.stats()}")
+                
+                if session_id:
+                    conversation = conversation_store.append(session_id, conversation, user_question, fast_answer)
+                if stream:
+                    return build_response(
+                        200,
+                        collect_sse(build_instant_sse_events(fast_answer, intent=intent_name, confidence=confidence), sse_writer),
+                        {**headers, 'Content-Type': 'text/event-stream; charset=utf-8', 'Cache-Control': 'no-cache'},
+                        request
+                    )
+                response_payload = {
+                    'response': fast_answer,
+                    'intent': intent_name,
+                    'confidence': confidence,
+                    'timestamp': datetime.now().isoformat(),
+                    'success': True
+                }
+                if session_id:
+                    response_payload['sessionId'] = session_id
+                    response_payload['turn'] = conversation['turn_count']
+                return json_response(200, response_payload, headers, request)
+        
+        # 유사 질문 답변 캐시 조회 (후속 질문은 이전 대화에 따라 답이 달라지므로 제외)
+        cached = None
+        if not follow_up:
+            with tracing.stage('AnswerCache'):
+                cached = answer_cache.lookup(game_type, question_text, user_question)
+        tracing.set_property('AnswerCacheHit', bool(cached))
+        if cached:
+            cached_answer, similarity = cached
+            logger.info(f"Answer cache hit (similarity {similarity:.2f}): {answer_cache.stats()}")
+            if stream:
+                return build_response(
+                    200,
+                    collect_sse(build_cached_sse_events(cached_answer, similarity), sse_writer),
+                    {**headers, 'Content-Type': 'text/event-stream; charset=utf-8', 'Cache-Control': 'no-cache'},
+                    request
+                )
+            return json_response(200, {
+                'response': cached_answer,
+                'cached': True,
+                'similarity': round(similarity, 3),
+                'timestamp': datetime.now().isoformat(),
+                'success': True
+            }, headers, request)
+        
+        # RAG 지식 베이스 수집 (남은 실행 시간 기준 데드라인)
+        llm_started = time.perf_counter()
+        with tracing.stage('RagGather'):
+            knowledge_base = build_rag_knowledge_base(
+                user_question, 
+                question_text, 
+                quiz_article_url, 
+                game_type,
+                deadline=deadline_from_context(context)
+            )
+        tracing.set_property('SourcesDropped', knowledge_base.get('dropped', []))
+        tracing.record('RagSources', len(knowledge_base.get('sources', [])))
+        
+        # 스트리밍 모드: SSE 이벤트로 응답
+        # (Python 관리형 런타임은 응답 스트리밍을 지원하지 않아 이벤트를 모아서 반환,
+        #  실시간 전송은 local-stream-server.py 사용)
+        if stream:
+            with tracing.stage('BedrockStream'):
+                sse_body = collect_sse(build_sse_events(
+                    user_question, knowledge_base, game_type, question_text, session_id, conversation,
+                    started=request_started, deadline=response_deadline
+                ), sse_writer)
+            intent_router.record_llm((time.perf_counter() - llm_started) * 1000)
+            return build_response(
+                200,
+                sse_body,
+                {**headers, 'Content-Type': 'text/event-stream; charset=utf-8', 'Cache-Control': 'no-cache'},
+                request
+            )
         
         # Claude 순수 응답 생성 (RAG 컨텍스트 포함)
+        generation = {}
         claude_response = generate_claude_rag_response(
             user_question,
             knowledge_base,
-            game_type
+            game_type,
+            generation,
+            history=conversation_store.history(conversation) if follow_up else None,
+            deadline=response_deadline
         )
         
-        return {
-            'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps({
-                'response': claude_response,
-                'knowledge_sources': len(knowledge_base.get('sources', [])),
-                'timestamp': datetime.now().isoformat(),
-                'success': True
-            })
+        intent_router.record_llm((time.perf_counter() - llm_started) * 1000)
+        record_bedrock_usage(game_type, knowledge_base, generation, follow_up, request_started)
+        
+        # 대체 응답이 아닌 경우에만 캐시/대화 기록에 저장
+        if not generation.get('fallback'):
+            if not follow_up:
+                answer_cache.store(game_type, question_text, user_question, claude_response)
+            if session_id:
+                conversation = conversation_store.append(session_id, conversation, user_question, claude_response)
+        tracing.set_property('Fallback', bool(generation.get('fallback')))
+        
+        response_payload = {
+            'response': claude_response,
+            'knowledge_sources': len(knowledge_base.get('sources', [])),
+            'knowledge_sources_arrived': knowledge_base.get('arrived', []),
+            'knowledge_sources_dropped': knowledge_base.get('dropped', []),
+            'timestamp': datetime.now().isoformat(),
+            'success': True
         }
+        if session_id:
+            response_payload['sessionId'] = session_id
+            response_payload['turn'] = conversation['turn_count']
+        
+        with tracing.stage('Serialize'):
+            return json_response(200, response_payload, headers, request)
+        
+    except RequestError as e:
+        logger.warning(f"Bad request: {str(e)}")
+        return json_response(400, {
+            'error': '잘못된 요청 형식입니다.',
+            'success': False
+        }, headers, request)
         
     except Exception as e:
         logger.error(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({
-                'error': '서버 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.',
-                'success': False
+        tracing.set_property('Error', type(e).__name__)
+        return json_response(500, {
+            'error': '서버 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.',
+            'success': False
+        }, headers, request)
+    
+    finally:
+        usage_ledger.maybe_emit()
+        tracing.flush()
+
+def handle_batch_request(body, request, headers, context, sse_writer=None):
+    """
+    배치 요청 처리
+    body: {"questions": [{"question", "gameType", "questionText", "quizArticleUrl"} 또는 질문 문자열, ...],
+           "gameType": 항목 기본값, "stream": SSE 여부, "order": "input"(기본) | "completion"}
+    """
+    with tracing.stage('Parse'):
+        items = parse_batch_items(body)
+    deadline = deadline_from_context(context, reserve_ms=3000, max_budget_ms=BATCH_BUDGET_MS)
+    ordered = body.get('order', 'input') != 'completion'
+    tracing.set_property('Batch', True)
+    logger.info(f"Batch request: {len(items)} items (order: {'input' if ordered else 'completion'})")
+    
+    if body.get('stream'):
+        return build_response(
+            200,
+            collect_sse(build_batch_sse_events(items, deadline, ordered), sse_writer),
+            {**headers, 'Content-Type': 'text/event-stream; charset=utf-8', 'Cache-Control': 'no-cache'},
+            request
+        )
+    
+    stats = {}
+    started = time.perf_counter()
+    with tracing.stage('Batch'):
+        results = sorted(iter_batch_results(items, deadline, stats), key=lambda result: result[0])
+    entries = [entry for _, entry in results]
+    summary = summarize_batch(entries, stats, started)
+    
+    with tracing.stage('Serialize'):
+        return json_response(200, {
+            'results': entries,
+            'summary': summary,
+            'timestamp': datetime.now().isoformat(),
+            'success': True
+        }, headers, request)
+
+def parse_batch_items(body):
+    """
+    배치 항목 정규화 - 질문이 없거나 필드 형식이 잘못된 항목은 None (해당 항목만 오류 처리)
+    """
+    questions = body['questions']
+    if not questions or len(questions) > BATCH_MAX_ITEMS:
+        raise RequestError(f"questions must contain 1-{BATCH_MAX_ITEMS} items")
+    
+    default_game_type = string_field(body, 'gameType')
+    items = []
+    for entry in questions:
+        if isinstance(entry, str):
+            entry = {'question': entry}
+        try:
+            question = string_field(entry, 'question') if isinstance(entry, dict) else ''
+            if not question.strip():
+                items.append(None)
+                continue
+            items.append({
+                'question': question.strip(),
+                'gameType': string_field(entry, 'gameType') or default_game_type,
+                'questionText': string_field(entry, 'questionText'),
+                'quizArticleUrl': string_field(entry, 'quizArticleUrl')
             })
-        }
+        except RequestError:
+            items.append(None)
+    return items
+
+def batch_item_key(item):
+    """
+    중복 판단 키 (대소문자/공백 차이 무시)
+    """
+    return (
+        item['gameType'],
+        ' '.join(item['questionText'].split()),
+        ' '.join(item['question'].lower().split()),
+        item['quizArticleUrl']
+    )
+
+def iter_batch_results(items, deadline, stats=None):
+    """
+    배치 항목을 완료 순서로 (원래 인덱스, 결과) yield
+    같은 질문은 한 번만 처리해 결과를 공유 (뒤 항목에 duplicateOf 표시)
+    """
+    if stats is None:
+        stats = {}
+    
+    for index, item in enumerate(items):
+        if item is None:
+            yield index, {'index': index, 'success': False, 'error': '질문이 필요합니다.'}
+    
+    valid = [index for index, item in enumerate(items) if item is not None]
+    unique, mapping = dedupe([items[index] for index in valid], key=batch_item_key)
+    owners = {}
+    for position, unique_index in enumerate(mapping):
+        owners.setdefault(unique_index, []).append(valid[position])
+    stats['unique'] = len(unique)
+    
+    def worker(item):
+        # 항목별 추적에 기록 후 병합 (동시 실행 항목의 BedrockMs 등이 합산되지 않도록)
+        with tracing.scope():
+            return answer_batch_item(item, deadline)
+    
+    for unique_index, status, result in fan_out(unique, worker, BATCH_MAX_CONCURRENCY, deadline):
+        indices = owners[unique_index]
+        for index in indices:
+            if status == 'ok':
+                entry = {'index': index, 'success': True, **result}
+            elif status == 'timeout' or isinstance(result, DeadlineExceeded):
+                entry = {'index': index, 'success': False, 'timeout': True, 'error': '제한 시간 안에 답변을 만들지 못했습니다.'}
+            else:
+                entry = {'index': index, 'success': False, 'error': '답변 생성 중 오류가 발생했습니다.'}
+            if index != indices[0]:
+                entry['duplicateOf'] = indices[0]
+            yield index, entry
+
+def answer_batch_item(item, deadline):
+    """
+    배치 항목 하나 답변 - 답변 팩 → 빠른 경로 → 답변 캐시 → RAG + Claude 순 (세션/스트리밍 없음)
+    """
+    user_question = item['question']
+    game_type = item['gameType']
+    question_text = item['questionText']
+    
+    packed = lookup_answer_pack(game_type, question_text, user_question)
+    if packed:
+        return {'response': packed[1], 'source': 'answer_pack', 'template': packed[0]}
+    
+    quiz = find_quiz_question(question_text, game_type)
+    intent = intent_router.classify(user_question, quiz=quiz) if INTENT_FAST_PATH else None
+    if intent:
+        return {'response': intent_router.answer(intent[0], game_type, quiz), 'source': 'intent', 'intent': intent[0]}
+    
+    cached = answer_cache.lookup(game_type, question_text, user_question)
+    if cached:
+        return {'response': cached[0], 'source': 'cache'}
+    
+    # 배치 데드라인을 넘긴 항목은 이미 timeout으로 응답했으므로 RAG/Bedrock 호출 생략
+    if remaining_ms(deadline) < MODEL_MIN_ATTEMPT_MS:
+        raise DeadlineExceeded(f"batch item skipped, {remaining_ms(deadline):.0f}ms left")
+    
+    # RAG 수집 데드라인은 기본 예산과 배치 전체 데드라인 중 빠른 쪽
+    started = time.perf_counter()
+    knowledge_base = build_rag_knowledge_base(
+        user_question,
+        question_text,
+        item['quizArticleUrl'],
+        game_type,
+        deadline=min(deadline_from_context(None), deadline)
+    )
+    generation = {}
+    claude_response = generate_claude_rag_response(user_question, knowledge_base, game_type, generation, deadline=deadline)
+    record_bedrock_usage(game_type, knowledge_base, generation, False, started)
+    if generation.get('fallback'):
+        return {'response': claude_response, 'source': 'fallback'}
+    
+    answer_cache.store(game_type, question_text, user_question, claude_response)
+    return {
+        'response': claude_response,
+        'source': 'llm',
+        'model': generation.get('model_id'),
+        'knowledge_sources': len(knowledge_base.get('sources', []))
+    }
+
+def summarize_batch(entries, stats, started):
+    """
+    배치 결과 요약 + EMF 지표 기록
+    """
+    summary = {
+        'items': len(entries),
+        'unique': stats.get('unique', 0),
+        'succeeded': sum(1 for entry in entries if entry['success']),
+        'failed': sum(1 for entry in entries if not entry['success'] and not entry.get('timeout')),
+        'timed_out': sum(1 for entry in entries if entry.get('timeout')),
+        'total_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+    tracing.record('BatchItems', summary['items'])
+    tracing.record('BatchUnique', summary['unique'])
+    tracing.record('BatchFailed', summary['failed'])
+    tracing.record('BatchTimedOut', summary['timed_out'])
+    logger.info(f"Batch finished: {summary}")
+    return summary
 
-def build_rag_knowledge_base(user_question, question_text, quiz_article_url, game_type):
+def build_batch_sse_events(items, deadline, ordered=True):
     """
-    RAG 지식 베이스 구축 (3개 소스)
+    배치 결과를 항목별 'item' 이벤트로 생성 (입력 순서 또는 완료 순서), 마지막에 'done' 요약
+    """
+    stats = {}
+    entries = []
+    started = time.perf_counter()
+    
+    results = iter_batch_results(items, deadline, stats)
+    if ordered:
+        results = in_order(results)
+    for _, entry in results:
+        entries.append(entry)
+        yield format_sse(entry, event='item')
+    
+    summary = summarize_batch(entries, stats, started)
+    yield format_sse({**summary, 'timestamp': datetime.now().isoformat(), 'success': True}, event='done')
+
+def build_rag_knowledge_base(user_question, question_text, quiz_article_url, game_type, deadline=None):
+    """
+    RAG 지식 베이스 구축 (4개 소스)
     1. BigKinds API 뉴스
     2. 퀴즈 관련 기사
-    3. 퀴즈 문제 컨텍스트
+    3. 퀴즈 코퍼스 (로컬 BM25 인덱스)
+    4. 퀴즈 문제 컨텍스트
+
+    외부 소스는 병렬로 수집하며, 데드라인을 넘긴 소스는 제외
     """
     knowledge_base = {
         'sources': [],
-        'summary': ''
+        'summary': '',
+        'arrived': [],
+        'dropped': []
     }
     
+    if deadline is None:
+        deadline = deadline_from_context(None)
+    
+    # 외부 소스 병렬 수집
+    tasks = [
+        ('news_search', lambda: fetch_bigkinds_knowledge(user_question, game_type)),
+        ('quiz_corpus', lambda: fetch_quiz_corpus_knowledge(user_question, question_text, game_type))
+    ]
+    if quiz_article_url:
+        tasks.append(('quiz_article', lambda: fetch_quiz_article_knowledge(quiz_article_url)))
+    
+    results, status = gather_with_deadline(tasks, deadline)
+    knowledge_base['dropped'] = [name for name, state in status.items() if state == 'timeout']
+    
     # 1. BigKinds API 뉴스 검색
-    bigkinds_data = fetch_bigkinds_knowledge(user_question, game_type)
+    bigkinds_data = results.get('news_search')
     if bigkinds_data:
         knowledge_base['sources'].append({
             'type': 'news_search',
             'title': 'BigKinds 뉴스 검색 결과',
             'content': bigkinds_data['content'],
+            'passages': bigkinds_data['passages'],
             'articles_count': bigkinds_data['count']
         })
     
     # 2. 퀴즈 관련 기사 (URL이 제공된 경우)
     if quiz_article_url:
-        article_data = fetch_quiz_article_knowledge(quiz_article_url)
+        article_data = results.get('quiz_article')
         if article_data:
             knowledge_base['sources'].append({
                 'type': 'quiz_article',
                 'title': '퀴즈 관련 기사',
                 'content': article_data['content'],
+                'passages': article_data['passages'],
                 'url': quiz_article_url
             })
     
-    # 3. 퀴즈 문제 컨텍스트
+    # 3. 퀴즈 코퍼스 (발행된 퀴즈 해설)
+    corpus_data = results.get('quiz_corpus')
+    if corpus_data:
+        knowledge_base['sources'].append({
+            'type': 'quiz_corpus',
+            'title': '관련 퀴즈 해설',
+            'content': corpus_data['content'],
+            'passages': corpus_data['passages']
+        })
+    
+    # 4. 퀴즈 문제 컨텍스트
     if question_text:
         knowledge_base['sources'].append({
             'type': 'quiz_context',
@@ -131,6 +728,7 @@ def build_rag_knowledge_base(user_question, question_text, quiz_article_url, gam
         })
     
     # 지식 베이스 요약
+    knowledge_base['arrived'] = [source['type'] for source in knowledge_base['sources']]
     source_count = len(knowledge_base['sources'])
     knowledge_base['summary'] = f"{source_count}개 외부 지식 소스 활용"
     
@@ -147,26 +745,29 @@ def fetch_bigkinds_knowledge(user_question, game_type):
             return None
         
         # 게임별 키워드 추출
-        keywords = extract_search_keywords(user_question, game_type)
+        with tracing.stage('Keywords'):
+            keywords = extract_search_keywords(user_question, game_type)
         logger.info(f"BigKinds search keywords: {keywords}")
         
         # API 호출
-        news_data = call_bigkinds_api(keywords, api_key)
+        with tracing.stage('BigKinds'):
+            news_data = call_bigkinds_api(keywords, api_key)
         
         if news_data and news_data.get('return_object', {}).get('documents'):
             articles = news_data['return_object']['documents'][:3]
             
-            # 뉴스 내용 통합
-            combined_content = ""
+            # 기사별 구절 (길이 제한은 컨텍스트 조립 단계의 토큰 예산으로 처리)
+            passages = []
             for i, article in enumerate(articles, 1):
                 title = article.get('title', '')
-                content = article.get('content', '')[:200]
+                content = article.get('content', '')
                 provider = article.get('provider', '')
                 
-                combined_content += f"[뉴스 {i}] {provider}: {title}\n{content}...\n\n"
+                passages.append(f"[뉴스 {i}] {provider}: {title}\n{content}")
             
             return {
-                'content': combined_content.strip(),
+                'content': "\n\n".join(passages),
+                'passages': passages,
                 'count': len(articles)
             }
     
@@ -175,17 +776,66 @@ def fetch_bigkinds_knowledge(user_question, game_type):
     
     return None
 
+def lookup_answer_pack(game_type, question_text, user_question):
+    """
+    사전 생성 답변 팩 조회 - (템플릿, 답변) 또는 None (팩이 없거나 해당 문항/템플릿이 없으면)
+    """
+    pack = get_answer_pack()
+    if pack is None:
+        return None
+    return pack.lookup(game_type, question_text, user_question)
+
+def find_quiz_question(question_text, game_type):
+    """
+    현재 퀴즈 문제의 인덱스 문서 (해설/힌트 포함, 인덱스가 없거나 찾지 못하면 None)
+    """
+    index = get_quiz_index()
+    if index is None or not question_text:
+        return None
+    return index.find_question(question_text, game_type)
+
+@traced('QuizCorpus')
+def fetch_quiz_corpus_knowledge(user_question, question_text, game_type):
+    """
+    발행된 퀴즈 문제/해설 로컬 인덱스 검색 (네트워크 없음)
+    """
+    index = get_quiz_index()
+    if index is None:
+        return None
+    
+    results = index.search(f"{user_question} {question_text}", limit=3, game_type=game_type)
+    if not results:
+        return None
+    
+    passages = []
+    for score, doc in results:
+        passage = f"[{doc['quizDate']}] Q. {doc['question']}\nA. {doc['answer']}"
+        if doc.get('explanation'):
+            passage += f"\n해설: {doc['explanation']}"
+        passages.append(passage)
+    
+    return {
+        'content': "\n\n".join(passages),
+        'passages': passages
+    }
+
+@traced('QuizArticle')
 def fetch_quiz_article_knowledge(article_url):
     """
-    퀴즈 관련 기사 내용 추출 (URL에서)
+    퀴즈 관련 기사 본문 추출 (URL 단위 캐시 + 조건부 GET)
     """
     try:
-        # 실제 구현에서는 웹 스크래핑 또는 기사 API 사용
-        # 현재는 URL 정보만 반환
-        return {
-            'content': f"퀴즈 관련 기사: {article_url}\n(기사 내용 추출 기능 구현 예정)",
-            'url': article_url
-        }
+        article = article_fetcher.fetch(article_url)
+        logger.info(f"Article cache: {article_fetcher.stats()}")
+        if article:
+            passages = list(article['paragraphs'])
+            if article['title']:
+                passages[0] = f"[{article['title']}]\n{passages[0]}"
+            return {
+                'content': "\n\n".join(passages),
+                'passages': passages,
+                'url': article_url
+            }
     
     except Exception as e:
         logger.error(f"Quiz article fetch error: {str(e)}")
@@ -199,9 +849,8 @@ def extract_search_keywords(user_question, game_type):
     # 기본 키워드
     base_keywords = []
     
-    # 사용자 질문에서 핵심 단어 추출
-    question_words = user_question.replace('?', '').replace('!', '').split()
-    meaningful_words = [word for word in question_words if len(word) > 2]
+    # 사용자 질문에서 핵심 단어 추출 (경제 용어 사전 우선, 나머지는 조사를 뗀 어간)
+    meaningful_words = extract_terms(user_question, limit=3) + extract_stems(user_question)
     base_keywords.extend(meaningful_words[:3])
     
     # 게임별 관련 키워드 추가
@@ -217,27 +866,45 @@ def extract_search_keywords(user_question, game_type):
     # 경제 관련 키워드 추가
     base_keywords.extend(['경제', '금융'])
     
+    # 중복 제거 (순서 유지)
+    base_keywords = list(dict.fromkeys(base_keywords))
+    
     return ' '.join(base_keywords[:5])
 
+def normalize_keywords(keywords):
+    """
+    캐시 키용 키워드 정규화 (소문자, 중복 제거, 정렬)
+    """
+    return tuple(sorted(set(keywords.lower().split())))
+
 def call_bigkinds_api(keywords, api_key):
     """
-    BigKinds API 호출
+    BigKinds API 호출 (결과 캐시 우선 조회)
     """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=30)
+    date_from = start_date.strftime('%Y-%m-%d')
+    date_until = end_date.strftime('%Y-%m-%d')
+    
+    cache_key = (normalize_keywords(keywords), tuple(BIGKINDS_PROVIDERS), date_from, date_until)
+    hit, cached = bigkinds_cache.get(cache_key)
+    if hit:
+        logger.info(f"BigKinds cache hit: {cache_key[0]} ({bigkinds_cache.stats()['hit_rate']})")
+        return cached
+    
+    news_data = None
     try:
-        url = "https://www.bigkinds.or.kr/api/news/search"
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
+        url = f"{BIGKINDS_HOST}/api/news/search"
         
         params = {
             'access_key': api_key,
             'argument': {
                 'query': keywords,
                 'published_at': {
-                    'from': start_date.strftime('%Y-%m-%d'),
-                    'until': end_date.strftime('%Y-%m-%d')
+                    'from': date_from,
+                    'until': date_until
                 },
-                'provider': ['서울경제', '한국경제', '매일경제', '연합뉴스'],
+                'provider': BIGKINDS_PROVIDERS,
                 'category': ['경제', '사회', '정치'],
                 'sort': {'date': 'desc'},
                 'hilight': 200,
@@ -246,38 +913,45 @@ def call_bigkinds_api(keywords, api_key):
             }
         }
         
-        response = requests.post(url, json=params, timeout=15)
-        
-        if response.status_code == 200:
+        def request_news():
+            response = get_session().post(url, json=params, timeout=(3.05, bigkinds_endpoint.timeout))
+            if response.status_code != 200:
+                raise RuntimeError(f"BigKinds API error: {response.status_code}")
             return response.json()
-        else:
-            logger.error(f"BigKinds API error: {response.status_code}")
-            return None
-            
+        
+        news_data = bigkinds_endpoint.call(request_news)
+        logger.info(f"HTTP connection pool: {get_connection_stats()}")
+        logger.info(f"BigKinds endpoint: {bigkinds_endpoint.stats()}")
+    
+    except CircuitOpenError:
+        # 서킷이 열린 동안은 호출하지 않음 (쿨다운이 끝나면 다시 시도하도록 캐시하지 않음)
+        logger.warning("BigKinds circuit open, skipping news search")
+        return None
     except Exception as e:
         logger.error(f"BigKinds API call failed: {str(e)}")
-        return None
+    
+    # 빈 결과와 오류는 부정 캐시 (None)
+    if not (news_data and news_data.get('return_object', {}).get('documents')):
+        news_data = None
+    bigkinds_cache.set(cache_key, news_data)
+    
+    return news_data
 
-def generate_claude_rag_response(user_question, knowledge_base, game_type):
+def build_claude_rag_request(user_question, knowledge_base, game_type, history=None):
     """
-    RAG 기반 Claude 순수 응답 생성
+    RAG 컨텍스트를 포함한 Claude 요청 본문 구성
+    history: (이전 대화 요약, 최근 턴 messages) - 후속 질문인 경우
+    반환: (request_body, 외부 지식 사용 여부)
     """
-    try:
-        # Bedrock 클라이언트 초기화
-        bedrock = boto3.client(
-            service_name='bedrock-runtime',
-            region_name='us-east-1'
-        )
-        
-        # 외부 지식이 있는지 확인
-        has_external_knowledge = knowledge_base.get('sources') and len(knowledge_base['sources']) > 0
+    # 외부 지식이 있는지 확인
+    has_external_knowledge = bool(knowledge_base.get('sources'))
+    
+    if has_external_knowledge:
+        # RAG 컨텍스트 구성
+        rag_context = build_rag_context(knowledge_base, user_question)
         
-        if has_external_knowledge:
-            # RAG 컨텍스트 구성
-            rag_context = build_rag_context(knowledge_base)
-            
-            # 게임별 전문 시스템 프롬프트 (RAG 버전)
-            system_prompt = f"""당신은 경제 전문 AI 어시스턴트입니다.
+        # 게임별 전문 시스템 프롬프트 (RAG 버전)
+        system_prompt = f"""당신은 경제 전문 AI 어시스턴트입니다.
 
 게임 컨텍스트: {get_game_description(game_type)}
 
@@ -288,16 +962,16 @@ def generate_claude_rag_response(user_question, knowledge_base, game_type):
 4. 250-350자 내외의 적절한 길이
 5. 한국어로 자연스럽게 작성"""
 
-            # 사용자 프롬프트 (RAG 컨텍스트 포함)
-            user_prompt = f"""질문: {user_question}
+        # 사용자 프롬프트 (RAG 컨텍스트 포함)
+        user_prompt = f"""질문: {user_question}
 
 외부 지식 베이스:
 {rag_context}
 
 위 정보를 바탕으로 질문에 대해 전문적이고 통찰력 있는 답변을 해주세요."""
-        else:
-            # 순수 Claude 응답 (외부 지식 없음)
-            system_prompt = f"""당신은 경제 전문 AI 어시스턴트입니다.
+    else:
+        # 순수 Claude 응답 (외부 지식 없음)
+        system_prompt = f"""당신은 경제 전문 AI 어시스턴트입니다.
 
 게임 컨텍스트: {get_game_description(game_type)}
 
@@ -308,65 +982,268 @@ def generate_claude_rag_response(user_question, knowledge_base, game_type):
 4. 250-350자 내외의 적절한 길이
 5. 한국어로 자연스럽게 작성"""
 
-            user_prompt = f"""질문: {user_question}
+        user_prompt = f"""질문: {user_question}
 
 위 질문에 대해 경제 전문가로서 전문적이고 통찰력 있는 답변을 해주세요."""
 
-        # Claude 모델 호출
-        model_id = "anthropic.claude-3-sonnet-20240229-v1:0"
-        
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1000,
-            "system": system_prompt,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": user_prompt
-                }
-            ],
-            "temperature": 0.7,
-            "top_p": 0.9
-        }
+    # 이전 대화: 요약은 시스템 프롬프트에, 최근 턴은 messages 앞에 배치
+    history_messages = []
+    if history:
+        conversation_summary, history_messages = history
+        if conversation_summary:
+            system_prompt += f"\n\n이전 대화 요약:\n{conversation_summary}"
+    
+    request_body = {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 1000,
+        "system": system_prompt,
+        "messages": history_messages + [
+            {
+                "role": "user",
+                "content": user_prompt
+            }
+        ],
+        "temperature": 0.7,
+        "top_p": 0.9
+    }
+    
+    return request_body, has_external_knowledge
+
+def generate_claude_rag_response(user_question, knowledge_base, game_type, metrics=None, history=None, deadline=None):
+    """
+    RAG 기반 Claude 순수 응답 생성
+    대체 응답을 반환한 경우 metrics['fallback'] = True
+    deadline(monotonic)까지 답을 못 받으면 모델/리전 전환을 멈추고 대체 응답
+    """
+    if metrics is None:
+        metrics = {}
+    
+    try:
+        # Bedrock 리전 풀 프록시 (리전별 클라이언트는 컨테이너 단위 재사용, 첫 호출은 SDK 로딩 포함)
+        with tracing.stage('BedrockClient'):
+            bedrock = region_pool.bedrock(deadline)
+        logger.info(f"Bedrock client pool: {get_client_stats()}")
         
-        response = bedrock.invoke_model(
-            modelId=model_id,
-            body=json.dumps(request_body)
+        with tracing.stage('Context'):
+            request_body, has_external_knowledge = build_claude_rag_request(
+                user_question, knowledge_base, game_type, history
+            )
+        complexity = classify_complexity(
+            user_question,
+            context_tokens=estimate_tokens(request_body['messages'][-1]['content']),
+            follow_up=bool(history)
         )
         
-        response_body = json.loads(response['body'].read())
+        if os.environ.get('RAG_COUNT_TOKENS') == '1':
+            input_tokens = count_tokens_remote(bedrock, model_router.route(complexity)[0], request_body)
+            logger.info(f"Prompt input tokens (CountTokens): {input_tokens}")
+        
+        with tracing.stage('Bedrock'):
+            claude_response = model_router.converse(bedrock, request_body, complexity, metrics, deadline=deadline)
+        logger.info(f"Bedrock region ranking: {region_pool.snapshot()}")
         
-        if response_body.get('content') and len(response_body['content']) > 0:
-            claude_response = response_body['content'][0]['text']
+        tracing.record_usage(metrics.get('input_tokens'), metrics.get('output_tokens'))
+        if metrics.get('model_latency_ms') is not None:
+            tracing.record('ModelLatencyMs', metrics['model_latency_ms'], 'Milliseconds')
+        tracing.set_property('Model', metrics.get('model_id'))
+        tracing.set_property('Region', metrics.get('region'))
+        tracing.set_property('Complexity', complexity)
+        
+        if claude_response:
             knowledge_status = "RAG" if has_external_knowledge else "Pure Claude"
-            logger.info(f"Claude {knowledge_status} response generated successfully")
+            logger.info(f"Claude {knowledge_status} response generated ({metrics['model_id']}, {complexity})")
             return claude_response
         else:
             logger.error("Empty response from Claude")
+            metrics['fallback'] = True
             return generate_fallback_response(user_question, game_type)
             
     except Exception as e:
         logger.error(f"Claude error: {str(e)}")
+        metrics['fallback'] = True
         return generate_fallback_response(user_question, game_type)
 
-def build_rag_context(knowledge_base):
+def stream_claude_rag_response(user_question, knowledge_base, game_type, metrics=None, history=None, deadline=None):
+    """
+    RAG 기반 Claude 스트리밍 응답 - 텍스트 조각을 생성되는 대로 yield
+    토큰 전송 전 실패하면 대체 응답을 한 번에 yield
+    """
+    if metrics is None:
+        metrics = {}
+    
+    sent_any = False
+    try:
+        bedrock = region_pool.bedrock(deadline)
+        request_body, _ = build_claude_rag_request(user_question, knowledge_base, game_type, history)
+        complexity = classify_complexity(
+            user_question,
+            context_tokens=estimate_tokens(request_body['messages'][-1]['content']),
+            follow_up=bool(history)
+        )
+        tracing.set_property('Complexity', complexity)
+        
+        for text in model_router.converse_stream(bedrock, request_body, complexity, metrics, deadline=deadline):
+            sent_any = True
+            yield text
+        tracing.set_property('Model', metrics.get('model_id'))
+        tracing.set_property('Region', metrics.get('region'))
+    
+    except Exception as e:
+        logger.error(f"Claude stream error: {str(e)}")
+        if sent_any:
+            return
+        metrics['fallback'] = True
+    
+    if not sent_any:
+        yield generate_fallback_response(user_question, game_type)
+
+def build_sse_events(user_question, knowledge_base, game_type, question_text='', session_id=None, conversation=None,
+                     started=None, deadline=None):
+    """
+    스트리밍 응답을 SSE 이벤트 문자열로 순차 생성
+    마지막 'done' 이벤트에 첫 토큰 시간(ttft)과 전체 지연 시간 포함
+    started: 요청 시작 시각 (perf_counter, 토큰/지연 시간 집계용) - 없으면 이 함수 호출 시각
+    deadline: Bedrock 응답 데드라인 (monotonic)
+    """
+    if started is None:
+        started = time.perf_counter()
+    metrics = {}
+    parts = []
+    follow_up = bool(conversation and conversation['turn_count'])
+    history = conversation_store.history(conversation) if follow_up else None
+    
+    yield format_sse({
+        'knowledge_sources': len(knowledge_base.get('sources', [])),
+        'knowledge_sources_arrived': knowledge_base.get('arrived', []),
+        'knowledge_sources_dropped': knowledge_base.get('dropped', [])
+    }, event='meta')
+    
+    for text in stream_claude_rag_response(user_question, knowledge_base, game_type, metrics, history, deadline):
+        parts.append(text)
+        yield format_sse({'text': text}, event='token')
+    
+    if not metrics.get('fallback'):
+        if not follow_up:
+            answer_cache.store(game_type, question_text, user_question, ''.join(parts))
+        if session_id:
+            conversation = conversation_store.append(session_id, conversation, user_question, ''.join(parts))
+    
+    tracing.record_usage(metrics.get('input_tokens'), metrics.get('output_tokens'))
+    if metrics.get('ttft_ms') is not None:
+        tracing.record('TimeToFirstTokenMs', metrics['ttft_ms'], 'Milliseconds')
+    if metrics.get('model_latency_ms') is not None:
+        tracing.record('ModelLatencyMs', metrics['model_latency_ms'], 'Milliseconds')
+    record_bedrock_usage(game_type, knowledge_base, metrics, follow_up, started)
+    tracing.set_property('Fallback', bool(metrics.get('fallback')))
+    
+    yield format_sse({
+        'ttft_ms': metrics.get('ttft_ms'),
+        'total_ms': metrics.get('total_ms'),
+        'input_tokens': metrics.get('input_tokens'),
+        'output_tokens': metrics.get('output_tokens'),
+        'session_id': session_id,
+        'turn': conversation['turn_count'] if conversation else None,
+        'timestamp': datetime.now().isoformat(),
+        'success': True
+    }, event='done')
+
+def build_cached_sse_events(answer, similarity):
+    """
+    캐시된 답변을 SSE 이벤트로 변환
+    """
+    yield format_sse({'knowledge_sources': 0, 'cached': True}, event='meta')
+    yield format_sse({'text': answer}, event='token')
+    yield format_sse({
+        'ttft_ms': 0,
+        'total_ms': 0,
+        'cached': True,
+        'similarity': round(similarity, 3),
+        'timestamp': datetime.now().isoformat(),
+        'success': True
+    }, event='done')
+
+def build_instant_sse_events(answer, **details):
+    """
+    Bedrock 없이 만든 답변(빠른 경로, 답변 팩)을 SSE 이벤트로 변환
+    details: 'meta'/'done' 이벤트에 함께 넣을 출처 정보 (intent, template 등)
+    """
+    yield format_sse({'knowledge_sources': 0, **details}, event='meta')
+    yield format_sse({'text': answer}, event='token')
+    yield format_sse({
+        'ttft_ms': 0,
+        'total_ms': 0,
+        **details,
+        'timestamp': datetime.now().isoformat(),
+        'success': True
+    }, event='done')
+
+def record_bedrock_usage(game_type, knowledge_base, metrics, follow_up, started):
+    """
+    Bedrock 호출 한 건의 토큰/지연 시간 집계
+    모델 처리 시간은 서버 측 latencyMs, 전체 응답 시간은 요청 시작(started)부터 답변 완성까지
+    """
+    usage_ledger.record(
+        game_type if game_type in GAME_TYPES else None,
+        prompt_shape(metrics.get('complexity'), follow_up),
+        len(knowledge_base.get('sources', [])),
+        metrics.get('model_id'),
+        input_tokens=metrics.get('input_tokens'),
+        output_tokens=metrics.get('output_tokens'),
+        model_ms=metrics.get('model_latency_ms'),
+        ttft_ms=metrics.get('ttft_ms'),
+        total_ms=(time.perf_counter() - started) * 1000,
+        fallback=bool(metrics.get('fallback'))
+    )
+
+def build_rag_context(knowledge_base, user_question='', token_budget=None):
     """
     RAG 지식 베이스를 Claude 프롬프트용 컨텍스트로 변환
+    질문과 관련도가 높은 구절부터 토큰 예산 안에서 선택
     """
     if not knowledge_base.get('sources'):
         return "외부 지식 정보가 없습니다."
     
+    if token_budget is None:
+        token_budget = RAG_TOKEN_BUDGET
+    
+    # 소스를 구절 단위 후보로 분해 (퀴즈 문제는 항상 포함)
+    candidates = []
+    for index, source in enumerate(knowledge_base['sources']):
+        passages = source.get('passages')
+        if not passages:
+            passages = [p for p in source.get('content', '').split('\n\n') if p.strip()]
+        for passage in passages:
+            candidates.append({
+                'source': index,
+                'text': passage,
+                'pinned': source.get('type') == 'quiz_context'
+            })
+    
+    selected, stats = select_passages(
+        user_question, candidates, token_budget, max_passage_tokens=RAG_MAX_PASSAGE_TOKENS
+    )
+    knowledge_base['context_stats'] = stats
+    logger.info(
+        f"RAG context: {stats['used_tokens']}/{stats['budget']} tokens, "
+        f"{stats['selected']}/{stats['candidates']} passages, saved {stats['saved_tokens']} tokens"
+    )
+    
     context_parts = []
     
     for i, source in enumerate(knowledge_base['sources'], 1):
         source_type = source.get('type', 'unknown')
         title = source.get('title', f'소스 {i}')
-        content = source.get('content', '')
+        content = "\n\n".join(c['text'] for c in selected if c['source'] == i - 1)
+        
+        if not content:
+            continue
         
         if source_type == 'news_search':
             context_parts.append(f"📰 최신 뉴스 ({source.get('articles_count', 0)}건):\n{content}")
         elif source_type == 'quiz_article':
             context_parts.append(f"📄 퀴즈 관련 기사:\n{content}")
+        elif source_type == 'quiz_corpus':
+            context_parts.append(f"📚 관련 퀴즈 해설:\n{content}")
         elif source_type == 'quiz_context':
             context_parts.append(f"🎯 퀴즈 문제:\n{content}")
         else:
@@ -374,6 +1251,28 @@ def build_rag_context(knowledge_base):
     
     return "\n\n".join(context_parts)
 
+def summarize_conversation(summary, turns, max_tokens):
+    """
+    오래된 대화 턴을 Claude로 요약 (CONVERSATION_SUMMARIZER=claude)
+    """
+    transcript = "\n".join(f"사용자: {turn['question']}\n어시스턴트: {turn['answer']}" for turn in turns)
+    request_body = {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "system": "경제 퀴즈 챗봇의 대화 기록을 이후 답변에 필요한 사실과 사용자 관심사 위주로 한국어 개조식으로 간결하게 요약하세요.",
+        "messages": [
+            {
+                "role": "user",
+                "content": f"기존 요약:\n{summary or '(없음)'}\n\n추가 대화:\n{transcript}\n\n기존 요약과 추가 대화를 합친 새 요약을 작성하세요."
+            }
+        ],
+        "temperature": 0.2
+    }
+    
+    with tracing.stage('Summarize'):
+        deadline = deadline_from_context(None, max_budget_ms=SUMMARY_BUDGET_MS)
+        return model_router.converse(region_pool.bedrock(deadline), request_body, 'simple', deadline=deadline).strip()
+
 def get_game_description(game_type):
     """
     게임별 설명 반환
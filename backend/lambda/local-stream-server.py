@@ -0,0 +1,161 @@
+import json
+import os
+import sys
+import base64
+import logging
+import importlib.util
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger()
+
+HANDLER_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HANDLER_DIR)
+
+
+def load_handler_module():
+    """
+    enhanced-chatbot-handler.py 로드 (파일명에 하이픈이 있어 importlib 사용)
+    """
+    path = os.path.join(HANDLER_DIR, 'enhanced-chatbot-handler.py')
+    spec = importlib.util.spec_from_file_location('enhanced_chatbot_handler', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+handler = load_handler_module()
+
+
+class ChatStreamHandler(BaseHTTPRequestHandler):
+    """
+    로컬 개발용 SSE 스트리밍 서버
+    POST /chat 요청을 lambda_handler와 같은 경로(답변 팩 → 빠른 경로 → 캐시 → RAG + Claude, 세션)로 처리하고
+    SSE 이벤트는 chunked transfer encoding으로 토큰 단위 전송 ("stream"이 없으면 스트리밍으로 처리)
+    GET /usage 요청은 이 서버에서 처리한 Bedrock 호출의 토큰/지연 시간 보고서 반환
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def send_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_cors_headers()
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/usage':
+            self.send_error_json(404, '지원하지 않는 경로입니다.')
+            return
+
+        # 예: /usage?gameType=SignalDecoding&rag=on&metric=total_ms (조건이 없으면 게임 종류/RAG별 보고서)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        filters = {
+            'game_type': params.get('gameType'),
+            'rag': None if 'rag' not in params else params['rag'] == 'on',
+            'shape': params.get('shape'),
+            'model': params.get('model')
+        }
+        if any(value is not None for value in filters.values()) or 'metric' in params:
+            report = handler.usage_ledger.query(params.get('metric', 'total_ms'), **filters)
+        else:
+            report = handler.usage_ledger.report()
+        self.send_json(200, report)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length).decode('utf-8', errors='replace')
+
+        # 이 서버의 기본 응답은 SSE (Lambda 기본값은 JSON)
+        try:
+            body = json.loads(raw or '{}')
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and 'stream' not in body:
+            body['stream'] = True
+            raw = json.dumps(body, ensure_ascii=False)
+
+        event = {
+            'httpMethod': 'POST',
+            'path': urlparse(self.path).path,
+            'headers': dict(self.headers),
+            'body': raw
+        }
+        stream = {'started': False, 'open': True}
+
+        def write_event(sse_event):
+            if not stream['open']:
+                return
+            try:
+                if not stream['started']:
+                    self.start_event_stream()
+                    stream['started'] = True
+                self.write_chunk(sse_event.encode('utf-8'))
+            except (BrokenPipeError, ConnectionResetError):
+                logger.info("Client disconnected during stream")
+                stream['open'] = False
+
+        response = handler.lambda_handler(event, None, sse_writer=write_event)
+
+        if stream['started']:
+            if stream['open']:
+                try:
+                    self.write_chunk(b'')
+                except (BrokenPipeError, ConnectionResetError):
+                    logger.info("Client disconnected during stream")
+            return
+        self.send_lambda_response(response)
+
+    def send_error_json(self, status, message):
+        self.send_json(status, {'error': message, 'success': False})
+
+    def send_json(self, status, data):
+        payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_cors_headers()
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_lambda_response(self, response):
+        """
+        lambda_handler 응답(JSON/오류) 그대로 전송 (압축된 본문은 base64 해제)
+        """
+        body = response.get('body') or ''
+        payload = base64.b64decode(body) if response.get('isBase64Encoded') else body.encode('utf-8')
+        self.send_response(response['statusCode'])
+        for key, value in response.get('headers', {}).items():
+            if key.lower() != 'content-length':
+                self.send_header(key, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def start_event_stream(self):
+        self.send_response(200)
+        self.send_cors_headers()
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+
+if __name__ == '__main__':
+    # 기본은 로컬 접속만 허용 (다른 기기에서 접속하려면 HOST=0.0.0.0)
+    host = os.environ.get('HOST', '127.0.0.1')
+    port = int(os.environ.get('PORT', '8787'))
+    server = ThreadingHTTPServer((host, port), ChatStreamHandler)
+    logger.info(f"Local SSE chat server listening on {host}:{port} (POST /chat, GET /usage)")
+    server.serve_forever()
@@ -1,12 +1,28 @@
-import json
-import boto3
+import os
 import logging
 from datetime import datetime
 
+from chatbot_core.events import normalize_event, parse_json_body, RequestError
+from chatbot_core.responses import json_response
+from chatbot_core.clients import get_client_stats
+from chatbot_core.concurrency import deadline_from_context
+from chatbot_core.model_router import ModelRouter, classify_complexity, bedrock_client_config
+from chatbot_core.regions import RegionPool
+
 # 로깅 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# 질문 복잡도별 모델 체인 (스로틀링/타임아웃 시 다음 모델)
+model_router = ModelRouter()
+
+# Bedrock 리전 풀 (BEDROCK_REGIONS, 가까운 정상 리전 우선, 장애 시 다음 리전)
+region_pool = RegionPool(config=bedrock_client_config)
+
+# 응답 데드라인 (API Gateway 29초 통합 타임아웃 전에 응답, 모델/리전 전환은 이 안에서만)
+RESPONSE_BUDGET_MS = int(os.environ.get('RESPONSE_BUDGET_MS', '27000'))
+RESPONSE_RESERVE_MS = int(os.environ.get('RESPONSE_RESERVE_MS', '1500'))
+
 def lambda_handler(event, context):
     """
     간단하고 효과적인 Claude 챗봇 Lambda 핸들러
@@ -20,8 +36,11 @@ def lambda_handler(event, context):
         'Access-Control-Allow-Headers': 'Content-Type'
     }
     
+    # 요청 정규화 (REST API v1 / HTTP API v2)
+    request = normalize_event(event)
+    
     # OPTIONS 요청 처리
-    if event.get('httpMethod') == 'OPTIONS':
+    if request['method'] == 'OPTIONS':
         return {
             'statusCode': 200,
             'headers': headers,
@@ -30,57 +49,53 @@ def lambda_handler(event, context):
     
     try:
         # 요청 데이터 파싱
-        body = json.loads(event.get('body', '{}'))
+        body = parse_json_body(request)
         user_question = body.get('question', '')
         game_type = body.get('gameType', '')
         question_text = body.get('questionText', '')
         
         if not user_question:
-            return {
-                'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({
-                    'error': '질문이 필요합니다.',
-                    'success': False
-                }, ensure_ascii=False)
-            }
+            return json_response(400, {
+                'error': '질문이 필요합니다.',
+                'success': False
+            }, headers, request)
         
         logger.info(f"Question: {user_question[:100]}... (Game: {game_type})")
         
         # Claude 응답 생성
-        claude_response = generate_claude_response(user_question, game_type, question_text)
+        claude_response = generate_claude_response(
+            user_question, game_type, question_text,
+            deadline=deadline_from_context(context, reserve_ms=RESPONSE_RESERVE_MS, max_budget_ms=RESPONSE_BUDGET_MS)
+        )
         
-        return {
-            'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps({
-                'response': claude_response,
-                'timestamp': datetime.now().isoformat(),
-                'success': True
-            }, ensure_ascii=False)
-        }
+        return json_response(200, {
+            'response': claude_response,
+            'timestamp': datetime.now().isoformat(),
+            'success': True
+        }, headers, request)
+        
+    except RequestError as e:
+        logger.warning(f"Bad request: {str(e)}")
+        return json_response(400, {
+            'error': '잘못된 요청 형식입니다.',
+            'success': False
+        }, headers, request)
         
     except Exception as e:
         logger.error(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({
-                'error': '서버 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.',
-                'success': False
-            }, ensure_ascii=False)
-        }
+        return json_response(500, {
+            'error': '서버 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.',
+            'success': False
+        }, headers, request)
 
-def generate_claude_response(user_question, game_type, question_text):
+def generate_claude_response(user_question, game_type, question_text, deadline=None):
     """
-    Claude를 사용한 응답 생성
+    Claude를 사용한 응답 생성 (deadline까지 답을 못 받으면 모델/리전 전환을 멈추고 대체 응답)
     """
     try:
-        # Bedrock 클라이언트 초기화
-        bedrock = boto3.client(
-            service_name='bedrock-runtime',
-            region_name='us-east-1'
-        )
+        # Bedrock 리전 풀 프록시 (리전별 클라이언트는 컨테이너 단위 재사용)
+        bedrock = region_pool.bedrock(deadline)
+        logger.info(f"Bedrock client pool: {get_client_stats()}")
         
         # 게임별 컨텍스트 설정
         game_context = get_game_context(game_type)
@@ -105,9 +120,6 @@ def generate_claude_response(user_question, game_type, question_text):
         
         user_prompt += "\n\n위 질문에 대해 경제학적 관점에서 도움이 되는 답변을 해주세요."
 
-        # Claude 모델 호출
-        model_id = "anthropic.claude-3-sonnet-20240229-v1:0"
-        
         request_body = {
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": 800,
@@ -122,18 +134,15 @@ def generate_claude_response(user_question, game_type, question_text):
             "top_p": 0.9
         }
         
-        logger.info("Calling Claude API...")
-        
-        response = bedrock.invoke_model(
-            modelId=model_id,
-            body=json.dumps(request_body)
-        )
+        # Claude 모델 호출 (질문 복잡도에 따라 모델 선택)
+        complexity = classify_complexity(user_question)
+        logger.info(f"Calling Claude API... ({complexity})")
         
-        response_body = json.loads(response['body'].read())
-        logger.info(f"Claude response received: {response_body}")
+        generation = {}
+        claude_response = model_router.converse(bedrock, request_body, complexity, generation, deadline=deadline)
+        logger.info(f"Claude response received: {generation}")
         
-        if response_body.get('content') and len(response_body['content']) > 0:
-            claude_response = response_body['content'][0]['text']
+        if claude_response:
             logger.info("Claude response generated successfully")
             return claude_response
         else:
@@ -2,6 +2,9 @@ import json
 import logging
 from datetime import datetime
 
+from chatbot_core.events import normalize_event, parse_json_body, RequestError
+from chatbot_core.responses import json_response
+
 # 로깅 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -21,8 +24,11 @@ def lambda_handler(event, context):
     
     logger.info(f"Received event: {json.dumps(event)}")
     
+    # 요청 정규화 (REST API v1 / HTTP API v2)
+    request = normalize_event(event)
+    
     # OPTIONS 요청 처리
-    if event.get('httpMethod') == 'OPTIONS':
+    if request['method'] == 'OPTIONS':
         return {
             'statusCode': 200,
             'headers': headers,
@@ -31,48 +37,41 @@ def lambda_handler(event, context):
     
     try:
         # 요청 데이터 파싱
-        body_str = event.get('body', '{}')
-        logger.info(f"Body string: {body_str}")
-        
-        body = json.loads(body_str)
+        body = parse_json_body(request)
+        logger.info(f"Body: {body}")
         user_question = body.get('question', '')
         game_type = body.get('gameType', '')
         
         logger.info(f"Question: {user_question}, Game: {game_type}")
         
         if not user_question:
-            return {
-                'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({
-                    'error': '질문이 필요합니다.',
-                    'success': False
-                })
-            }
+            return json_response(400, {
+                'error': '질문이 필요합니다.',
+                'success': False
+            }, headers, request)
         
         # 간단한 응답 생성
         response_text = generate_simple_response(user_question, game_type)
         
-        return {
-            'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps({
-                'response': response_text,
-                'timestamp': datetime.now().isoformat(),
-                'success': True
-            })
-        }
+        return json_response(200, {
+            'response': response_text,
+            'timestamp': datetime.now().isoformat(),
+            'success': True
+        }, headers, request)
+        
+    except RequestError as e:
+        logger.warning(f"Bad request: {str(e)}")
+        return json_response(400, {
+            'error': '잘못된 요청 형식입니다.',
+            'success': False
+        }, headers, request)
         
     except Exception as e:
         logger.error(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({
-                'error': f'서버 오류: {str(e)}',
-                'success': False
-            })
-        }
+        return json_response(500, {
+            'error': f'서버 오류: {str(e)}',
+            'success': False
+        }, headers, request)
 
 def generate_simple_response(user_question, game_type):
     """
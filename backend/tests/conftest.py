@@ -0,0 +1,12 @@
+"""
+chatbot_core 단위 테스트 공통 설정
+Lambda 번들 디렉터리(backend/lambda)를 import 경로에 추가 (번들에 포함된 boto3/botocore 사용)
+
+    cd backend && python3 -m pytest -q tests
+"""
+import os
+import sys
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lambda')
+if LAMBDA_DIR not in sys.path:
+    sys.path.insert(0, LAMBDA_DIR)
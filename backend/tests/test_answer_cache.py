@@ -0,0 +1,106 @@
+"""
+유사 질문 답변 캐시 - MinHash 적중/미적중, 경제 용어/방향 표현 가드, 범위/만료/용량
+"""
+from chatbot_core import answer_cache as answer_cache_module
+from chatbot_core.answer_cache import SemanticAnswerCache, question_guard, normalize_question
+
+GAME = 'BlackSwan'
+QUIZ = '기준금리 인상의 효과는?'
+QUESTION = '기준금리가 오르면 환율은 어떻게 되나요'
+
+
+def test_exact_and_punctuation_variants_hit():
+    cache = SemanticAnswerCache()
+    cache.store(GAME, QUIZ, QUESTION, '원화 강세')
+
+    assert cache.lookup(GAME, QUIZ, QUESTION) == ('원화 강세', 1.0)
+    assert cache.lookup(GAME, QUIZ, '  기준금리가 오르면, 환율은 어떻게 되나요?? ') == ('원화 강세', 1.0)
+    assert cache.stats()['exact_hits'] == 2
+
+
+def test_near_duplicate_hits_above_threshold():
+    cache = SemanticAnswerCache()
+    cache.store(GAME, QUIZ, QUESTION, '원화 강세')
+
+    answer, similarity = cache.lookup(GAME, QUIZ, QUESTION + ' 궁금')
+
+    assert answer == '원화 강세'
+    assert cache.threshold <= similarity < 1.0
+    assert cache.stats()['hits'] == 1
+
+
+def test_dissimilar_question_misses():
+    cache = SemanticAnswerCache()
+    cache.store(GAME, QUIZ, QUESTION, '원화 강세')
+
+    assert cache.lookup(GAME, QUIZ, '인플레이션이 높으면 실질임금은 어떻게 되나요') is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_question_guard_keys():
+    assert question_guard('금리가 오르면 주가는 떨어지나요') == (frozenset({'금리', '주가'}), ('up', 'down'))
+    assert question_guard('금리가 내리면 주가는 오르나요')[1] == ('down', 'up')
+    # 같은 방향이 이어지면 한 번만
+    assert question_guard('물가 상승으로 금리 인상')[1] == ('up',)
+
+
+def test_direction_guard_rejects_opposite_question():
+    up = '금리가 오르면 주가는 어떻게 되나요'
+    down = '금리가 내리면 주가는 어떻게 되나요'
+
+    # 문자 유사도만 보면 반대 질문도 재사용됨
+    unguarded = SemanticAnswerCache(threshold=0.5, guard=None)
+    unguarded.store(GAME, QUIZ, up, '주가 하락')
+    assert unguarded.lookup(GAME, QUIZ, down) is not None
+
+    guarded = SemanticAnswerCache(threshold=0.5)
+    guarded.store(GAME, QUIZ, up, '주가 하락')
+    assert guarded.lookup(GAME, QUIZ, down) is None
+
+
+def test_term_guard_rejects_different_economic_terms():
+    cache = SemanticAnswerCache(threshold=0.5)
+    cache.store(GAME, QUIZ, '금리가 오르면 주가는 어떻게 되나요', '주가 하락')
+
+    assert cache.lookup(GAME, QUIZ, '환율이 오르면 주가는 어떻게 되나요') is None
+
+
+def test_scope_is_game_and_quiz_question():
+    cache = SemanticAnswerCache()
+    cache.store(GAME, QUIZ, QUESTION, '원화 강세')
+
+    assert cache.lookup('SignalDecoding', QUIZ, QUESTION) is None
+    assert cache.lookup(GAME, '다른 문제', QUESTION) is None
+
+
+def test_expired_entries_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache_module.time, 'monotonic', lambda: now[0])
+    cache = SemanticAnswerCache(ttl=60)
+    cache.store(GAME, QUIZ, QUESTION, '원화 강세')
+
+    now[0] += 59
+    assert cache.lookup(GAME, QUIZ, QUESTION) is not None
+    now[0] += 2
+    assert cache.lookup(GAME, QUIZ, QUESTION) is None
+
+
+def test_evicts_least_recently_used():
+    cache = SemanticAnswerCache(max_entries=2)
+    cache.store(GAME, QUIZ, '첫 번째 질문입니다', 'a')
+    cache.store(GAME, QUIZ, '두 번째 질문입니다', 'b')
+    # 첫 번째를 다시 사용해 최근으로 이동
+    assert cache.lookup(GAME, QUIZ, '첫 번째 질문입니다')
+    cache.store(GAME, QUIZ, '세 번째 질문입니다', 'c')
+
+    assert cache.lookup(GAME, QUIZ, '두 번째 질문입니다') is None
+    assert cache.lookup(GAME, QUIZ, '첫 번째 질문입니다')[0] == 'a'
+    assert cache.stats()['evictions'] == 1
+    # 쫓겨난 항목(두 번째 저장, id 1)은 LSH 버킷에도 남지 않음
+    assert all(1 not in bucket for bucket in cache._buckets.values())
+
+
+def test_signature_is_deterministic():
+    normalized = normalize_question(QUESTION)
+
+    assert SemanticAnswerCache().signature(normalized) == SemanticAnswerCache().signature(normalized)
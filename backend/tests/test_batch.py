@@ -0,0 +1,106 @@
+"""
+배치 처리 - 중복 제거, 항목별 오류 격리, 데드라인 초과 항목, 입력 순서 재배열
+"""
+import time
+import threading
+import contextvars
+
+from chatbot_core.batch import dedupe, fan_out, in_order
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+def test_dedupe_maps_every_position_to_unique_item():
+    items = [{'q': 'a'}, {'q': 'b'}, {'q': 'a'}, {'q': 'c'}, {'q': 'b'}]
+
+    unique, mapping = dedupe(items, key=lambda item: item['q'])
+
+    assert [item['q'] for item in unique] == ['a', 'b', 'c']
+    assert mapping == [0, 1, 0, 2, 1]
+    assert [unique[index] for index in mapping] == items
+
+
+def test_dedupe_empty():
+    assert dedupe([], key=str) == ([], [])
+
+
+def test_fan_out_isolates_item_errors():
+    def worker(item):
+        if item == 'bad':
+            raise ValueError(item)
+        return item.upper()
+
+    results = {index: (status, result) for index, status, result in
+               fan_out(['a', 'bad', 'c'], worker, max_concurrency=2, deadline=time.monotonic() + 5)}
+
+    assert results[0] == ('ok', 'A')
+    assert results[2] == ('ok', 'C')
+    assert results[1][0] == 'error'
+    assert isinstance(results[1][1], ValueError)
+
+
+def test_fan_out_respects_max_concurrency():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def worker(item):
+        with lock:
+            running.append(item)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(item)
+        return item
+
+    results = list(fan_out(list(range(8)), worker, max_concurrency=3, deadline=time.monotonic() + 5))
+
+    assert sorted(index for index, _, _ in results) == list(range(8))
+    assert max(peak) <= 3
+
+
+def test_fan_out_reports_unfinished_items_as_timeout_in_input_order():
+    release = threading.Event()
+
+    def worker(item):
+        if item != 'fast':
+            release.wait(2)
+        return item
+
+    started = time.monotonic()
+    try:
+        results = list(fan_out(['slow', 'fast', 'slow', 'slow'], worker, max_concurrency=2,
+                               deadline=time.monotonic() + 0.2))
+    finally:
+        release.set()
+
+    # 데드라인에서 바로 반환 (실행 중인 항목을 기다리지 않음)
+    assert time.monotonic() - started < 1
+    assert results[0] == (1, 'ok', 'fast')
+    assert results[1:] == [(0, 'timeout', None), (2, 'timeout', None), (3, 'timeout', None)]
+
+
+def test_fan_out_runs_items_in_submitting_context():
+    request_id.set('req-1')
+
+    results = list(fan_out([0, 1], lambda item: request_id.get(), max_concurrency=2, deadline=time.monotonic() + 5))
+
+    assert {result for _, _, result in results} == {'req-1'}
+
+
+def test_fan_out_empty():
+    assert list(fan_out([], lambda item: item, max_concurrency=4, deadline=time.monotonic())) == []
+
+
+def test_in_order_yields_as_soon_as_prefix_is_complete():
+    completed = iter([(2, 'c'), (0, 'a'), (1, 'b'), (3, 'd')])
+    ordered = in_order(completed)
+
+    assert next(ordered) == (0, 'a')
+    assert next(ordered) == (1, 'b')
+    assert next(ordered) == (2, 'c')
+    assert list(ordered) == [(3, 'd')]
+
+
+def test_in_order_flushes_gaps_at_end():
+    assert list(in_order([(3, 'd'), (1, 'b')])) == [(1, 'b'), (3, 'd')]
@@ -0,0 +1,67 @@
+"""
+클라이언트 레지스트리 - 예열한 리전 클라이언트를 요청 경로가 그대로 재사용하는지
+"""
+import time
+
+import pytest
+from botocore.stub import Stubber
+
+from chatbot_core import clients, model_router
+from chatbot_core.regions import RegionPool
+from chatbot_core.model_router import ModelRouter, bedrock_client_config
+
+REGION = 'ap-northeast-2'
+
+CONVERSE_RESPONSE = {
+    'output': {'message': {'role': 'assistant', 'content': [{'text': '답변'}]}},
+    'stopReason': 'end_turn',
+    'usage': {'inputTokens': 10, 'outputTokens': 3, 'totalTokens': 13},
+    'metrics': {'latencyMs': 100}
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    # 테스트마다 botocore가 아직 손대지 않은 새 설정 객체로 시작
+    monkeypatch.setattr(model_router, '_client_config', None)
+    clients.reset_clients()
+    yield
+    clients.reset_clients()
+
+
+def test_same_config_object_reuses_client():
+    config = bedrock_client_config()
+    first = clients.get_client('bedrock-runtime', region_name=REGION, config=config)
+    # botocore가 생성 중 설정을 고쳐 써도 같은 설정 객체는 같은 키
+    second = clients.get_client('bedrock-runtime', region_name=REGION, config=config)
+
+    assert first is second
+    assert clients.get_client_stats() == {'hits': 1, 'misses': 1, 'clients': 1}
+
+
+def test_first_request_after_warmup_hits_registry(monkeypatch):
+    pool = RegionPool(regions=[REGION], config=bedrock_client_config)
+    monkeypatch.setattr(pool, '_warm_request', lambda client: 1.0)
+
+    timings = pool.warm()
+    assert 'error' not in timings[REGION]
+    warmed = clients.get_client_stats()
+    assert warmed['clients'] == 1
+
+    stubber = Stubber(pool.client(REGION))
+    stubber.add_response('converse', CONVERSE_RESPONSE)
+    with stubber:
+        text = ModelRouter(chains={'simple': ['model-a']}).converse(
+            pool.bedrock(time.monotonic() + 20),
+            {'messages': [{'role': 'user', 'content': '질문'}]},
+            'simple'
+        )
+
+    assert text == '답변'
+    stats = clients.get_client_stats()
+    assert stats['clients'] == 1
+    assert stats['misses'] == warmed['misses']
+    # pool.client() 한 번 + 요청 경로 한 번
+    assert stats['hits'] >= warmed['hits'] + 2
@@ -0,0 +1,103 @@
+"""
+경제 용어 사전 매칭 - Aho-Corasick 매처, 용어/어간 추출
+"""
+import random
+
+from chatbot_core.lexicon import AhoCorasickMatcher, extract_terms, extract_stems, strip_particle
+
+ENTRIES = [
+    ('금리', 1.0, '금리'),
+    ('기준금리', 2.0, '기준금리'),
+    ('환율', 1.5, '환율'),
+    ('GDP', 1.0, 'GDP'),
+    ('국내총생산', 1.0, 'GDP'),
+    ('he', 1.0, 'he'),
+    ('she', 1.0, 'she'),
+    ('hers', 1.0, 'hers'),
+]
+
+
+def naive_find_all(entries, text):
+    lowered = text.lower()
+    matches = set()
+    for term, _, canonical in entries:
+        pattern = term.lower()
+        start = lowered.find(pattern)
+        while start != -1:
+            matches.add((start, start + len(pattern), canonical))
+            start = lowered.find(pattern, start + 1)
+    return matches
+
+
+def test_find_all_matches_overlapping_patterns():
+    matcher = AhoCorasickMatcher(ENTRIES)
+    text = '기준금리가 오르면 환율은?'
+
+    found = {(start, end, canonical) for start, end, _, canonical in matcher.find_all(text)}
+
+    assert found == naive_find_all(ENTRIES, text)
+    assert (0, 4, '기준금리') in found
+    assert (2, 4, '금리') in found
+
+
+def test_failure_links_follow_suffix_patterns():
+    # 고전적인 he/she/hers/his 예제를 한글로 (ASCII 패턴은 단어 경계 검사가 붙으므로)
+    entries = [('나다', 1.0, 'he'), ('가나다', 1.0, 'she'), ('나다라마', 1.0, 'hers'), ('나바', 1.0, 'his')]
+    matcher = AhoCorasickMatcher(entries)
+
+    found = {(start, canonical) for start, _, _, canonical in matcher.find_all('아가나다라마')}
+
+    assert found == {(1, 'she'), (2, 'he'), (2, 'hers')}
+
+
+def test_find_all_agrees_with_naive_search():
+    rng = random.Random(7)
+    alphabet = '가나다라'
+    for _ in range(200):
+        entries = [(''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))), 1.0, str(index))
+                   for index in range(rng.randint(1, 6))]
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        matcher = AhoCorasickMatcher(entries)
+
+        found = {(start, end, canonical) for start, end, _, canonical in matcher.find_all(text)}
+
+        assert found == naive_find_all(entries, text)
+
+
+def test_ascii_patterns_respect_word_boundaries():
+    matcher = AhoCorasickMatcher(ENTRIES)
+
+    assert [m[3] for m in matcher.find_all('GDP 성장률')] == ['GDP']
+    assert [m[3] for m in matcher.find_all('한국gdp는')] == ['GDP']
+    assert matcher.find_all('GDPR 규정') == []
+
+
+def test_find_longest_prefers_leftmost_longest():
+    matcher = AhoCorasickMatcher(ENTRIES)
+
+    selected = [canonical for _, _, _, canonical in matcher.find_longest('기준금리와 금리')]
+
+    assert selected == ['기준금리', '금리']
+
+
+def test_extract_terms_ranks_by_weight_and_merges_synonyms():
+    matcher = AhoCorasickMatcher(ENTRIES)
+
+    terms = extract_terms('GDP와 국내총생산, 그리고 환율', matcher=matcher)
+
+    # GDP 1.0 + 국내총생산 1.0 = 2.0 > 환율 1.5
+    assert terms == ['GDP', '환율']
+
+
+def test_extract_stems_skips_lexicon_terms_particles_and_stopwords():
+    matcher = AhoCorasickMatcher(ENTRIES)
+
+    stems = extract_stems('환율이 오르면 수출기업은 어떻게 되나요', matcher=matcher)
+
+    assert stems == ['오르면', '수출기업']
+
+
+def test_strip_particle_keeps_short_stems():
+    assert strip_particle('금리가') == '금리'
+    assert strip_particle('물가에서는') == '물가'
+    assert strip_particle('이가') == '이가'
@@ -0,0 +1,106 @@
+"""
+퀴즈 코퍼스 BM25 인덱스 - 파일 왕복, 순위, 점수 계산
+"""
+import math
+
+import pytest
+
+from chatbot_core.quiz_index import QuizIndex, build_index, tokenize, BM25_K1, BM25_B
+
+SNAPSHOT = [
+    {'gameType': 'BlackSwan', 'quizDate': '2025-11-01', 'data': {'questions': [
+        {'id': 'q1', 'question': '2008년 금융위기의 직접적 원인은?', 'answer': '서브프라임 모기지',
+         'explanation': '저신용 주택담보대출 부실이 파생상품을 통해 번졌습니다.', 'hint': ['주택시장']},
+        {'id': 'q2', 'question': '기준금리 인상이 환율에 미치는 영향은?', 'answer': '원화 강세',
+         'explanation': '금리 차이로 외국인 자금이 유입됩니다.'},
+    ]}},
+    {'gameType': 'SignalDecoding', 'quizDate': '2025-11-01', 'data': {'questions': [
+        {'id': 'q3', 'question': '기준금리 동결 발표의 신호는?', 'answer': '관망',
+         'explanation': '물가와 성장 사이에서 금리를 유지합니다.'},
+    ]}},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / 'quiz_index.bin')
+    assert build_index(SNAPSHOT, path) == 3
+    quiz_index = QuizIndex(path)
+    yield quiz_index
+    quiz_index.close()
+
+
+def reference_score(query, docs):
+    """
+    문서 텍스트로 직접 계산한 BM25 점수 (인덱스 파일을 거치지 않음)
+    """
+    doc_terms = [tokenize('\n'.join(part for part in (
+        doc['question'], doc['answer'], doc.get('explanation', ''), *doc.get('hint', [])
+    ) if part)) for doc in docs]
+    avgdl = sum(len(terms) for terms in doc_terms) / len(doc_terms)
+    scores = [0.0] * len(docs)
+    for term in set(tokenize(query)):
+        df = sum(1 for terms in doc_terms if term in terms)
+        if not df:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for doc_id, terms in enumerate(doc_terms):
+            tf = terms.count(term)
+            if tf:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * len(terms) / avgdl)
+                scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+    return scores
+
+
+def test_tokenize_adds_hangul_bigrams():
+    assert tokenize('기준금리가 GDP') == ['기준금리가', '기준', '준금', '금리', '리가', 'gdp']
+    assert tokenize('금리') == ['금리']
+
+
+def test_search_matches_reference_bm25(index):
+    query = '기준금리 인상과 환율'
+    docs = [question for item in SNAPSHOT for question in item['data']['questions']]
+    expected = reference_score(query, docs)
+
+    results = index.search(query, limit=3)
+
+    assert [doc['questionId'] for _, doc in results] == ['q2', 'q3']
+    for score, doc in results:
+        doc_id = [d['id'] for d in docs].index(doc['questionId'])
+        assert score == pytest.approx(expected[doc_id], abs=1e-3)
+
+
+def test_rare_terms_outweigh_common_terms(index):
+    # '기준금리'는 두 문서, '모기지'는 한 문서에만 있음
+    top_score, top_doc = index.search('기준금리 모기지', limit=1)[0]
+
+    assert top_doc['questionId'] == 'q1'
+    assert top_score > 0
+
+
+def test_game_type_boost_reorders_ties(index):
+    plain = [doc['questionId'] for _, doc in index.search('기준금리', limit=2)]
+    boosted = [doc['questionId'] for _, doc in index.search('기준금리', limit=2, game_type='SignalDecoding')]
+
+    assert boosted[0] == 'q3'
+    assert set(plain) == set(boosted) == {'q2', 'q3'}
+
+
+def test_unknown_terms_return_nothing(index):
+    assert index.search('비트코인 반감기') == []
+
+
+def test_find_question_ignores_whitespace(index):
+    doc = index.find_question('  2008년   금융위기의 직접적\n원인은? ')
+
+    assert doc['questionId'] == 'q1'
+    assert doc['hint'] == ['주택시장']
+    assert index.find_question('존재하지 않는 문제') is None
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / 'broken.bin'
+    path.write_bytes(b'not an index file')
+
+    with pytest.raises(ValueError):
+        QuizIndex(str(path))
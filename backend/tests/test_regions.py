@@ -0,0 +1,190 @@
+"""
+멀티 리전 풀 - 지연 시간/오류율/서킷 기반 순위, 리전 전환, 모델 미제공 리전, 요청 단위 실패 리전, 데드라인
+"""
+import time
+
+import pytest
+
+from chatbot_core.model_router import DeadlineExceeded, RegionsExhausted
+from chatbot_core.regions import RegionPool
+
+SEOUL, TOKYO, VIRGINIA = 'ap-northeast-2', 'ap-northeast-1', 'us-east-1'
+MODEL = 'anthropic.claude-3-haiku'
+
+
+class FakeError(Exception):
+    """
+    botocore ClientError처럼 response['Error']를 가진 오류
+    """
+
+    def __init__(self, code, message=''):
+        super().__init__(f"{code}: {message}")
+        self.response = {'Error': {'Code': code, 'Message': message}}
+
+
+class FakeClient:
+    """
+    리전별로 미리 정한 오류를 던지거나 응답을 돌려주는 Bedrock 클라이언트
+    """
+
+    def __init__(self, region, errors, calls):
+        self.region = region
+        self.errors = errors
+        self.calls = calls
+
+    def converse(self, **kwargs):
+        self.calls.append((self.region, kwargs.get('modelId')))
+        error = self.errors.get((self.region, kwargs.get('modelId'))) or self.errors.get(self.region)
+        if error is not None:
+            raise error
+        return {'output': {'region': self.region}}
+
+
+def make_pool(errors=None, **kwargs):
+    pool = RegionPool(regions=[SEOUL, TOKYO, VIRGINIA], **kwargs)
+    pool.calls = []
+    pool.client = lambda region: FakeClient(region, errors or {}, pool.calls)
+    return pool
+
+
+def throttled():
+    return FakeError('ThrottlingException', 'Too many requests')
+
+
+def model_unavailable():
+    return FakeError('ValidationException', 'The provided model identifier is invalid.')
+
+
+def test_ranked_by_latency_then_config_order():
+    pool = make_pool()
+    assert pool.ranked() == [SEOUL, TOKYO, VIRGINIA]
+
+    pool.record_success(SEOUL, 300)
+    pool.record_success(TOKYO, 100)
+    # 관측값이 없는 버지니아는 가장 빠른 리전과 같다고 보고 설정 순서로 정렬
+    assert pool.ranked() == [TOKYO, VIRGINIA, SEOUL]
+
+
+def test_error_rate_penalty_and_open_breaker_demote_region():
+    pool = make_pool()
+    for region in (SEOUL, TOKYO, VIRGINIA):
+        pool.record_success(region, 100)
+
+    pool.record_failure(SEOUL)
+    assert pool.ranked()[-1] == SEOUL
+    assert pool.snapshot()[-1]['circuit'] == 'closed'
+
+    pool.record_failure(TOKYO)
+    pool.record_failure(TOKYO)
+    # 서킷이 열린 리전은 오류율과 관계없이 맨 뒤
+    assert pool.ranked() == [VIRGINIA, SEOUL, TOKYO]
+    assert pool.snapshot()[-1]['circuit'] == 'open'
+
+
+def test_fails_over_to_next_region_on_throttling():
+    pool = make_pool({SEOUL: throttled()})
+
+    response = pool.call('converse', modelId=MODEL)
+
+    assert response['ResponseMetadata']['Region'] == TOKYO
+    assert [region for region, _ in pool.calls] == [SEOUL, TOKYO]
+    states = {state['region']: state for state in pool.snapshot()}
+    assert states[SEOUL]['failures'] == 1
+    assert states[TOKYO]['calls'] == 1
+
+
+def test_last_region_error_is_raised():
+    error = throttled()
+    pool = make_pool({SEOUL: throttled(), TOKYO: throttled(), VIRGINIA: error})
+
+    with pytest.raises(FakeError) as raised:
+        pool.call('converse', modelId=MODEL)
+
+    assert raised.value is error
+    assert len(pool.calls) == 3
+
+
+def test_request_error_propagates_without_failover_and_releases_probe():
+    pool = make_pool({SEOUL: FakeError('ValidationException', 'messages: field required')}, failure_threshold=1, cooldown=0)
+    breaker = pool._state[SEOUL]['breaker']
+    breaker.record_failure()
+    assert breaker.state == 'half_open'
+
+    with pytest.raises(FakeError):
+        pool.call('converse', modelId=MODEL)
+
+    assert pool.calls == [(SEOUL, MODEL)]
+    # 결과 없이 끝난 시험 호출 권한은 반환되어 다음 요청이 다시 시험할 수 있음
+    assert breaker.allow()
+    assert pool.snapshot()[0]['failures'] == 0
+
+
+def test_model_unavailable_skips_region_for_that_model_only():
+    pool = make_pool({(SEOUL, MODEL): model_unavailable()})
+
+    response = pool.call('converse', modelId=MODEL)
+
+    assert response['ResponseMetadata']['Region'] == TOKYO
+    states = {state['region']: state for state in pool.snapshot()}
+    assert states[SEOUL]['failures'] == 0
+    assert states[SEOUL]['circuit'] == 'closed'
+    assert states[SEOUL]['unavailable_models'] == [MODEL]
+
+    # 같은 모델은 서울을 호출하지 않고, 다른 모델은 그대로 서울 사용
+    pool.calls.clear()
+    pool.call('converse', modelId=MODEL)
+    pool.call('converse', modelId='other-model')
+    assert pool.calls == [(TOKYO, MODEL), (SEOUL, 'other-model')]
+
+
+def test_model_unavailable_everywhere_raises_without_calls():
+    error = model_unavailable()
+    pool = make_pool({region: error for region in (SEOUL, TOKYO, VIRGINIA)})
+    with pytest.raises(FakeError):
+        pool.call('converse', modelId=MODEL)
+
+    pool.calls.clear()
+    with pytest.raises(FakeError):
+        pool.call('converse', modelId=MODEL)
+    assert pool.calls == []
+
+
+def test_failed_regions_are_not_retried_within_request():
+    pool = make_pool({SEOUL: throttled(), TOKYO: throttled(), VIRGINIA: throttled()})
+    client = pool.bedrock()
+
+    with pytest.raises(FakeError):
+        client.converse(modelId=MODEL)
+    assert len(pool.calls) == 3
+
+    # 같은 요청의 다음 모델은 리전을 다시 호출하지 않음
+    with pytest.raises(RegionsExhausted):
+        client.converse(modelId='fallback-model')
+    assert len(pool.calls) == 3
+
+    # 새 요청은 다시 시도
+    with pytest.raises(FakeError):
+        pool.bedrock().converse(modelId='fallback-model')
+    assert len(pool.calls) == 6
+
+
+def test_deadline_stops_before_next_region(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    error = throttled()
+    pool = make_pool({SEOUL: error})
+
+    with pytest.raises(DeadlineExceeded):
+        pool.call('converse', deadline=now[0], modelId=MODEL)
+    assert pool.calls == []
+
+    # 첫 리전 호출에 1초가 걸려 남은 시간이 MODEL_MIN_ATTEMPT_MS 아래로 떨어지면 마지막 오류를 그대로 전달
+    def slow_client(region):
+        now[0] += 1
+        return FakeClient(region, {SEOUL: error}, pool.calls)
+
+    pool.client = slow_client
+    with pytest.raises(FakeError) as raised:
+        pool.call('converse', deadline=now[0] + 2.5, modelId=MODEL)
+    assert raised.value is error
+    assert pool.calls == [(SEOUL, MODEL)]
@@ -0,0 +1,125 @@
+"""
+서킷 브레이커 상태 전이와 지연 시간 히스토그램
+"""
+import pytest
+
+from chatbot_core import resilience
+from chatbot_core.resilience import CircuitBreaker, LatencyHistogram
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # time.monotonic을 수동 시계로 교체
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.state == 'closed'
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+
+    clock[0] += 29
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    clock[0] += 1
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+    # 시험 호출 진행 중에는 다른 호출 차단
+    assert not breaker.allow()
+
+
+def test_probe_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_probe_failure_reopens_for_full_cooldown(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+
+    # half-open 시험 실패는 임계치와 무관하게 즉시 다시 열림
+    breaker.record_failure()
+
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+
+
+def test_release_returns_probe_without_closing(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.release()
+
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+
+
+def test_histogram_percentiles_and_buckets():
+    histogram = LatencyHistogram(window=100, buckets=(100, 200))
+    for latency in range(10, 310, 10):
+        histogram.record(latency)
+
+    snapshot = histogram.snapshot()
+
+    assert len(histogram) == 30
+    assert snapshot['p50'] == 150
+    assert snapshot['p99'] == 300
+    assert snapshot['buckets'] == {'<=100': 10, '<=200': 10, '>200': 10}
+
+
+def test_histogram_window_keeps_recent_samples_only():
+    histogram = LatencyHistogram(window=3)
+    assert histogram.percentile(50) is None
+
+    for latency in (5000, 10, 20, 30):
+        histogram.record(latency)
+
+    assert len(histogram) == 3
+    assert histogram.percentile(100) == 30
+    # 누적 버킷 카운트는 윈도와 무관
+    assert sum(histogram.snapshot()['buckets'].values()) == 4